@@ -1,15 +1,29 @@
 import streamlit as st
 import pandas as pd
-import joblib
-import matplotlib.pyplot as plt
 import os
+from functools import partial
 
+# Project modules read their BI_* settings when imported, so .env goes first
 from dotenv import load_dotenv
 load_dotenv()
 
-from groq import Groq
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from dataset_store import dataset_store
+from partition_store import partition_store
+from streaming import stream_csv
+from cube import cube_for_dataset
+from model_registry import MODEL_DIR, registry
+from batch_predict import FEATURES, predict_batch, prepare_scenarios, scenario_grid
+from forest_engine import INFERENCE_BACKEND, engine_for
+from llm_cache import cache_key, response_cache
+from genai_executor import GenAIExecutor, MAX_RETRIES, REQUEST_TIMEOUT
+from filter_index import DRILL_LEVELS, FILTER_COLUMNS, index_for_dataset
+from sketches import QUANTILE_ACCURACY
+from dataset_digest import digest_for_dataset
+from tracing import ADMIN_PANEL, tracer
+
+# Heavy dependencies (matplotlib, SHAP, statsmodels, scikit-learn, reportlab,
+# groq) and the models are loaded by the sections that use them, on first
+# visit, so a new worker renders "Upload Data" without paying for them.
 
 # ================= PAGE CONFIG =================
 st.set_page_config(
@@ -19,41 +33,76 @@ st.set_page_config(
     page_icon="📊"
 )
 
+# One trace record per script run (no-op unless BI_TRACING is set)
+tracer.begin_rerun()
+
 # ================= GENAI CLIENT (BACKEND ONLY) =================
 GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 
-client = Groq(api_key=GROQ_API_KEY) if GROQ_API_KEY else None
+GENAI_MODEL = "llama-3.1-8b-instant"
+GENAI_TEMPERATURE = 0.4
+GENAI_SYSTEM_PROMPT = "You are a senior business data analyst."
 
-def ask_genai(prompt):
-    if client is None:
-        return "❌ GenAI service not configured. API key missing."
+def groq_client():
+    # Imported on the first GenAI request; retries/backoff are handled by the executor, not the SDK
+    from groq import AsyncGroq
+    return AsyncGroq(api_key=GROQ_API_KEY, max_retries=0)
 
-    response = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {"role": "system", "content": "You are a senior business data analyst."},
-            {"role": "user", "content": prompt}
-        ],
-        temperature=0.4
-    )
-    return response.choices[0].message.content
+genai_executor = GenAIExecutor(
+    groq_client,
+    GENAI_MODEL,
+    GENAI_TEMPERATURE,
+    GENAI_SYSTEM_PROMPT
+) if GROQ_API_KEY else None
 
-# ================= PDF FUNCTION =================
-def generate_pdf(text):
-    file_path = "AI_Business_Report.pdf"
-    c = canvas.Canvas(file_path, pagesize=A4)
-    width, height = A4
+def ask_genai_many(prompts, on_update=None):
+    """Answer ``{name: prompt}`` concurrently, streaming tokens to ``on_update(name, text)``."""
+    if genai_executor is None:
+        return {name: "❌ GenAI service not configured. API key missing." for name in prompts}
 
-    y = height - 40
-    for line in text.split("\n"):
-        c.drawString(40, y, line)
-        y -= 14
-        if y < 40:
-            c.showPage()
-            y = height - 40
+    # Identical prompts (from any session) are answered from the cache or share one call
+    answers, pending, waiting = {}, {}, {}
+    for name, prompt in prompts.items():
+        key = cache_key(prompt, GENAI_MODEL, GENAI_TEMPERATURE, GENAI_SYSTEM_PROMPT)
+        cached = response_cache.lookup(key)
+        if cached is not None:
+            answers[name] = cached
+            tracer.record_llm(0.0, cached=True)
+            continue
+        future, leader = response_cache.claim(key)
+        if leader:
+            pending[name] = key
+        else:
+            waiting[name] = future
+            tracer.record_llm(0.0, cached=True)
+
+    if pending:
+        try:
+            with tracer.span("genai", prompts=len(pending)):
+                results = genai_executor.run({name: prompts[name] for name in pending}, on_update)
+        except BaseException as e:
+            # Includes Streamlit's rerun/stop raised from on_update: release every claimed key so
+            # other sessions waiting on them fail fast (with a plain error they can handle)
+            error = e if isinstance(e, Exception) else RuntimeError("GenAI request was interrupted")
+            for key in pending.values():
+                response_cache.fail(key, error)
+            raise
+        for name, result in results.items():
+            tracer.record_llm(result.seconds, result.prompt_tokens, result.completion_tokens, result.error)
+            if result.error is None:
+                response_cache.resolve(pending[name], result.text, result.seconds)
+                answers[name] = result.text
+            else:
+                response_cache.fail(pending[name], result.error)
+                answers[name] = f"❌ GenAI request failed: {result.error}"
 
-    c.save()
-    return file_path
+    for name, future in waiting.items():
+        try:
+            answers[name] = future.result(timeout=REQUEST_TIMEOUT * (MAX_RETRIES + 1))
+        except Exception as e:
+            answers[name] = f"❌ GenAI request failed: {e}"
+
+    return {name: answers[name] for name in prompts}
 
 # ================= ENHANCED CUSTOM CSS =================
 st.markdown("""
@@ -104,6 +153,12 @@ st.markdown("""
         margin-bottom: 10px;
     }
     
+    .metric-note {
+        color: #8b92a7;
+        font-size: 12px;
+        margin-top: 5px;
+    }
+    
     /* Header Styling */
     .main-header {
         text-align: center;
@@ -221,17 +276,37 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ================= LOAD MODELS =================
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-try:
-    reg_model = joblib.load(os.path.join(BASE_DIR, "model", "sales_regression.pkl"))
-    clf_model = joblib.load(os.path.join(BASE_DIR, "model", "profit_classifier.pkl"))
-    scaler = joblib.load(os.path.join(BASE_DIR, "model", "scaler.pkl"))
-except:
-    st.error("⚠️ Model files not found. Please ensure models are in the correct directory.")
+def load_models():
+    """Regression, classifier, scaler and (array backend) compiled engine, or ``None`` each if missing.
+
+    Called by the ML section only. Loaded once per process and shared across
+    sessions; reloaded only if the file changes.
+    """
+    try:
+        with tracer.span("model_load"):
+            # One read of the version pointer, so the three always come from the same training run
+            reg_model, clf_model, scaler = registry.get_many(MODEL_DIR)
+            # Flattened NumPy forests with the scaler folded in; compiled once per artifact set
+            engine = engine_for(reg_model, clf_model, scaler) if INFERENCE_BACKEND == "array" else None
+    except:
+        st.error("⚠️ Model files not found. Please ensure models are in the correct directory.")
+        return None, None, None, None
+    return reg_model, clf_model, scaler, engine
 
 # ================= SESSION STATE =================
-if "df" not in st.session_state:
-    st.session_state.df = None
+# Handle onto the process-wide dataset store (one shared frame per distinct upload)
+if "dataset" not in st.session_state:
+    st.session_state.dataset = None
+
+# Pre-aggregated cube answering every KPI card and EDA chart
+if "cube" not in st.session_state:
+    st.session_state.cube = None
+
+if "dataset_hash" not in st.session_state:
+    st.session_state.dataset_hash = None
+
+if "upload_id" not in st.session_state:
+    st.session_state.upload_id = None
 
 if "prediction_done" not in st.session_state:
     st.session_state.prediction_done = False
@@ -242,6 +317,22 @@ if "sales_pred" not in st.session_state:
 if "profit_pred" not in st.session_state:
     st.session_state.profit_pred = None
 
+if "batch_result" not in st.session_state:
+    st.session_state.batch_result = None
+
+# TreeSHAP summary of the current prediction, grounded in the forests
+if "attribution" not in st.session_state:
+    st.session_state.attribution = None
+
+if "batch_attribution" not in st.session_state:
+    st.session_state.batch_attribution = None
+
+if "sentiment_result" not in st.session_state:
+    st.session_state.sentiment_result = None
+
+if "forecast_result" not in st.session_state:
+    st.session_state.forecast_result = None
+
 # ================= HEADER =================
 st.markdown("""
 <div class="main-header">
@@ -254,9 +345,10 @@ st.markdown("""
 st.sidebar.markdown("### 🧭 Navigation")
 section = st.sidebar.radio(
     "",
-    ["📤 Upload Data", "📈 EDA Dashboard", "🤖 ML + GenAI"],
+    ["📤 Upload Data", "📈 EDA Dashboard", "🤖 ML + GenAI", "📉 Forecast", "💬 Review Sentiment"],
     label_visibility="collapsed"
 )
+tracer.set_section(section)
 
 st.sidebar.markdown("---")
 st.sidebar.markdown("### ℹ️ About")
@@ -266,34 +358,175 @@ st.sidebar.info(
     "to help you make data-driven business decisions."
 )
 
+model_stats = registry.stats()
+if model_stats:
+    with st.sidebar.expander("🧠 Loaded Models", expanded=False):
+        st.dataframe(pd.DataFrame(model_stats), hide_index=True, use_container_width=True)
+
+dataset_stats = dataset_store.stats()
+if dataset_stats:
+    with st.sidebar.expander("🗄️ Shared Datasets", expanded=False):
+        st.dataframe(pd.DataFrame(dataset_stats), hide_index=True, use_container_width=True)
+
+genai_stats = response_cache.summary()
+if genai_stats["hits"] + genai_stats["misses"]:
+    with st.sidebar.expander("⚡ GenAI Cache", expanded=False):
+        st.markdown(
+            f"**Hits:** {genai_stats['hits']} "
+            f"({genai_stats['memory_hits']} memory, {genai_stats['disk_hits']} disk, "
+            f"{genai_stats['coalesced']} shared)  \n"
+            f"**Misses:** {genai_stats['misses']}  \n"
+            f"**Hit rate:** {genai_stats['hit_rate']:.0%}  \n"
+            f"**Latency saved:** {genai_stats['latency_saved_seconds']:.1f} s"
+        )
+
+# Operator view of the last reruns in this process (BI_TRACING=1 BI_ADMIN_PANEL=1)
+if ADMIN_PANEL and tracer.enabled:
+    reruns = tracer.recent(10)
+    if reruns:
+        with st.sidebar.expander("🛠️ Rerun Traces", expanded=False):
+            st.dataframe(pd.DataFrame([{
+                "Section": rerun["section"],
+                "ms": rerun["ms"],
+                "RSS Δ MB": rerun["rss_delta_mb"],
+                **{f"{name} ms": ms for name, ms in rerun["totals_ms"].items()},
+                "LLM tokens": rerun["llm"].get("prompt_tokens", 0) + rerun["llm"].get("completion_tokens", 0),
+            } for rerun in reruns]), hide_index=True, use_container_width=True)
+
 # ================= UPLOAD DATA =================
 if section == "📤 Upload Data":
     st.markdown('<div class="section-header"><h2>Upload Your Data</h2></div>', unsafe_allow_html=True)
     
     col1, col2, col3 = st.columns([1, 2, 1])
     with col2:
-        file = st.file_uploader(
-            "Upload Superstore CSV",
-            type=["csv"],
-            help="Upload your business data in CSV format"
-        )
+        source = st.radio("Source", ["Single file", "Monthly / regional files"], horizontal=True)
+        files, streaming_mode = [], False
+        if source == "Single file":
+            file = st.file_uploader(
+                "Upload Superstore CSV",
+                type=["csv"],
+                help="Upload your business data in CSV format"
+            )
+            streaming_mode = st.checkbox(
+                "⚡ Streaming mode (very large files)",
+                help="Aggregate the file in chunks instead of loading every row into memory"
+            )
+        else:
+            file = None
+            files = st.file_uploader(
+                "Upload Superstore CSVs",
+                type=["csv"],
+                accept_multiple_files=True,
+                help="One export per month or region; files already ingested are skipped"
+            )
+
+    if files and st.button("📥 Ingest Files", use_container_width=True):
+        progress = st.progress(0.0, text="Ingesting files...")
+        with tracer.span("ingest", files=len(files)):
+            results = partition_store.ingest(
+                [(f.name, f.getvalue()) for f in files],
+                on_progress=lambda done: progress.progress(done, text=f"Ingesting files... {done:.0%}")
+            )
+        progress.empty()
+        for result in results:
+            if result["status"] == "error":
+                st.error(f"❌ {result['file']}: {result['error']}")
+        st.dataframe(pd.DataFrame([{
+            "file": result["file"],
+            "status": result["status"],
+            "rows": result.get("rows", 0),
+            "partitions": len(result.get("partitions", [])),
+        } for result in results]), hide_index=True, use_container_width=True)
+
+    if source != "Single file":
+        ingested_files = partition_store.files()
+        if ingested_files:
+            with st.expander("🗂️ Ingested Files", expanded=False):
+                st.caption("Uploading a file with the same name replaces it; remove files whose rows should no longer count.")
+                st.dataframe(pd.DataFrame(ingested_files), hide_index=True, use_container_width=True)
+                to_remove = st.multiselect("Files to remove", [row["file"] for row in ingested_files])
+                if to_remove and st.button("🗑️ Remove Files", use_container_width=True):
+                    partition_store.remove(to_remove)
+                    st.rerun()
+
+        months, regions = partition_store.months(), partition_store.regions()
+        if months:
+            st.markdown("**Partitioned store:** load only the months and regions you need")
+            scope_col1, scope_col2 = st.columns(2)
+            with scope_col1:
+                month_range = (
+                    st.select_slider("Months", options=months, value=(months[0], months[-1]))
+                    if len(months) > 1 else (months[0], months[0])
+                )
+            with scope_col2:
+                scope_regions = st.multiselect("Regions", regions, placeholder="All regions")
+            # The full range also keeps undated rows
+            if month_range == (months[0], months[-1]):
+                month_range = None
+            selected = partition_store.paths(month_range, scope_regions)
+            if not selected:
+                st.warning("No partitions match these months and regions.")
+            elif st.button("📂 Load Partitions", use_container_width=True):
+                # The digest and the reload both cover exactly these files, so a page-out
+                # reload matches the cube/index cached under the digest even after new ingests
+                digest = partition_store.fingerprint(selected)
+                # Replacing or removing a source file leaves these partitions on disk until the dataset is dropped
+                partition_store.hold(digest, selected)
+                with st.spinner("Loading partitions..."), tracer.span("read_partitions", partitions=len(selected)):
+                    dataset = dataset_store.open_frame(
+                        digest, partial(partition_store.read_paths, selected), paths=selected,
+                        release=partial(partition_store.release, digest)
+                    )
+                st.session_state.dataset = dataset
+                with tracer.span("groupby", stage="cube"):
+                    st.session_state.cube = cube_for_dataset(dataset.frame(), dataset.digest)
+                st.session_state.dataset_hash = dataset.digest
+                st.session_state.upload_id = ("partitions", digest)
+                st.success(f"✅ Loaded {dataset.rows:,} rows from {len(selected)} partitions")
 
     if file:
-        df = pd.read_csv(file, encoding="ISO-8859-1")
-        df.columns = df.columns.str.strip()
-        st.session_state.df = df
+        # Only hash/parse when the uploader holds a new file, not on every rerun
+        upload_id = (getattr(file, "file_id", None) or (file.name, file.size), streaming_mode)
+        if upload_id != st.session_state.upload_id:
+            if streaming_mode:
+                progress = st.progress(0.0, text="Streaming dataset...")
+                file.seek(0)
+                with tracer.span("read_csv", mode="stream", bytes=file.size):
+                    cube = stream_csv(
+                        file,
+                        total_bytes=file.size,
+                        on_progress=lambda done: progress.progress(done, text=f"Streaming dataset... {done:.0%}")
+                    )
+                progress.empty()
+                st.session_state.dataset = None
+                st.session_state.cube = cube
+                st.session_state.dataset_hash = None
+            else:
+                with st.spinner("Loading dataset..."), tracer.span("read_csv", mode="frame", bytes=file.size):
+                    dataset = dataset_store.open(file.getvalue())
+                st.session_state.dataset = dataset
+                with tracer.span("groupby", stage="cube"):
+                    st.session_state.cube = cube_for_dataset(dataset.frame(), dataset.digest)
+                st.session_state.dataset_hash = dataset.digest
+            st.session_state.upload_id = upload_id
         st.success("✅ Dataset loaded successfully!")
 
-    if st.session_state.df is not None:
-        df = st.session_state.df
+    if st.session_state.cube is not None:
+        cube = st.session_state.cube
         
         st.markdown('<div class="section-header"><h2>Data Overview</h2></div>', unsafe_allow_html=True)
         
         # Key Metrics Row
-        total_sales = df["Sales"].sum()
-        total_profit = df["Profit"].sum()
-        total_orders = len(df)
-        avg_discount = df["Discount"].mean() if "Discount" in df.columns else 0
+        total_sales = cube.total_sales
+        total_profit = cube.total_profit
+        # Distinct Order IDs from the cube's HyperLogLog; line items when there is no Order ID
+        distinct_orders = cube.distinct_orders
+        if distinct_orders is not None:
+            total_orders = f"≈{distinct_orders[0]:,}"
+            orders_note = f"±{2 * distinct_orders[1]:.1%} (95%) · {cube.total_orders:,} line items"
+        else:
+            total_orders, orders_note = f"{cube.total_orders:,}", "line items"
+        avg_discount = cube.avg_discount
 
         col1, col2, col3, col4 = st.columns(4)
         
@@ -322,7 +555,8 @@ if section == "📤 Upload Data":
                 f"""<div class='metric-card'>
                     <div class='metric-icon'>📦</div>
                     <div class='metric-title'>Total Orders</div>
-                    <div class='metric-value'>{total_orders:,}</div>
+                    <div class='metric-value'>{total_orders}</div>
+                    <div class='metric-note'>{orders_note}</div>
                 </div>""",
                 unsafe_allow_html=True
             )
@@ -339,19 +573,46 @@ if section == "📤 Upload Data":
         
         st.markdown("<br>", unsafe_allow_html=True)
         
+        # Sketch-backed summaries: one pass, bounded memory, with their error bounds
+        sketch = cube.sketch
+        distinct_customers = sketch.distinct_count("customers")
+        top_customers, top_products = sketch.top["customers"].top(10), sketch.top["products"].top(10)
+        if len(top_customers) or len(top_products) or distinct_customers is not None:
+            with st.expander("🏆 Top Customers & Products", expanded=False):
+                if distinct_customers is not None:
+                    st.markdown(
+                        f"**Distinct customers:** ≈{distinct_customers[0]:,} "
+                        f"(±{2 * distinct_customers[1]:.1%} at 95%)"
+                    )
+                col1, col2 = st.columns(2)
+                for col, label, top in [(col1, "Customer ID", top_customers), (col2, "Product ID", top_products)]:
+                    if len(top):
+                        with col:
+                            st.dataframe(top.rename(columns={
+                                "key": label, "estimate": "Sales (upper bound)",
+                                "guaranteed": "Sales (lower bound)", "error": "Max Error",
+                            }), hide_index=True, use_container_width=True)
+                st.caption("Top-10 by sales from a Space-Saving summary; each true total lies between the bounds.")
+
+        quantiles = sketch.quantile_table()
+        if not quantiles.empty:
+            with st.expander("📐 Sales & Profit Distribution", expanded=False):
+                st.dataframe(quantiles, use_container_width=True)
+                st.caption(f"Percentiles from a quantile sketch, each within ±{QUANTILE_ACCURACY:.0%} of the exact value.")
+
         # Data Preview
         with st.expander("📋 View Data Sample", expanded=False):
-            st.dataframe(df.head(10), use_container_width=True)
+            st.dataframe(cube.sample, use_container_width=True)
         
         # Data Info
         col1, col2 = st.columns(2)
         with col1:
             st.markdown("**Dataset Shape:**")
-            st.info(f"📊 {df.shape[0]} rows × {df.shape[1]} columns")
+            st.info(f"📊 {cube.shape[0]} rows × {cube.shape[1]} columns")
         
         with col2:
             st.markdown("**Missing Values:**")
-            missing = df.isnull().sum().sum()
+            missing = cube.missing
             if missing == 0:
                 st.success(f"✅ No missing values")
             else:
@@ -359,89 +620,102 @@ if section == "📤 Upload Data":
 
 # ================= EDA DASHBOARD =================
 if section == "📈 EDA Dashboard":
-    if st.session_state.df is None:
+    if st.session_state.cube is None:
         st.warning("⚠️ Please upload data first in the 'Upload Data' section.")
     else:
-        df = st.session_state.df
+        with tracer.span("import", section="eda"):
+            from charts import ChartSpec, eda_charts, render_charts
+        cube = st.session_state.cube
+        dataset = st.session_state.dataset
         
         st.markdown('<div class="section-header"><h2>Exploratory Data Analysis</h2></div>', unsafe_allow_html=True)
-        
-        # Configure matplotlib style
-        plt.style.use('dark_background')
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            fig, ax = plt.subplots(figsize=(10, 6))
-            sales_by_cat = df.groupby("Category")["Sales"].sum()
-            colors = ['#667eea', '#764ba2', '#f093fb']
-            sales_by_cat.plot(kind="bar", ax=ax, color=colors)
-            ax.set_title("Sales by Category", fontsize=16, fontweight='bold', pad=20)
-            ax.set_xlabel("Category", fontsize=12)
-            ax.set_ylabel("Sales ($)", fontsize=12)
-            ax.grid(axis='y', alpha=0.3)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            st.pyplot(fig)
-            st.markdown('</div>', unsafe_allow_html=True)
 
-        with col2:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            fig, ax = plt.subplots(figsize=(10, 6))
-            profit_by_region = df.groupby("Region")["Profit"].sum()
-            colors = ['#4facfe', '#00f2fe', '#43e97b', '#38f9d7']
-            profit_by_region.plot(kind="bar", ax=ax, color=colors)
-            ax.set_title("Profit by Region", fontsize=16, fontweight='bold', pad=20)
-            ax.set_xlabel("Region", fontsize=12)
-            ax.set_ylabel("Profit ($)", fontsize=12)
-            ax.grid(axis='y', alpha=0.3)
-            plt.xticks(rotation=45, ha='right')
-            plt.tight_layout()
-            st.pyplot(fig)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Additional Charts
-        st.markdown("<br>", unsafe_allow_html=True)
-        
-        col3, col4 = st.columns(2)
-        
-        if "Segment" in df.columns:
-            with col3:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig, ax = plt.subplots(figsize=(10, 6))
-                segment_sales = df.groupby("Segment")["Sales"].sum()
-                colors = ['#fa709a', '#fee140', '#30cfd0']
-                ax.pie(segment_sales, labels=segment_sales.index, autopct='%1.1f%%',
-                       colors=colors, startangle=90)
-                ax.set_title("Sales Distribution by Segment", fontsize=16, fontweight='bold', pad=20)
-                plt.tight_layout()
-                st.pyplot(fig)
-                st.markdown('</div>', unsafe_allow_html=True)
+        # Filters resolve against per-dataset indexes (built once), never a scan of the rows
+        view, index, drill_level = cube, None, None
+        if dataset is not None:
+            try:
+                # Columns are fetched through the store, so the cached index never pins the frame
+                index = index_for_dataset(partial(dataset_store.frame, dataset.digest), dataset.digest)
+                with st.expander("🔎 Filters & Drill-down", expanded=False):
+                    filter_cols = [col for col in FILTER_COLUMNS if col in index.columns]
+                    filters = {}
+                    for col, widget_col in zip(filter_cols, st.columns(len(filter_cols))):
+                        with widget_col:
+                            filters[col] = st.multiselect(col, list(index.labels(col)), key=f"filter_{col}_{dataset.digest[:12]}")
+
+                    date_range, bounds = None, index.date_bounds()
+                    if bounds is not None:
+                        full_range = (bounds[0].date(), bounds[1].date())
+                        picked = st.date_input(
+                            "Order Date range", value=full_range, min_value=full_range[0], max_value=full_range[1],
+                            key=f"filter_dates_{dataset.digest[:12]}"
+                        )
+                        if len(picked) == 2 and tuple(picked) != full_range:
+                            date_range = tuple(picked)
+
+                    # Category -> Sub-Category -> Product, each level narrowing the next one's options
+                    levels = [level for level in DRILL_LEVELS if level in index.columns]
+                    for level, widget_col in zip(levels[:-1], st.columns(max(len(levels) - 1, 1))):
+                        with widget_col:
+                            options = list(index.select(filters, date_range).totals(level, "Sales").index)
+                            choice = st.selectbox(level, ["All"] + options, key=f"drill_{level}_{dataset.digest[:12]}")
+                        if choice == "All":
+                            break
+                        filters[level] = [choice]
+                        drill_level = levels[levels.index(level) + 1]
+
+                with tracer.span("filter"):
+                    selection = index.select(filters, date_range)
+            except FileNotFoundError as e:
+                # The partitions behind a paged-out dataset were replaced or removed
+                st.error(f"❌ {e}. Reload the data in the '📤 Upload Data' section.")
+                index, drill_level, selection = None, None, None
+            if selection is not None and selection.positions is not None:
+                view = selection
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Filtered Sales", f"${selection.total_sales:,.0f}")
+                col2.metric("Filtered Profit", f"${selection.total_profit:,.0f}")
+                col3.metric("Filtered Line Items", f"{selection.total_orders:,}")
+                col4.metric("Avg Discount", f"{selection.avg_discount:.1%}")
+        else:
+            st.caption("Filters need a fully loaded dataset; streamed uploads show whole-dataset totals.")
+
+        # Rendered once per (chart spec, data) and served from the byte cache afterwards
+        if not view.total_orders:
+            st.warning("⚠️ No rows match the selected filters.")
+        with tracer.span("groupby", stage="eda_charts"):
+            charts = eda_charts(view) if view.total_orders else []
+            if drill_level is not None and view.total_orders:
+                charts.append((
+                    ChartSpec("barh", drill_level, "Sales", f"Top {drill_level} by Sales",
+                              ['#667eea'], "Sales ($)", drill_level, sort_values=True, grid_axis="x"),
+                    index.select(filters, date_range).top(drill_level, "Sales", 15)
+                ))
+        with tracer.span("render_charts", charts=len(charts)):
+            images = render_charts(charts)
         
-        if "Ship Mode" in df.columns:
-            with col4:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig, ax = plt.subplots(figsize=(10, 6))
-                ship_mode = df.groupby("Ship Mode")["Sales"].sum().sort_values()
-                colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe']
-                ship_mode.plot(kind="barh", ax=ax, color=colors)
-                ax.set_title("Sales by Shipping Mode", fontsize=16, fontweight='bold', pad=20)
-                ax.set_xlabel("Sales ($)", fontsize=12)
-                ax.set_ylabel("Ship Mode", fontsize=12)
-                ax.grid(axis='x', alpha=0.3)
-                plt.tight_layout()
-                st.pyplot(fig)
-                st.markdown('</div>', unsafe_allow_html=True)
+        for row_start in range(0, len(images), 2):
+            if row_start:
+                # Additional Charts
+                st.markdown("<br>", unsafe_allow_html=True)
+            
+            for col, image in zip(st.columns(2), images[row_start:row_start + 2]):
+                with col:
+                    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+                    st.image(image, use_container_width=True)
+                    st.markdown('</div>', unsafe_allow_html=True)
 
 # ================= ML + GENAI =================
 if section == "🤖 ML + GenAI":
-    if st.session_state.df is None:
+    if st.session_state.cube is None:
         st.warning("⚠️ Please upload data first in the 'Upload Data' section.")
     else:
-        df = st.session_state.df
-        total_sales = df["Sales"].sum()
-        total_profit = df["Profit"].sum()
+        with tracer.span("import", section="ml"):
+            from explain import attribution_summary, batch_summary, explainer_for
+        reg_model, clf_model, scaler, engine = load_models()
+        cube = st.session_state.cube
+        total_sales = cube.total_sales
+        total_profit = cube.total_profit
 
         st.markdown('<div class="section-header"><h2>Machine Learning Predictions</h2></div>', unsafe_allow_html=True)
 
@@ -472,13 +746,26 @@ if section == "🤖 ML + GenAI":
 
         if submit:
             try:
-                X = scaler.transform([[qty, disc, 2024, month, quarter]])
-                st.session_state.sales_pred = reg_model.predict(X)[0]
-                st.session_state.profit_pred = clf_model.predict(X)[0]
+                with tracer.span("predict", rows=1):
+                    if engine is not None:
+                        sales, profit = engine.predict([[qty, disc, 2024, month, quarter]])
+                    else:
+                        X = scaler.transform([[qty, disc, 2024, month, quarter]])
+                        sales, profit = reg_model.predict(X), clf_model.predict(X)
+                st.session_state.sales_pred = sales[0]
+                st.session_state.profit_pred = profit[0]
                 st.session_state.prediction_done = True
             except Exception as e:
                 st.error(f"❌ Prediction error: {str(e)}")
 
+            try:
+                # Memoized per input row; the explainers are built once per model version
+                with tracer.span("explain", rows=1):
+                    explanation = explainer_for(reg_model, clf_model, scaler).explain([qty, disc, 2024, month, quarter])
+                st.session_state.attribution = attribution_summary(explanation)
+            except Exception:
+                st.session_state.attribution = None
+
         if st.session_state.prediction_done:
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown('<div class="section-header"><h2>Prediction Results</h2></div>', unsafe_allow_html=True)
@@ -512,67 +799,375 @@ if section == "🤖 ML + GenAI":
             st.markdown("<br>", unsafe_allow_html=True)
             st.markdown('<div class="section-header"><h2>AI-Powered Insights</h2></div>', unsafe_allow_html=True)
             
+            profit_label = 'High' if st.session_state.profit_pred == 1 else 'Low'
+            # Token-budgeted summary of the whole dataset, built once per dataset from the cube
+            with tracer.span("digest"):
+                dataset_digest = digest_for_dataset(cube, st.session_state.dataset_hash)
+            insight_prompts = {
+                "explanation": f"""
+                    Explain this prediction in simple business terms.
+                    Base the explanation on the model's feature attributions (SHAP) below.
+
+                    Quantity: {qty}
+                    Discount: {disc}
+                    Month: {month}
+                    Quarter: {quarter}
+                    Predicted Sales: {st.session_state.sales_pred}
+                    Profit Category: {profit_label}
+
+                    Feature attributions:
+                    {st.session_state.attribution or "not available"}
+                    """,
+                "recommendations": f"""
+                    Total Sales: {total_sales}
+                    Total Profit: {total_profit}
+                    Predicted Sales: {st.session_state.sales_pred}
+
+                    Dataset digest:
+                    {dataset_digest}
+
+                    Provide 3 actionable business recommendations grounded in the digest.
+                    """,
+                "report": f"""
+                    Generate a business report with:
+                    - Executive Summary
+                    - Key Insights
+                    - Risks
+                    - Recommendations
+
+                    Total Sales: {total_sales}
+                    Total Profit: {total_profit}
+                    Predicted Sales: {st.session_state.sales_pred}
+
+                    Dataset digest:
+                    {dataset_digest}
+                    """,
+            }
+            
             col1, col2, col3 = st.columns(3)
+            requested = []
             
             with col1:
                 if st.button("🔍 Explain Prediction", use_container_width=True):
-                    with st.spinner("Analyzing..."):
-                        explanation = ask_genai(
-                            f"""
-                            Explain this prediction in simple business terms.
-
-                            Quantity: {qty}
-                            Discount: {disc}
-                            Month: {month}
-                            Quarter: {quarter}
-                            Predicted Sales: {st.session_state.sales_pred}
-                            Profit Category: {'High' if st.session_state.profit_pred == 1 else 'Low'}
-                            """
-                        )
-                        st.info(explanation)
+                    requested.append("explanation")
 
             with col2:
                 if st.button("💡 Get Recommendations", use_container_width=True):
-                    with st.spinner("Generating recommendations..."):
-                        recs = ask_genai(
-                            f"""
-                            Total Sales: {total_sales}
-                            Total Profit: {total_profit}
-                            Predicted Sales: {st.session_state.sales_pred}
-
-                            Provide 3 actionable business recommendations.
-                            """
-                        )
-                        st.success(recs)
+                    requested.append("recommendations")
 
             with col3:
                 if st.button("📄 Generate Report", use_container_width=True):
-                    with st.spinner("Creating comprehensive report..."):
-                        report = ask_genai(
-                            f"""
-                            Generate a business report with:
-                            - Executive Summary
-                            - Key Insights
-                            - Risks
-                            - Recommendations
-
-                            Total Sales: {total_sales}
-                            Total Profit: {total_profit}
-                            Predicted Sales: {st.session_state.sales_pred}
-                            """
-                        )
+                    requested.append("report")
+
+            if st.button("✨ Generate All Insights", use_container_width=True):
+                requested = list(insight_prompts)
+
+            # Answers stream into these slots token by token
+            slots = {
+                "explanation": col1.empty(),
+                "recommendations": col2.empty(),
+                "report": col3.empty(),
+            }
 
+            if requested:
+                # Without an API key the attribution summary is the explanation
+                if genai_executor is None and "explanation" in requested and st.session_state.attribution:
+                    requested.remove("explanation")
+                    slots["explanation"].info("**Model feature attributions (SHAP)**\n\n" + st.session_state.attribution)
+
+                for name in requested:
+                    slots[name].caption("⏳ Generating...")
+
+                answers = ask_genai_many(
+                    {name: insight_prompts[name] for name in requested},
+                    on_update=lambda name, text: slots[name].markdown(text + " ▌")
+                )
+
+                if "explanation" in answers:
+                    slots["explanation"].info(answers["explanation"])
+
+                if "recommendations" in answers:
+                    slots["recommendations"].success(answers["recommendations"])
+
+                if "report" in answers:
+                    report = answers["report"]
+                    with slots["report"].container():
                         st.text_area("📋 AI Generated Report", report, height=300)
 
-                        pdf = generate_pdf(report)
-                        with open(pdf, "rb") as f:
-                            st.download_button(
-                                "⬇️ Download PDF Report",
-                                f,
-                                file_name="Business_Report.pdf",
-                                mime="application/pdf",
-                                use_container_width=True
-                            )
+                        # Built in memory (no shared file on disk) and cached by report content
+                        kpis = [
+                            ("Total Sales", f"${total_sales:,.0f}"),
+                            ("Total Profit", f"${total_profit:,.0f}"),
+                            ("Total Orders", f"≈{cube.distinct_orders[0]:,}" if cube.distinct_orders else f"{cube.total_orders:,}"),
+                            ("Avg Discount", f"{cube.avg_discount:.1%}"),
+                            ("Predicted Sales", f"${st.session_state.sales_pred:,.2f}"),
+                            ("Profit Category", profit_label),
+                        ]
+                        with tracer.span("import", section="report"):
+                            from charts import eda_charts, render_charts
+                            from report import REPORT_CHART_DPI, generate_pdf
+                        with tracer.span("pdf"):
+                            pdf = generate_pdf(report, kpis, render_charts(eda_charts(cube), dpi=REPORT_CHART_DPI))
+                        st.download_button(
+                            "⬇️ Download PDF Report",
+                            pdf,
+                            file_name="Business_Report.pdf",
+                            mime="application/pdf",
+                            use_container_width=True
+                        )
+
+        # ================= BATCH & SCENARIO PREDICTIONS =================
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown('<div class="section-header"><h2>Batch & Scenario Predictions</h2></div>', unsafe_allow_html=True)
+
+        tab_upload, tab_grid = st.tabs(["📂 Scenario File", "🧮 Scenario Grid"])
+
+        with tab_upload:
+            scenario_file = st.file_uploader(
+                "Upload scenario CSV",
+                type=["csv"],
+                help="Columns: Quantity, Discount, Month (optional: Year, Quarter)"
+            )
+            if scenario_file and st.button("🚀 Score Scenarios", use_container_width=True):
+                try:
+                    scenarios = prepare_scenarios(pd.read_csv(scenario_file))
+                    with st.spinner("Scoring scenarios..."), tracer.span("predict", rows=len(scenarios)):
+                        results, stats = predict_batch(scenarios, reg_model, clf_model, scaler)
+                    st.session_state.batch_result = ("file", results, stats)
+                except Exception as e:
+                    st.error(f"❌ Batch prediction error: {str(e)}")
+
+        with tab_grid:
+            with st.form("grid_form"):
+                col_a, col_b = st.columns(2)
+                with col_a:
+                    qty_range = st.slider("Quantity range", min_value=1, max_value=100, value=(1, 100))
+                    disc_step = st.select_slider("Discount step", options=[0.05, 0.1, 0.2], value=0.1)
+                with col_b:
+                    grid_months = st.multiselect("Months", list(range(1, 13)), default=list(range(1, 13)))
+                run_grid = st.form_submit_button("🧮 Run Scenario Grid", use_container_width=True)
+
+            if run_grid:
+                try:
+                    grid = scenario_grid(
+                        range(qty_range[0], qty_range[1] + 1),
+                        [i * disc_step for i in range(int(round(1 / disc_step)) + 1)],
+                        grid_months or [1]
+                    )
+                    with st.spinner("Sweeping scenarios..."), tracer.span("predict", rows=len(grid)):
+                        results, stats = predict_batch(grid, reg_model, clf_model, scaler)
+                    st.session_state.batch_result = ("grid", results, stats)
+                except Exception as e:
+                    st.error(f"❌ Batch prediction error: {str(e)}")
+
+        if st.session_state.batch_result is not None:
+            mode, results, stats = st.session_state.batch_result
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Scenarios Scored", f"{stats['rows']:,}")
+            col2.metric("Time", f"{stats['seconds']:.2f} s")
+            col3.metric("Throughput", f"{stats['rows_per_sec']:,.0f} rows/sec")
+
+            if mode == "grid":
+                import matplotlib.pyplot as plt
+                plt.style.use('dark_background')
+                heat_source = results.assign(High_Profit=(results["Profit Class"] == "High").astype(float))
+                col1, col2 = st.columns(2)
+                for col, value_col, title, cmap in [
+                    (col1, "Predicted Sales", "Predicted Sales (avg over months)", "viridis"),
+                    (col2, "High_Profit", "High Profit Share (avg over months)", "RdYlGn"),
+                ]:
+                    with col:
+                        heat = heat_source.pivot_table(index="Quantity", columns="Discount", values=value_col, aggfunc="mean")
+                        fig, ax = plt.subplots(figsize=(10, 6))
+                        im = ax.imshow(heat.values, aspect="auto", origin="lower", cmap=cmap,
+                                       extent=[heat.columns.min(), heat.columns.max(), heat.index.min(), heat.index.max()])
+                        fig.colorbar(im, ax=ax)
+                        ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
+                        ax.set_xlabel("Discount", fontsize=12)
+                        ax.set_ylabel("Quantity", fontsize=12)
+                        plt.tight_layout()
+                        with tracer.span("pyplot", chart="scenario_heatmap"):
+                            st.pyplot(fig)
+                        plt.close(fig)
+            else:
+                st.dataframe(results.head(100), use_container_width=True)
+
+            if st.button("🧮 Explain Scenarios", use_container_width=True):
+                try:
+                    with st.spinner("Computing feature attributions..."), tracer.span("explain", rows=len(results)):
+                        sales_attr, profit_attr = explainer_for(reg_model, clf_model, scaler).explain_batch(
+                            results[FEATURES].to_numpy()
+                        )
+                    st.session_state.batch_attribution = (id(results), batch_summary(sales_attr, profit_attr))
+                except Exception as e:
+                    st.error(f"❌ Explanation error: {str(e)}")
+
+            batch_attribution = st.session_state.batch_attribution
+            if batch_attribution is not None and batch_attribution[0] == id(results):
+                st.markdown("**🧮 What drives these scenarios (SHAP)**")
+                st.dataframe(batch_attribution[1], hide_index=True, use_container_width=True)
+
+            st.download_button(
+                "⬇️ Download Predictions (CSV)",
+                results.to_csv(index=False).encode("utf-8"),
+                file_name="batch_predictions.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+# ================= FORECAST =================
+if section == "📉 Forecast":
+    if st.session_state.cube is None:
+        st.warning("⚠️ Please upload data first in the 'Upload Data' section.")
+    else:
+        with tracer.span("import", section="forecast"):
+            import matplotlib.pyplot as plt
+            from forecasting import DEFAULT_HORIZON, daily_series, forecast_all, forecast_table, monthly_series
+        cube = st.session_state.cube
+        dataset = st.session_state.dataset
+
+        st.markdown('<div class="section-header"><h2>Sales Forecast</h2></div>', unsafe_allow_html=True)
+
+        # Streamed datasets only keep the monthly cube, so they forecast by month
+        daily = dataset is not None
+        groupings = {"Category × Region": ["Category", "Region"]}
+        if daily and "Sub-Category" in dataset.columns:
+            groupings["Sub-Category × Region"] = ["Sub-Category", "Region"]
+
+        with st.form("forecast_form"):
+            col_a, col_b = st.columns(2)
+            with col_a:
+                grouping = st.selectbox("Forecast per", list(groupings))
+            with col_b:
+                horizon = st.slider(
+                    "Horizon (days)" if daily else "Horizon (months)",
+                    min_value=1,
+                    max_value=90 if daily else 12,
+                    value=DEFAULT_HORIZON if daily else 6
+                )
+            run_forecast = st.form_submit_button("📉 Run Forecast", use_container_width=True)
+
+        if run_forecast:
+            group_cols = [col for col in groupings[grouping] if col in cube.columns]
+            try:
+                with tracer.span("groupby", stage="forecast_series"):
+                    wide = daily_series(dataset.frame(), group_cols) if daily else monthly_series(cube, group_cols)
+                progress = st.progress(0.0, text="Fitting forecasts...")
+                with tracer.span("forecast", series=wide.shape[1]):
+                    results, stats = forecast_all(
+                        wide, group_cols, horizon,
+                        on_progress=lambda done: progress.progress(done, text=f"Fitting forecasts... {done:.0%}")
+                    )
+                progress.empty()
+                st.session_state.forecast_result = (st.session_state.upload_id, group_cols, results, stats)
+            except FileNotFoundError as e:
+                st.error(f"❌ {e}. Reload the data in the '📤 Upload Data' section.")
+            except Exception as e:
+                st.error(f"❌ Forecast error: {str(e)}")
+
+        forecast_result = st.session_state.forecast_result
+        if forecast_result is not None and forecast_result[0] == st.session_state.upload_id:
+            _, group_cols, results, stats = forecast_result
+
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Series", f"{stats['series']:,}")
+            col2.metric("Reused Fits", f"{stats['cached'] + stats['filter'] + stats['warm']:,}")
+            col3.metric("Time", f"{stats['seconds']:.2f} s")
+
+            labels = {" / ".join(map(str, group if isinstance(group, tuple) else (group,))): group for group in results}
+            label = st.selectbox("Series", list(labels))
+            selected = results[labels[label]]
+
+            plt.style.use('dark_background')
+            fig, ax = plt.subplots(figsize=(10, 6))
+            history = selected.history.iloc[-6 * len(selected.mean):]
+            ax.plot(history.index, history.values, color='#667eea', label="Actual")
+            ax.plot(selected.mean.index, selected.mean.values, color='#f093fb', label="Forecast")
+            ax.fill_between(selected.mean.index, selected.lower.values, selected.upper.values,
+                            color='#f093fb', alpha=0.2, label="95% interval")
+            ax.set_title(f"Sales Forecast: {label}", fontsize=16, fontweight='bold', pad=20)
+            ax.set_ylabel("Sales ($)", fontsize=12)
+            ax.legend()
+            ax.grid(axis="y", alpha=0.3)
+            plt.tight_layout()
+            with tracer.span("pyplot", chart="forecast"):
+                st.pyplot(fig)
+            plt.close(fig)
+
+            table = forecast_table(results, group_cols)
+            totals = (
+                table.groupby(group_cols)["Forecast"].sum()
+                .sort_values(ascending=False)
+                .rename("Forecast Sales")
+                .reset_index()
+            )
+            st.dataframe(totals, hide_index=True, use_container_width=True)
+            st.download_button(
+                "⬇️ Download Forecasts (CSV)",
+                table.to_csv(index=False).encode("utf-8"),
+                file_name="sales_forecast.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+
+# ================= REVIEW SENTIMENT =================
+if section == "💬 Review Sentiment":
+    with tracer.span("import", section="sentiment"):
+        from sentiment import score_reviews, with_sales
+    st.markdown('<div class="section-header"><h2>Review Sentiment</h2></div>', unsafe_allow_html=True)
+
+    reviews_file = st.file_uploader(
+        "Upload reviews CSV",
+        type=["csv"],
+        help="Columns: review_text (optional: Product ID, Category)"
+    )
+    if reviews_file and st.button("💬 Score Reviews", use_container_width=True):
+        try:
+            progress = st.progress(0.0, text="Scoring reviews...")
+            reviews_file.seek(0)
+            with tracer.span("sentiment", bytes=reviews_file.size):
+                rollup, stats = score_reviews(
+                    reviews_file,
+                    total_bytes=reviews_file.size,
+                    on_progress=lambda done: progress.progress(done, text=f"Scoring reviews... {done:.0%}")
+                )
+            progress.empty()
+            st.session_state.sentiment_result = (rollup, stats)
+        except Exception as e:
+            st.error(f"❌ Sentiment scoring error: {str(e)}")
+
+    if st.session_state.sentiment_result is not None:
+        rollup, stats = st.session_state.sentiment_result
+        overall = rollup.summary()
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Reviews Scored", f"{stats['rows']:,}")
+        col2.metric("Positive Share", f"{overall['Positive'].sum() / max(overall['Reviews'].sum(), 1):.1%}")
+        col3.metric("Throughput", f"{stats['rows_per_sec']:,.0f} rows/sec")
+
+        if rollup.group_cols:
+            # Joined to the loaded dataset's Sales/Profit when one is uploaded
+            dataset, sales_frame = st.session_state.dataset, None
+            if dataset is not None:
+                try:
+                    sales_frame = dataset.frame()
+                except FileNotFoundError as e:
+                    st.error(f"❌ {e}. Reload the data in the '📤 Upload Data' section.")
+            tabs = st.tabs([f"By {col}" for col in rollup.group_cols])
+            for tab, group_col in zip(tabs, rollup.group_cols):
+                with tab:
+                    summary = with_sales(
+                        rollup.summary(group_col), group_col, st.session_state.cube, sales_frame
+                    ).sort_values("Reviews", ascending=False)
+                    st.dataframe(summary.head(500), hide_index=True, use_container_width=True)
+                    st.download_button(
+                        f"⬇️ Download Sentiment by {group_col} (CSV)",
+                        summary.to_csv(index=False).encode("utf-8"),
+                        file_name=f"sentiment_by_{group_col.lower().replace(' ', '_')}.csv",
+                        mime="text/csv",
+                        use_container_width=True
+                    )
 
 # ================= FOOTER =================
 st.markdown("""
@@ -580,4 +1175,6 @@ st.markdown("""
     <p>Built with 💙 using Python • Machine Learning • GenAI • Streamlit</p>
     <p style="font-size: 12px; margin-top: 10px;">© 2025 AI Business Intelligence Platform</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+tracer.end_rerun()
@@ -0,0 +1,93 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# ================= BATCH CONFIG =================
+FEATURES = ["Quantity", "Discount", "Year", "Month", "Quarter"]
+DEFAULT_YEAR = 2024
+DEFAULT_CHUNK_ROWS = 20_000
+
+
+# ================= SCENARIO INPUTS =================
+def prepare_scenarios(df):
+    """Validate a scenario table and fill the optional Year/Quarter columns."""
+    df = df.copy()
+    df.columns = df.columns.str.strip()
+
+    missing = [col for col in ["Quantity", "Discount", "Month"] if col not in df.columns]
+    if missing:
+        raise ValueError(f"Scenario file is missing required columns: {', '.join(missing)}")
+
+    if "Year" not in df.columns:
+        df["Year"] = DEFAULT_YEAR
+    if "Quarter" not in df.columns:
+        df["Quarter"] = (df["Month"] - 1) // 3 + 1
+    return df
+
+
+def scenario_grid(quantities, discounts, months, year=DEFAULT_YEAR):
+    """Full cartesian grid of quantity x discount x month scenarios."""
+    qty, disc, month = np.meshgrid(
+        np.asarray(quantities), np.asarray(discounts), np.asarray(months), indexing="ij"
+    )
+    grid = pd.DataFrame({
+        "Quantity": qty.ravel(),
+        "Discount": disc.ravel().round(4),
+        "Month": month.ravel(),
+    })
+    grid["Year"] = year
+    grid["Quarter"] = (grid["Month"] - 1) // 3 + 1
+    return grid[FEATURES]
+
+
+# ================= VECTORIZED PREDICTION =================
+def predict_rows(X, reg_model, clf_model, scaler):
+    """One scaler pass and one predict call per model for a block of feature rows."""
+    if not isinstance(X, pd.DataFrame):
+        # Keep the feature names the scaler was fitted with
+        X = pd.DataFrame(np.asarray(X, dtype="float64").reshape(-1, len(FEATURES)), columns=FEATURES)
+    X_scaled = scaler.transform(X)
+    return reg_model.predict(X_scaled), clf_model.predict(X_scaled)
+
+
+def predict_batch(scenarios, reg_model, clf_model, scaler,
+                  chunk_rows=DEFAULT_CHUNK_ROWS, workers=None):
+    """Score every scenario row with one scaler pass and one predict call per chunk.
+
+    Chunks run on a thread pool: the forests release the GIL while walking
+    trees, and threads share the loaded models instead of copying them.
+    Returns ``(results, stats)`` where stats holds rows, seconds and rows/sec.
+    """
+    start = time.perf_counter()
+    X = scenarios[FEATURES].to_numpy(dtype="float64")
+    chunks = [X[i:i + chunk_rows] for i in range(0, len(X), chunk_rows)]
+
+    workers = workers or os.cpu_count() or 1
+    if len(chunks) <= 1 or workers == 1:
+        parts = [predict_rows(chunk, reg_model, clf_model, scaler) for chunk in chunks]
+    else:
+        with ThreadPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            parts = list(pool.map(
+                lambda chunk: predict_rows(chunk, reg_model, clf_model, scaler), chunks
+            ))
+
+    results = scenarios.reset_index(drop=True).copy()
+    if parts:
+        results["Predicted Sales"] = np.concatenate([sales for sales, _ in parts])
+        results["Profit Class"] = np.where(
+            np.concatenate([profit for _, profit in parts]) == 1, "High", "Low"
+        )
+    else:
+        results["Predicted Sales"] = pd.Series(dtype="float64")
+        results["Profit Class"] = pd.Series(dtype="object")
+
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": len(results),
+        "seconds": seconds,
+        "rows_per_sec": len(results) / seconds if seconds > 0 else 0.0,
+    }
+    return results, stats
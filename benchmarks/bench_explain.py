@@ -0,0 +1,57 @@
+"""Benchmark TreeSHAP explanation latency for single rows and scenario grids.
+
+    python benchmarks/bench_explain.py [--model-dir ../model] [--rows 200]
+
+Reports p50/p99 for cold (unmemoized) and memoized single-row
+explanations, then a full quantity x discount x month grid twice.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from batch_predict import DEFAULT_YEAR, scenario_grid  # noqa: E402
+from explain import ExplanationEngine  # noqa: E402
+from model_registry import MODEL_DIR, registry  # noqa: E402
+
+
+def percentiles(latencies):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    return f"p50 {p50:7.2f} ms   p99 {p99:7.2f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--rows", type=int, default=200)
+    args = parser.parse_args()
+
+    models = registry.get_many(args.model_dir)
+    start = time.perf_counter()
+    engine = ExplanationEngine(*models)
+    print(f"Explainers built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    rng = np.random.default_rng(42)
+    rows = [[int(rng.integers(1, 101)), round(float(rng.choice(np.arange(0, 1.05, 0.05))), 2),
+             DEFAULT_YEAR, month, (month - 1) // 3 + 1] for month in rng.integers(1, 13, args.rows)]
+    for label in ("cold", "memoized"):
+        latencies = []
+        for row in rows:
+            engine.explain(row)
+            latencies.append(engine.last_seconds)
+        print(f"single row, {label:<9} {percentiles(latencies)}")
+
+    grid = scenario_grid(range(1, 101), [i * 0.1 for i in range(11)], range(1, 13)).to_numpy()
+    for label in ("cold", "memoized"):
+        start = time.perf_counter()
+        engine.explain_batch(grid)
+        print(f"grid of {len(grid):,} rows, {label:<9} {time.perf_counter() - start:.3f} s")
+
+
+if __name__ == "__main__":
+    main()
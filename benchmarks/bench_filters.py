@@ -0,0 +1,109 @@
+"""Benchmark dashboard filtering: boolean-mask scans vs the prebuilt filter index.
+
+    python benchmarks/bench_filters.py [--rows 10m] [--source 1m]
+
+The ``--source`` synthetic dataset (``synthetic_data.py``) is loaded once
+and its dashboard columns tiled up to ``--rows``, so 10M rows fit in a few
+GB. Each filter combination is answered both ways (KPIs plus the four EDA
+chart groupbys) and checked for equal totals.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from charts import EDA_CHARTS  # noqa: E402
+from data_cache import parse_csv  # noqa: E402
+from filter_index import FilterIndex  # noqa: E402
+from run_suite import DEFAULT_DATA_DIR  # noqa: E402
+from synthetic_data import SIZES, dataset_path  # noqa: E402
+
+COLUMNS = ["Order Date", "Region", "Category", "Sub-Category", "Segment", "Ship Mode", "State",
+           "Sales", "Profit", "Discount"]
+CASES = [
+    ("one region", {"Region": ["West"]}, None),
+    ("region x category", {"Region": ["West", "East"], "Category": ["Furniture"]}, None),
+    ("state + year", {"State": ["Texas"]}, ("2016-01-01", "2016-12-31")),
+    ("segment + quarter", {"Segment": ["Consumer"]}, ("2015-04-01", "2015-06-30")),
+    ("drill to sub-category", {"Category": ["Technology"], "Sub-Category": ["Phones"]}, None),
+]
+
+
+def load(source_rows, rows, data_dir):
+    with open(dataset_path(data_dir, source_rows), "rb") as f:
+        df = parse_csv(f.read())[COLUMNS]
+    for col in ("Sub-Category",):
+        df[col] = df[col].astype("category")
+    if rows > len(df):
+        df = df.iloc[np.resize(np.arange(len(df)), rows)].reset_index(drop=True)
+    return df
+
+
+def scan(df, filters, date_range):
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in filters.items():
+        mask &= df[col].isin(values).to_numpy()
+    if date_range is not None:
+        dates = df["Order Date"]
+        mask &= ((dates >= date_range[0]) & (dates < pd.Timestamp(date_range[1]) + pd.Timedelta(days=1))).to_numpy()
+    sub = df[mask]
+    kpis = (sub["Sales"].sum(), sub["Profit"].sum(), len(sub), sub["Discount"].mean())
+    return kpis, [sub.groupby(spec.group_col, observed=True)[spec.value_col].sum() for spec in EDA_CHARTS]
+
+
+def indexed(index, filters, date_range):
+    selection = index.select(filters, date_range)
+    kpis = (selection.total_sales, selection.total_profit, selection.total_orders, selection.avg_discount)
+    return kpis, [selection.totals(spec.group_col, spec.value_col) for spec in EDA_CHARTS]
+
+
+def timed(fn, repeat=3):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, float(np.median(times))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10m", help=f"Row count or one of {', '.join(SIZES)}")
+    parser.add_argument("--source", default="1m", help="Synthetic dataset size to tile from")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows.lower()) or int(args.rows)
+    source = SIZES.get(args.source.lower()) or int(args.source)
+    df = load(source, rows, args.data_dir)
+    print(f"{len(df):,} rows, {df.memory_usage(deep=True).sum() / 1e6:,.0f} MB")
+
+    index = FilterIndex(lambda: df)
+    start = time.perf_counter()
+    for col in ("Region", "Category", "Sub-Category", "Segment", "Ship Mode", "State"):
+        index._posting_list(col)
+    index._date_index()
+    for col in ("Sales", "Profit", "Discount"):
+        index.measure(col)
+    print(f"index build (all columns) {time.perf_counter() - start:.2f} s")
+
+    print(f"\n{'filter':<24} {'rows':>11} {'scan s':>9} {'index s':>9} {'speedup':>8}")
+    for name, filters, date_range in CASES:
+        (scan_kpis, scan_charts), scan_s = timed(lambda: scan(df, filters, date_range))
+        index._selections.clear()
+        (index_kpis, index_charts), index_s = timed(lambda: indexed(index, filters, date_range), repeat=1)
+        assert np.allclose(scan_kpis[:3], index_kpis[:3]) and np.isclose(scan_kpis[3], index_kpis[3], equal_nan=True)
+        for expected, actual in zip(scan_charts, index_charts):
+            assert np.allclose(expected.sort_index().to_numpy(), actual.sort_index().to_numpy())
+        print(f"{name:<24} {index_kpis[2]:>11,} {scan_s:>9.3f} {index_s:>9.3f} {scan_s / index_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Benchmark per-segment forecasting: cold fit, cached rerun and new dates.
+
+    python benchmarks/bench_forecast.py [--group Sub-Category Region] [--workers 1 4]
+
+The "new dates" run first forecasts the series without their last
+``--new-days`` days, then forecasts the full series so the cached fits are
+reused incrementally.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import forecasting  # noqa: E402
+from data_cache import load_dataset  # noqa: E402
+from forecasting import ForecastCache, daily_series, forecast_all  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "superstore.csv"))
+    parser.add_argument("--group", nargs="+", default=["Category", "Region"])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--new-days", type=int, default=30)
+    args = parser.parse_args()
+
+    with open(args.csv, "rb") as f:
+        df, _ = load_dataset(f.read())
+    start = time.perf_counter()
+    wide = daily_series(df, args.group)
+    print(f"Resampled {wide.shape[1]} series x {wide.shape[0]} days in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'run':<26} {'workers':>7} {'seconds':>9}  modes")
+    for workers in sorted(set(args.workers)):
+        # Fresh, empty cache per worker count so every cold run really fits
+        forecasting.forecast_cache = ForecastCache(tempfile.mkdtemp())
+        runs = [
+            ("cold fit", wide),
+            ("cached rerun", wide),
+            (f"cold fit minus {args.new_days} days", None),
+            (f"+{args.new_days} new days", wide),
+        ]
+        for label, frame in runs:
+            if frame is None:
+                forecasting.forecast_cache = ForecastCache(tempfile.mkdtemp())
+                frame = wide.iloc[:-args.new_days]
+            _, stats = forecast_all(frame, args.group, workers=workers)
+            modes = ", ".join(f"{mode}={stats[mode]}" for mode in ("fit", "warm", "filter", "cached") if stats[mode])
+            print(f"{label:<26} {workers:>7} {stats['seconds']:>9.2f}  {modes}")
+
+
+if __name__ == "__main__":
+    main()
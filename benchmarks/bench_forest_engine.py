@@ -0,0 +1,160 @@
+"""Parity check and latency micro-benchmark for the array forest engine.
+
+    python benchmarks/bench_forest_engine.py [--model-dir ../model]
+
+Compares ``forest_engine.engine_for`` against sklearn's
+``scaler.transform`` + ``predict``: first on small forests fitted here on
+synthetic rows (self-contained, no artifacts needed), then on the shipped
+artifacts when ``--model-dir`` holds them, and reports p50/p99 latency
+for batch sizes 1, 100 and 100k. Both checks include rows placed exactly
+on, and one float ulp either side of, the forests' float32 split
+thresholds.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import joblib  # noqa: E402
+
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor  # noqa: E402
+from sklearn.preprocessing import StandardScaler  # noqa: E402
+
+from forest_engine import engine_for  # noqa: E402
+
+ARTIFACTS = ["sales_regression.pkl", "profit_classifier.pkl", "scaler.pkl"]
+
+BATCH_SIZES = [1, 100, 100_000]
+REPEATS = {1: 500, 100: 200, 100_000: 5}
+
+
+def random_rows(n, seed=0):
+    rng = np.random.default_rng(seed)
+    month = rng.integers(1, 13, n)
+    return np.column_stack([
+        rng.integers(1, 15, n),
+        rng.choice([0.0, 0.1, 0.15, 0.2, 0.3, 0.4, 0.45, 0.5, 0.6, 0.7, 0.8], n),
+        rng.integers(2014, 2025, n),
+        month,
+        (month - 1) // 3 + 1,
+    ]).astype(np.float64)
+
+
+def synthetic_models(seed=0):
+    """Small regressor/classifier/scaler fitted on synthetic rows, shaped like the shipped ones."""
+    rng = np.random.default_rng(seed)
+    X = random_rows(5_000, seed=seed)
+    # Continuous jitter so the forests split between arbitrary values, not only the grid
+    X[:, :2] += rng.normal(0, 0.01, (len(X), 2))
+    sales = 40 * X[:, 0] * (1 - X[:, 1]) + 5 * X[:, 3] + rng.normal(0, 20, len(X))
+    high_profit = (X[:, 1] < 0.2) ^ (rng.random(len(X)) < 0.1)
+    scaler = StandardScaler().fit(X)
+    X_scaled = scaler.transform(X)
+    reg_model = RandomForestRegressor(n_estimators=25, max_depth=10, random_state=seed).fit(X_scaled, sales)
+    clf_model = RandomForestClassifier(n_estimators=25, max_depth=10, random_state=seed).fit(X_scaled, high_profit)
+    return reg_model, clf_model, scaler
+
+
+def threshold_rows(models, scaler, n_nodes=2_000, seed=2):
+    """Raw rows whose scaled value on a split's feature lands on that split's float32 boundary.
+
+    For sampled split nodes, the float32 values just at/above the threshold
+    are mapped back through the scaler, and nudged one float64 ulp each way
+    so rounding in ``transform`` is covered too.
+    """
+    rng = np.random.default_rng(seed)
+    splits = []
+    for model in models:
+        for tree in model.estimators_:
+            nodes = tree.tree_.feature >= 0
+            splits.append(np.column_stack([tree.tree_.feature[nodes], tree.tree_.threshold[nodes]]))
+    splits = np.concatenate(splits)
+    splits = splits[rng.choice(len(splits), min(n_nodes, len(splits)), replace=False)]
+
+    rows = []
+    base = random_rows(len(splits), seed=seed)
+    for (feature, threshold), row in zip(splits, base):
+        feature = int(feature)
+        t32 = np.float32(threshold)
+        for value in {t32, np.nextafter(t32, np.float32(-np.inf)), np.nextafter(t32, np.float32(np.inf))}:
+            raw = float(value) * scaler.scale_[feature] + scaler.mean_[feature]
+            for x in (np.nextafter(raw, -np.inf), raw, np.nextafter(raw, np.inf)):
+                edge = row.copy()
+                edge[feature] = x
+                rows.append(edge)
+    return np.array(rows)
+
+
+def sklearn_predict(X, reg_model, clf_model, scaler):
+    X_scaled = scaler.transform(X)
+    return reg_model.predict(X_scaled), clf_model.predict(X_scaled)
+
+
+def check_parity(engine, reg_model, clf_model, scaler):
+    X = np.vstack([random_rows(20_000, seed=1), threshold_rows([reg_model, clf_model], scaler)])
+    X_scaled = scaler.transform(X)
+    sales_ref, profit_ref = reg_model.predict(X_scaled), clf_model.predict(X_scaled)
+    sales, profit = engine.predict(X)
+    proba_err = np.abs(clf_model.predict_proba(X_scaled) - engine.clf.predict_proba(X)).max()
+
+    sales_err = np.abs(sales - sales_ref).max()
+    class_mismatches = int((profit != profit_ref).sum())
+    print(f"parity on {len(X):,} rows: max |sales diff| = {sales_err:.3e}, max |proba diff| = {proba_err:.3e}, "
+          f"class mismatches = {class_mismatches}")
+    return np.allclose(sales, sales_ref, rtol=1e-9, atol=1e-6) and class_mismatches == 0
+
+
+def latency(fn, X, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings.append(time.perf_counter() - start)
+    return np.percentile(timings, 50) * 1000, np.percentile(timings, 99) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model-dir", default=os.path.join(os.path.dirname(ROOT), "model"))
+    args = parser.parse_args()
+
+    print("synthetic forests:")
+    models = synthetic_models()
+    if not check_parity(engine_for(*models), *models):
+        print("parity check FAILED")
+        sys.exit(1)
+
+    paths = [os.path.join(args.model_dir, name) for name in ARTIFACTS]
+    if not all(os.path.exists(path) for path in paths):
+        print(f"\nno artifacts in {args.model_dir}; skipping the shipped-model check and latency")
+        return
+    reg_model, clf_model, scaler = (joblib.load(path) for path in paths)
+
+    print("\nshipped artifacts:")
+    start = time.perf_counter()
+    engine = engine_for(reg_model, clf_model, scaler)
+    print(f"compile: {(time.perf_counter() - start) * 1000:.1f} ms, "
+          f"{len(engine.reg.feature) + len(engine.clf.feature):,} nodes")
+
+    if not check_parity(engine, reg_model, clf_model, scaler):
+        print("parity check FAILED")
+        sys.exit(1)
+
+    print(f"{'batch':>8} {'backend':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in BATCH_SIZES:
+        X = random_rows(size, seed=size)
+        for name, fn in [
+            ("sklearn", lambda X: sklearn_predict(X, reg_model, clf_model, scaler)),
+            ("array", engine.predict),
+        ]:
+            p50, p99 = latency(fn, X, REPEATS[size])
+            print(f"{size:>8} {name:>8} {p50:>10.3f} {p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Benchmark multi-file ingestion into the partitioned store and pruned reads.
+
+    python benchmarks/bench_ingest.py [--size 1m] [--workers 4]
+
+The synthetic dataset is split into one CSV per order month (as monthly
+exports arrive). All but the last month are ingested serially and then on
+a process pool; the last month is then added on its own to time the
+incremental path. Pruned reads (one region, one quarter) are compared
+with reading every partition, and row counts and totals are checked
+against the source frame.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_cache import CSV_ENCODING, parse_csv  # noqa: E402
+from partition_store import PartitionStore  # noqa: E402
+from run_suite import DEFAULT_DATA_DIR  # noqa: E402
+from synthetic_data import SIZES, dataset_path  # noqa: E402
+
+
+def split_by_month(df, out_dir):
+    paths = []
+    months = df["Order Date"].dt.strftime("%Y-%m")
+    for month, part in df.groupby(months, sort=True):
+        path = os.path.join(out_dir, f"superstore_{month}.csv")
+        part.to_csv(path, index=False, encoding=CSV_ENCODING, date_format="%m/%d/%Y")
+        paths.append((os.path.basename(path), path))
+    return paths
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1m", help=f"Row count or one of {', '.join(SIZES)}")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.size.lower()) or int(args.size)
+    with open(dataset_path(args.data_dir, rows), "rb") as f:
+        df = parse_csv(f.read())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, "exports"))
+        files = split_by_month(df, os.path.join(tmp, "exports"))
+        history, latest = files[:-1], files[-1:]
+        print(f"{len(df):,} rows split into {len(files)} monthly CSVs\n")
+
+        for workers in sorted({1, args.workers}):
+            store = PartitionStore(os.path.join(tmp, f"store-{workers}"))
+            results, seconds = timed(lambda: store.ingest(history, workers=workers))
+            assert all(result["status"] == "ingested" for result in results)
+            print(f"ingest {len(history)} files, {workers} worker(s): {seconds:.2f} s")
+
+        _, seconds = timed(lambda: store.ingest(history, workers=args.workers))
+        print(f"re-ingest the same files (skipped by digest): {seconds:.2f} s")
+        results, seconds = timed(lambda: store.ingest(latest, workers=args.workers))
+        print(f"add next month ({results[0]['rows']:,} rows, {len(results[0]['partitions'])} partitions): {seconds:.2f} s")
+
+        full, full_s = timed(store.read)
+        assert len(full) == len(df) and np.isclose(full["Sales"].sum(), df["Sales"].sum())
+        months = store.months()
+        quarter = (months[-3], months[-1])
+        region = store.regions()[0]
+        pruned, pruned_s = timed(lambda: store.read(quarter, [region]))
+        dates = df["Order Date"].dt.strftime("%Y-%m")
+        expected = df[(df["Region"] == region) & (dates >= quarter[0]) & (dates <= quarter[1])]
+        assert len(pruned) == len(expected) and np.isclose(pruned["Sales"].sum(), expected["Sales"].sum())
+        print(f"\nread all {len(store.partitions())} partitions: {len(full):,} rows in {full_s:.2f} s")
+        print(f"read {region} {quarter[0]}..{quarter[1]} ({len(store.partitions(quarter, [region]))} partitions): "
+              f"{len(pruned):,} rows in {pruned_s:.3f} s ({full_s / pruned_s:.0f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark PDF report generation at 1 and 50 concurrent reports.
+
+    python benchmarks/bench_report.py [--csv superstore.csv]
+
+Compares the in-memory pipeline (``report.build_report_pdf``, uncached and
+cached via ``report.generate_pdf``) with the previous approach of drawing
+unwrapped lines onto a canvas written to a shared file on disk.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from reportlab.lib.pagesizes import A4  # noqa: E402
+from reportlab.pdfgen import canvas  # noqa: E402
+
+from charts import eda_charts, render_charts  # noqa: E402
+from cube import SalesCube  # noqa: E402
+from data_cache import load_dataset  # noqa: E402
+from report import REPORT_CHART_DPI, build_report_pdf, generate_pdf  # noqa: E402
+
+CONCURRENCY = [1, 50]
+
+
+def sample_report(i):
+    section = (
+        "Sales grew steadily across all regions while discounting above 20% "
+        "consistently eroded profit in Furniture and Office Supplies. "
+    ) * 4
+    return "\n".join([
+        f"## Executive Summary (report {i})", section, "",
+        "## Key Insights", "- " + section, "- " + section, "",
+        "## Risks", section * 3, "",
+        "## Recommendations", "- Cap discounts at 20%", "- Expand Technology in the West",
+    ])
+
+
+def legacy_pdf(text, path):
+    c = canvas.Canvas(path, pagesize=A4)
+    width, height = A4
+    y = height - 40
+    for line in text.split("\n"):
+        c.drawString(40, y, line)
+        y -= 14
+        if y < 40:
+            c.showPage()
+            y = height - 40
+    c.save()
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def run(label, fn, concurrency):
+    latencies = []
+
+    def task(i):
+        start = time.perf_counter()
+        fn(i)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(task, range(concurrency)))
+    wall = time.perf_counter() - start
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(f"{label:<22} {concurrency:>5} {wall * 1000:>10.1f} {p50:>10.1f} {p99:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "superstore.csv"))
+    args = parser.parse_args()
+
+    with open(args.csv, "rb") as f:
+        df, _ = load_dataset(f.read())
+    cube = SalesCube.from_frame(df)
+    images = render_charts(eda_charts(cube), dpi=REPORT_CHART_DPI)
+    kpis = [("Total Sales", f"${cube.total_sales:,.0f}"), ("Total Profit", f"${cube.total_profit:,.0f}")]
+    legacy_path = os.path.join(tempfile.mkdtemp(), "AI_Business_Report.pdf")
+
+    print(f"{'pipeline':<22} {'conc':>5} {'wall ms':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for concurrency in CONCURRENCY:
+        run("legacy canvas+file", lambda i: legacy_pdf(sample_report(i), legacy_path), concurrency)
+        run("in-memory (uncached)", lambda i: build_report_pdf(sample_report(i), kpis, images), concurrency)
+        generate_pdf(sample_report(0), kpis, images)
+        run("in-memory (cached)", lambda i: generate_pdf(sample_report(0), kpis, images), concurrency)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark review sentiment scoring throughput (rows/sec).
+
+    python benchmarks/bench_sentiment.py [--rows 1000000] [--workers 1 4]
+
+Generates a synthetic reviews CSV (review_text, rating, Product ID,
+Category) from the superstore products, checks that the vectorized
+cleaner and scorer match the notebook's per-row pipeline, then compares the
+notebook approach (``apply(clean_text)`` + transform + predict_proba on
+the whole frame) with the streamed pipeline in ``sentiment.score_reviews``.
+"""
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from sentiment import clean_texts, load_models, score_reviews, score_texts  # noqa: E402
+
+PHRASES = [
+    "Great product, fast delivery!", "Poor quality - very disappointed.",
+    "Average experience; okay I guess", "Excellent service & support :)",
+    "Late delivery, bad support", "Product was OK. Delivery 3 days late!!",
+    "Would buy again... excellent quality", "Disappointed with the service",
+]
+WORDS = (
+    "the a it was very really not quite so item order box chair desk phone paper "
+    "arrived shipped packed works broke looks feels price value color size would "
+    "recommend return again never always great poor fast late bad okay excellent"
+).split()
+
+
+def clean_text(text):
+    text = text.lower()
+    text = re.sub(r'[^a-z\s]', '', text)
+    return text
+
+
+def make_reviews(path, rows, superstore):
+    products = pd.read_csv(superstore, encoding="ISO-8859-1", usecols=["Product ID", "Category"]).drop_duplicates("Product ID")
+    rng = np.random.default_rng(42)
+    picks = rng.integers(0, len(products), rows)
+    reviews = pd.DataFrame({
+        # A stock phrase plus 4-12 random words: almost every review is distinct
+        "review_text": pd.Series(np.array(PHRASES)[rng.integers(0, len(PHRASES), rows)]) + " " + pd.Series([
+            " ".join(np.array(WORDS)[rng.integers(0, len(WORDS), n)]) for n in rng.integers(4, 13, rows)
+        ]),
+        "rating": rng.integers(1, 6, rows),
+        "Product ID": products["Product ID"].to_numpy()[picks],
+        "Category": products["Category"].to_numpy()[picks],
+    })
+    reviews.to_csv(path, index=False)
+
+
+def notebook_baseline(path):
+    model, vectorizer = load_models()
+    start = time.perf_counter()
+    reviews = pd.read_csv(path)
+    reviews["clean_review"] = reviews["review_text"].apply(clean_text)
+    reviews["proba"] = model.predict_proba(vectorizer.transform(reviews["clean_review"]))[:, 1]
+    reviews.groupby(["Product ID", "Category"])["proba"].mean()
+    return len(reviews) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--csv", default=os.path.join(ROOT, "superstore.csv"))
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), "reviews.csv")
+    make_reviews(path, args.rows, args.csv)
+
+    sample = pd.Series(PHRASES * 10 + ["", "Ünïcode — Straße 123"])
+    assert (clean_texts(sample) == sample.apply(clean_text)).all(), "clean_texts diverges from clean_text"
+    model, vectorizer = load_models()
+    head = pd.read_csv(path, nrows=50_000)["review_text"]
+    expected = model.predict_proba(vectorizer.transform(head.apply(clean_text)))[:, 1]
+    assert np.allclose(score_texts(head, model, vectorizer), expected), "score_texts diverges from the notebook pipeline"
+
+    print(f"{'pipeline':<28} {'rows':>10} {'rows/sec':>12}")
+    print(f"{'notebook apply(clean_text)':<28} {args.rows:>10,} {notebook_baseline(path):>12,.0f}")
+    for workers in sorted(set(args.workers)):
+        rollup, stats = score_reviews(path, workers=workers)
+        print(f"{f'streamed, {workers} worker(s)':<28} {stats['rows']:>10,} {stats['rows_per_sec']:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Check sketch accuracy and cost against exact answers on synthetic data.
+
+    python benchmarks/bench_sketches.py [--size 1m] [--parts 5]
+
+The dataset is split into ``--parts`` pieces, each sketched on its own and
+then merged (as separate files or processes would be). Distinct counts,
+top-10 customers/products and Sales/Profit percentiles are compared with
+exact pandas results.
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data_cache import parse_csv  # noqa: E402
+from run_suite import DEFAULT_DATA_DIR  # noqa: E402
+from sketches import DISTINCT_COLUMNS, QUANTILE_COLUMNS, TOP_COLUMNS, DatasetSketch  # noqa: E402
+from synthetic_data import SIZES, dataset_path  # noqa: E402
+
+QUANTILES = [0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size", default="1m", help=f"Row count or one of {', '.join(SIZES)}")
+    parser.add_argument("--parts", type=int, default=5)
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.size.lower()) or int(args.size)
+    with open(dataset_path(args.data_dir, rows), "rb") as f:
+        df = parse_csv(f.read())
+
+    start = time.perf_counter()
+    sketch = DatasetSketch()
+    for part in np.array_split(np.arange(len(df)), args.parts):
+        sketch.merge(DatasetSketch().append(df.iloc[part]))
+    print(f"{len(df):,} rows sketched in {args.parts} parts and merged: {time.perf_counter() - start:.2f} s\n")
+
+    for name, col in DISTINCT_COLUMNS.items():
+        estimate, error = sketch.distinct_count(name)
+        exact = df[col].nunique()
+        print(f"distinct {name:<10} {estimate:>10,} vs {exact:>10,}  "
+              f"off {abs(estimate - exact) / exact:.2%} (bound ±{2 * error:.1%} at 95%)")
+
+    for name, col in TOP_COLUMNS.items():
+        exact = df.groupby(col, observed=True)["Sales"].sum()
+        top = sketch.top[name].top(10)
+        truth = exact.reindex(top["key"]).to_numpy()
+        within = np.all((top["guaranteed"].to_numpy() <= truth + 1e-6) & (truth <= top["estimate"].to_numpy() + 1e-6))
+        same = list(top["key"]) == list(exact.nlargest(10).index)
+        print(f"top-10 {name:<12} same keys as exact: {same}, totals within bounds: {within}, "
+              f"max error {top['error'].max():,.0f}")
+
+    print()
+    for col in QUANTILE_COLUMNS:
+        exact = df[col].quantile(QUANTILES).to_numpy()
+        estimate = np.array([sketch.quantiles[col].quantile(q) for q in QUANTILES])
+        worst = np.max(np.abs(estimate - exact) / np.abs(exact))
+        print(f"{col:<8} percentiles worst relative error {worst:.2%} (bound ±{sketch.quantiles[col].accuracy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""Measure the app's cold start: import time and time-to-first-render.
+
+    python benchmarks/bench_startup.py [--repeat 3] [--data superstore.csv] [--sections "🤖 ML + GenAI" ...]
+
+Every measurement runs in a fresh interpreter, as a newly started worker
+would. ``app.py``'s top-level imports are timed with ``-X importtime``
+(listing the slowest packages); the app is then run headless through
+Streamlit's script runner to time the first render (the default
+"📤 Upload Data" page), followed by the first and a repeat visit to each
+other section. With ``--data`` the dataset is loaded into the session
+after the first render, so section visits include their charts and models.
+"""
+import argparse
+import ast
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP = os.path.join(ROOT, "app.py")
+SECTIONS = ["📈 EDA Dashboard", "🤖 ML + GenAI", "📉 Forecast", "💬 Review Sentiment"]
+
+RENDER_PROBE = r"""
+import json, sys, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+timings = {"streamlit_import_s": time.perf_counter() - start}
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+start = time.perf_counter()
+at.run()
+timings["first_render_s"] = time.perf_counter() - start
+timings["modules"] = len(sys.modules)
+if sys.argv[2]:
+    from cube import cube_for_dataset
+    from dataset_store import dataset_store
+    with open(sys.argv[2], "rb") as f:
+        dataset = dataset_store.open(f.read())
+    at.session_state["dataset"] = dataset
+    at.session_state["dataset_hash"] = dataset.digest
+    at.session_state["cube"] = cube_for_dataset(dataset.frame(), dataset.digest)
+for section in sys.argv[3:]:
+    for visit in ("first", "repeat"):
+        start = time.perf_counter()
+        at.sidebar.radio[0].set_value(section).run()
+        timings[f"{section}|{visit}"] = time.perf_counter() - start
+        at.sidebar.radio[0].set_value("📤 Upload Data").run()
+print(json.dumps(timings))
+"""
+
+
+def top_level_imports(path):
+    """The import statements executed at ``app.py`` module level, as source."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    return "\n".join(ast.unparse(node) for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom)))
+
+
+def import_profile(source):
+    """Total seconds and per-package cumulative seconds from ``-X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", source],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    total, packages = 0, {}
+    roots = {statement.split()[1].split(".")[0] for statement in source.splitlines()}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        total += int(self_us)
+        if not name[1:].startswith(" ") and name.strip().split(".")[0] in roots:
+            # Imported directly by app.py (not by another package or interpreter startup)
+            packages[name.strip()] = int(cumulative_us) / 1e6
+    return total / 1e6, packages
+
+
+def render_profile(sections, data):
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    result = subprocess.run(
+        [sys.executable, "-c", RENDER_PROBE, APP, data or "", *sections],
+        cwd=ROOT, capture_output=True, text=True, check=True, env=env
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--sections", nargs="*", default=SECTIONS)
+    parser.add_argument("--data", help="Superstore CSV to load before visiting the sections")
+    parser.add_argument("--top", type=int, default=8, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    source = top_level_imports(APP)
+    imports = [import_profile(source) for _ in range(args.repeat)]
+    total = statistics.median(seconds for seconds, _ in imports)
+    print(f"app.py top-level imports: {total:.2f} s (median of {args.repeat} fresh interpreters)")
+    packages = imports[-1][1]
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<36} {seconds:>6.3f} s")
+
+    data = os.path.abspath(args.data) if args.data else None
+    runs = [render_profile(args.sections, data) for _ in range(args.repeat)]
+
+    def median(key):
+        return statistics.median(run[key] for run in runs)
+
+    print(f"\nstreamlit import          {median('streamlit_import_s'):>6.2f} s")
+    print(f"first render (Upload Data) {median('first_render_s'):>6.2f} s, {runs[-1]['modules']} modules loaded")
+    for section in args.sections:
+        print(f"{section:<26} first visit {median(f'{section}|first'):>6.2f} s, "
+              f"repeat {median(f'{section}|repeat'):>6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Local fake OpenAI-compatible chat completions server for GenAI testing.
+
+    python benchmarks/fake_openai_server.py --port 8008 --token-delay 0.02
+    GROQ_API_KEY=fake GROQ_BASE_URL=http://127.0.0.1:8008 streamlit run app.py
+
+Answers any ``.../chat/completions`` POST with a canned reply that echoes
+the prompt length, streamed as SSE when ``stream`` is set. ``--fail-rate``
+returns random 503s so retry/backoff paths can be exercised.
+"""
+import argparse
+import json
+import random
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_handler(token_delay, first_token_delay, fail_rate, tokens):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send_json(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not self.path.endswith("/chat/completions"):
+                self._send_json(404, {"error": {"message": "not found"}})
+                return
+            if random.random() < fail_rate:
+                self._send_json(503, {"error": {"message": "overloaded", "type": "server_error"}})
+                return
+
+            prompt = request["messages"][-1]["content"]
+            words = [f"token{i}" for i in range(tokens)]
+            words[0] = f"[{len(prompt)} chars]"
+            model = request.get("model", "fake")
+            time.sleep(first_token_delay)
+
+            if not request.get("stream"):
+                self._send_json(200, {
+                    "id": "fake", "object": "chat.completion", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant", "content": " ".join(words)}}],
+                    "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": tokens,
+                              "total_tokens": len(prompt.split()) + tokens},
+                })
+                return
+
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            def send_event(payload):
+                data = f"data: {payload}\n\n".encode("utf-8")
+                self.wfile.write(f"{len(data):X}\r\n".encode() + data + b"\r\n")
+                self.wfile.flush()
+
+            for i, word in enumerate(words):
+                send_event(json.dumps({
+                    "id": "fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {"content": word + " "}, "finish_reason": None}],
+                }))
+                time.sleep(token_delay)
+            # Groq reports token usage on a final, content-less chunk
+            send_event(json.dumps({
+                "id": "fake", "object": "chat.completion.chunk", "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+                "x_groq": {"id": "fake", "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": tokens,
+                                                   "total_tokens": len(prompt.split()) + tokens}},
+            }))
+            send_event("[DONE]")
+            self.wfile.write(b"0\r\n\r\n")
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8008)
+    parser.add_argument("--token-delay", type=float, default=0.02)
+    parser.add_argument("--first-token-delay", type=float, default=0.3)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--tokens", type=int, default=40)
+    args = parser.parse_args()
+
+    handler = make_handler(args.token_delay, args.first_token_delay, args.fail_rate, args.tokens)
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"fake OpenAI-compatible server on http://127.0.0.1:{args.port}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
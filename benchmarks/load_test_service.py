@@ -0,0 +1,93 @@
+"""Load test for the headless service: micro-batched vs one-row-per-call /predict.
+
+    python benchmarks/load_test_service.py [--clients 32] [--seconds 10]
+    python benchmarks/load_test_service.py --url http://127.0.0.1:8000
+
+Without ``--url`` both modes are started in-process on free ports and
+compared; with ``--url`` only that running service is measured.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def client_loop(host, port, stop_at, latencies, errors):
+    conn = http.client.HTTPConnection(host, port, timeout=30)
+    while time.perf_counter() < stop_at:
+        body = json.dumps({
+            "Quantity": random.randint(1, 14),
+            "Discount": random.choice([0.0, 0.1, 0.2, 0.3]),
+            "Month": random.randint(1, 12),
+        })
+        start = time.perf_counter()
+        try:
+            conn.request("POST", "/predict", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors.append(response.status)
+                continue
+        except (OSError, http.client.HTTPException) as e:
+            errors.append(str(e))
+            conn = http.client.HTTPConnection(host, port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+
+
+def load_test(label, host, port, clients, seconds):
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + seconds
+    threads = [
+        threading.Thread(target=client_loop, args=(host, port, stop_at, latencies, errors))
+        for _ in range(clients)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    p50, p99 = (np.percentile(latencies, [50, 99]) * 1000) if latencies else (0.0, 0.0)
+    if errors:
+        print(f"  sample errors: {errors[:3]}")
+    print(f"{label:<16} {clients:>8} {len(latencies) / seconds:>12.1f} {p50:>10.2f} {p99:>10.2f} {len(errors):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--model-dir")
+    args = parser.parse_args()
+
+    print(f"{'mode':<16} {'clients':>8} {'req/sec':>12} {'p50 ms':>10} {'p99 ms':>10} {'errors':>7}")
+    if args.url:
+        url = urlparse(args.url)
+        load_test(url.netloc, url.hostname, url.port or 80, args.clients, args.seconds)
+        return
+
+    from model_registry import MODEL_DIR
+    from service import PredictionService, make_server
+
+    for label, batching in [("one-row-per-call", False), ("micro-batched", True)]:
+        service = PredictionService(args.model_dir or MODEL_DIR, batching=batching)
+        server = make_server(service, port=0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        load_test(label, "127.0.0.1", server.server_address[1], args.clients, args.seconds)
+        server.shutdown()
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
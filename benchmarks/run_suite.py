@@ -0,0 +1,219 @@
+"""Scale benchmark suite: ingest, aggregation, inference and rendering.
+
+    python benchmarks/run_suite.py --sizes 10k 1m --out results.json
+    python benchmarks/run_suite.py --sizes 10k 1m --compare results.json
+
+Synthetic Superstore data (``synthetic_data.py``) is generated once per
+size under ``--data-dir`` and reused. Every scenario is timed over
+``--repeat`` runs (median reported) and then run once more under
+tracemalloc for its peak Python/NumPy allocation; RSS growth is reported
+too. Results are written as JSON; ``--compare`` checks them against an
+earlier file and exits non-zero when a scenario got slower than
+``--threshold`` times its baseline.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import pandas as pd  # noqa: E402
+import sklearn  # noqa: E402
+
+import data_cache  # noqa: E402
+from batch_predict import FEATURES, predict_rows  # noqa: E402
+from charts import eda_charts, render_chart  # noqa: E402
+from cube import SalesCube  # noqa: E402
+from data_cache import load_dataset, parse_csv  # noqa: E402
+from model_registry import MODEL_DIR, registry  # noqa: E402
+from report import REPORT_CHART_DPI, build_report_pdf, generate_pdf  # noqa: E402
+from streaming import stream_csv  # noqa: E402
+from synthetic_data import SIZES, dataset_path  # noqa: E402
+
+BATCH_SIZES = [1, 100, 10_000, 100_000]
+EDA_GROUPBYS = [("Category", "Sales"), ("Region", "Profit"), ("Segment", "Sales"), ("Ship Mode", "Sales")]
+DEFAULT_DATA_DIR = os.path.join(tempfile.gettempdir(), "superstore-bench")
+
+
+def _rss_bytes():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+def measure(fn, repeat):
+    """Median wall time over ``repeat`` runs, then one traced run for peak allocation."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+
+    gc.collect()
+    rss_before = _rss_bytes()
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    rss_after = _rss_bytes()
+    return {
+        "seconds": float(np.median(times)),
+        "min_seconds": float(min(times)),
+        "peak_alloc_mb": round(peak / 1e6, 2),
+        "rss_delta_mb": None if rss_before is None else round((rss_after - rss_before) / 1e6, 2),
+    }
+
+
+def _stream(path):
+    with open(path, "rb") as f:
+        return stream_csv(f)
+
+
+def scenarios(path, model_dir):
+    """``[(name, params, fn), ...]`` for one dataset file; data is loaded up front."""
+    with open(path, "rb") as f:
+        data = f.read()
+    df, _ = load_dataset(data)
+    cube = SalesCube.from_frame(df)
+    charts = eda_charts(cube)
+    report_images = [render_chart(spec, chart_data, dpi=REPORT_CHART_DPI) for spec, chart_data in charts]
+    kpis = [("Total Sales", f"${cube.total_sales:,.0f}"), ("Total Profit", f"${cube.total_profit:,.0f}")]
+    report_text = "\n".join(["## Executive Summary", "Sales grew steadily. " * 40, "## Risks", "- Discounts. " * 20])
+    # Prime the report cache so "generate_pdf_cached" measures hits only
+    generate_pdf(report_text, kpis, report_images)
+
+    items = [
+        ("csv_load", {}, lambda: parse_csv(data)),
+        ("parquet_cache_load", {}, lambda: load_dataset(data)),
+        ("stream_csv", {}, lambda: _stream(path)),
+        ("kpis_frame", {}, lambda: (
+            df["Sales"].sum(), df["Profit"].sum(), len(df), df["Discount"].mean()
+        )),
+        ("cube_build", {}, lambda: SalesCube.from_frame(df)),
+        ("kpis_cube", {}, lambda: (cube.total_sales, cube.total_profit, cube.total_orders, cube.avg_discount)),
+        ("eda_groupbys_frame", {}, lambda: [df.groupby(g, observed=True)[v].sum() for g, v in EDA_GROUPBYS]),
+        ("eda_groupbys_cube", {}, lambda: [cube.totals(g, v) for g, v in EDA_GROUPBYS]),
+        ("render_charts", {}, lambda: [render_chart(spec, chart_data) for spec, chart_data in charts]),
+        ("build_report_pdf", {}, lambda: build_report_pdf(report_text, kpis, report_images)),
+        ("generate_pdf_cached", {}, lambda: generate_pdf(report_text, kpis, report_images)),
+    ]
+
+    try:
+        models = registry.get_many(model_dir)
+    except OSError:
+        print(f"  (no models in {model_dir}; skipping prediction scenarios)", file=sys.stderr)
+        return items
+
+    X = df[["Quantity", "Discount"]].assign(
+        Year=df["Order Date"].dt.year, Month=df["Order Date"].dt.month, Quarter=df["Order Date"].dt.quarter
+    )[FEATURES].dropna().to_numpy(dtype="float64")
+    for batch in BATCH_SIZES:
+        if batch <= len(X):
+            rows = X[:batch]
+            items.append(("predict", {"batch": batch}, lambda rows=rows: predict_rows(rows, *models)))
+    return items
+
+
+def compare(results, baseline_path, threshold):
+    with open(baseline_path) as f:
+        baseline = {(r["scenario"], r["size"], json.dumps(r["params"], sort_keys=True)): r
+                    for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\n{'scenario':<30} {'size':>5} {'base s':>10} {'now s':>10} {'ratio':>7}")
+    for r in results:
+        base = baseline.get((r["scenario"], r["size"], json.dumps(r["params"], sort_keys=True)))
+        if base is None or not base["seconds"]:
+            continue
+        ratio = r["seconds"] / base["seconds"]
+        # Sub-millisecond scenarios are too noisy to flag on ratio alone
+        flag = " REGRESSION" if ratio > threshold and r["seconds"] - base["seconds"] > 0.001 else ""
+        print(f"{_label(r):<30} {r['size']:>5} {base['seconds']:>10.4f} {r['seconds']:>10.4f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(r)
+    return regressions
+
+
+def _label(result):
+    params = ",".join(f"{k}={v}" for k, v in result["params"].items())
+    return f"{result['scenario']}[{params}]" if params else result["scenario"]
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", default=["10k", "1m"], help=f"Any of {', '.join(SIZES)} or a row count")
+    parser.add_argument("--data-dir", default=DEFAULT_DATA_DIR)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="+", help="Run only these scenarios")
+    parser.add_argument("--out", help="Write JSON results here (default: stdout)")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="Slowdown ratio flagged as a regression")
+    args = parser.parse_args()
+
+    # Keep the suite's Parquet cache files away from the app's
+    data_cache.DATASET_DIR = os.path.join(args.data_dir, "datasets")
+
+    results = []
+    for size in args.sizes:
+        rows = SIZES.get(size.lower()) or int(size)
+        path = dataset_path(args.data_dir, rows)
+        print(f"== {size} ({rows:,} rows, {os.path.getsize(path) / 1e6:.1f} MB)", file=sys.stderr)
+        for name, params, fn in scenarios(path, args.model_dir):
+            if args.only and name not in args.only:
+                continue
+            result = {"scenario": name, "size": size, "rows": rows, "params": params, **measure(fn, args.repeat)}
+            results.append(result)
+            print(f"  {_label(result):<30} {result['seconds']:>9.4f} s  peak {result['peak_alloc_mb']:>9.1f} MB",
+                  file=sys.stderr)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "sklearn": sklearn.__version__,
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} scenario(s) slower than {args.threshold}x baseline", file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Generate Superstore-schema CSVs of any size for scale benchmarks.
+
+    python benchmarks/synthetic_data.py --rows 1000000 --out superstore_1m.csv
+
+Column values are drawn from the real ``superstore.csv``: products (with
+category, sub-category and unit price), customers (with segment) and
+locations (city/state/postal code/region) are sampled from it, and the
+product and customer pools grow with the square root of the row count, so
+a 10M-row file has ~25k customers and ~59k products rather than 793/1862.
+Orders hold ~2 lines sharing date, customer, ship mode and location, like
+the original.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from data_cache import CSV_ENCODING  # noqa: E402
+
+SEED_CSV = os.path.join(ROOT, "superstore.csv")
+SEED_ROWS = 9994
+CHUNK_ROWS = 500_000
+SIZES = {"10k": 10_000, "1m": 1_000_000, "10m": 10_000_000}
+START_DATE = np.datetime64("2014-01-01")
+DATE_SPAN_DAYS = 4 * 365
+
+
+def _pool(frame, size, id_col, rng):
+    """Resample ``frame`` to ``size`` rows, giving the copies beyond the originals new IDs."""
+    if size <= len(frame):
+        return frame.sample(size, random_state=rng.integers(2**31)).reset_index(drop=True)
+    extra = frame.sample(size - len(frame), replace=True, random_state=rng.integers(2**31)).reset_index(drop=True)
+    extra[id_col] = extra[id_col] + "-" + pd.Series(np.arange(len(extra)) + 1).astype(str).str.zfill(6)
+    return pd.concat([frame, extra], ignore_index=True)
+
+
+class SuperstoreGenerator:
+    def __init__(self, rows, seed=42, seed_csv=SEED_CSV):
+        self.rows = rows
+        self.rng = np.random.default_rng(seed)
+        real = pd.read_csv(seed_csv, encoding=CSV_ENCODING)
+        real.columns = real.columns.str.strip()
+        self.columns = list(real.columns)
+
+        scale = max(rows / SEED_ROWS, 1.0) ** 0.5
+        products = real.assign(
+            **{"Unit Price": real["Sales"] / real["Quantity"] / (1 - real["Discount"])}
+        ).groupby("Product ID", as_index=False).agg({
+            "Category": "first", "Sub-Category": "first", "Product Name": "first", "Unit Price": "median",
+        })
+        customers = real.groupby("Customer ID", as_index=False).agg({"Customer Name": "first", "Segment": "first"})
+        self.products = _pool(products, int(len(products) * scale), "Product ID", self.rng)
+        self.customers = _pool(customers, int(len(customers) * scale), "Customer ID", self.rng)
+        self.locations = real[["Country", "City", "State", "Postal Code", "Region"]].drop_duplicates().reset_index(drop=True)
+        self.ship_modes = real["Ship Mode"].value_counts(normalize=True)
+        self.quantities = real["Quantity"].value_counts(normalize=True)
+        self.discounts = real["Discount"].value_counts(normalize=True)
+
+    def _choice(self, distribution, size):
+        return self.rng.choice(distribution.index.to_numpy(), size=size, p=distribution.to_numpy())
+
+    def chunks(self, chunk_rows=CHUNK_ROWS):
+        """Yield DataFrames with the Superstore columns until ``rows`` lines are produced."""
+        produced, order_no = 0, 100000
+        while produced < self.rows:
+            n = min(chunk_rows, self.rows - produced)
+            # Orders of 1..n lines (mean ~2); the last order may be cut at the chunk edge
+            lines = self.rng.geometric(0.5, size=n)
+            order_of_line = np.repeat(np.arange(len(lines)), lines)[:n]
+            orders = order_of_line[-1] + 1
+
+            order_days = self.rng.integers(0, DATE_SPAN_DAYS, orders)
+            order_dates = START_DATE + order_days.astype("timedelta64[D]")
+            ship_dates = order_dates + self.rng.integers(0, 8, orders).astype("timedelta64[D]")
+            customer = self.customers.iloc[self.rng.integers(0, len(self.customers), orders)].reset_index(drop=True)
+            location = self.locations.iloc[self.rng.integers(0, len(self.locations), orders)].reset_index(drop=True)
+            years = order_dates.astype("datetime64[Y]").astype(int) + 1970
+            order_ids = (
+                pd.Series(self.rng.choice(["CA", "US"], orders, p=[0.8, 0.2])) + "-" + pd.Series(years).astype(str)
+                + "-" + pd.Series(order_no + np.arange(orders)).astype(str)
+            )
+            order_no += orders
+
+            product = self.products.iloc[self.rng.integers(0, len(self.products), n)].reset_index(drop=True)
+            quantity = self._choice(self.quantities, n)
+            discount = self._choice(self.discounts, n)
+            sales = (product["Unit Price"].to_numpy() * quantity * (1 - discount)).round(4)
+            margin = np.clip(self.rng.normal(0.3, 0.1, n) - 1.2 * discount, -2.75, 0.5)
+
+            chunk = pd.DataFrame({
+                "Row ID": np.arange(produced + 1, produced + n + 1),
+                "Order ID": order_ids.to_numpy()[order_of_line],
+                "Order Date": pd.Series(order_dates[order_of_line]).dt.strftime("%m/%d/%Y"),
+                "Ship Date": pd.Series(ship_dates[order_of_line]).dt.strftime("%m/%d/%Y"),
+                "Ship Mode": self._choice(self.ship_modes, orders)[order_of_line],
+                "Customer ID": customer["Customer ID"].to_numpy()[order_of_line],
+                "Customer Name": customer["Customer Name"].to_numpy()[order_of_line],
+                "Segment": customer["Segment"].to_numpy()[order_of_line],
+                **{col: location[col].to_numpy()[order_of_line] for col in self.locations.columns},
+                "Product ID": product["Product ID"],
+                "Category": product["Category"],
+                "Sub-Category": product["Sub-Category"],
+                "Product Name": product["Product Name"],
+                "Sales": sales,
+                "Quantity": quantity,
+                "Discount": discount,
+                "Profit": (sales * margin).round(4),
+            })
+            produced += n
+            yield chunk[self.columns]
+
+
+def write_csv(path, rows, seed=42, chunk_rows=CHUNK_ROWS):
+    """Write a synthetic Superstore CSV with ``rows`` lines to ``path`` and return the path."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding=CSV_ENCODING, newline="") as f:
+        for i, chunk in enumerate(SuperstoreGenerator(rows, seed).chunks(chunk_rows)):
+            chunk.to_csv(f, index=False, header=i == 0)
+    os.replace(tmp_path, path)
+    return path
+
+
+def dataset_path(directory, rows, seed=42):
+    """Generate the dataset once per (rows, seed) and reuse the file afterwards."""
+    path = os.path.join(directory, f"superstore_{rows}_{seed}.csv")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        write_csv(path, rows, seed)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default="10k", help=f"Row count or one of {', '.join(SIZES)}")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", required=True)
+    args = parser.parse_args()
+
+    rows = SIZES.get(args.rows.lower()) or int(args.rows)
+    write_csv(args.out, rows, args.seed)
+    print(f"Wrote {rows:,} rows to {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
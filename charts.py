@@ -0,0 +1,145 @@
+import hashlib
+import io
+import threading
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import matplotlib.style
+import pandas as pd
+from matplotlib.figure import Figure
+
+# ================= CHART CONFIG =================
+CHART_STYLE = "dark_background"
+FIGSIZE = (10, 6)
+DPI = 100
+CHART_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDER_WORKERS = 4
+
+# The dashboard style is global; set it once instead of on every rerun
+matplotlib.style.use(CHART_STYLE)
+
+ChartSpec = namedtuple(
+    "ChartSpec",
+    ["kind", "group_col", "value_col", "title", "colors", "xlabel", "ylabel", "sort_values", "grid_axis"],
+    defaults=[None, None, False, None]
+)
+
+
+def chart_key(spec, data):
+    """Cache key: the chart spec plus a content hash of the (aggregated) data."""
+    digest = hashlib.sha256(repr(tuple(spec)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(data, index=True).values.tobytes())
+    return digest.hexdigest()
+
+
+# ================= RENDERING =================
+def render_chart(spec, data, fmt="png", dpi=DPI):
+    """Render one chart to image bytes.
+
+    Uses a standalone ``Figure`` (not pyplot), so nothing is registered in
+    pyplot's global figure manager and the figure is freed as soon as the
+    bytes are written. That also makes it safe to render on worker threads.
+    """
+    if spec.sort_values:
+        data = data.sort_values()
+
+    fig = Figure(figsize=FIGSIZE, dpi=dpi)
+    ax = fig.subplots()
+    if spec.kind == "pie":
+        ax.pie(data, labels=data.index, autopct='%1.1f%%', colors=spec.colors, startangle=90)
+    else:
+        data.plot(kind=spec.kind, ax=ax, color=spec.colors)
+        if spec.kind == "bar":
+            for label in ax.get_xticklabels():
+                label.set_rotation(45)
+                label.set_ha("right")
+    ax.set_title(spec.title, fontsize=16, fontweight='bold', pad=20)
+    if spec.xlabel:
+        ax.set_xlabel(spec.xlabel, fontsize=12)
+    if spec.ylabel:
+        ax.set_ylabel(spec.ylabel, fontsize=12)
+    if spec.grid_axis:
+        ax.grid(axis=spec.grid_axis, alpha=0.3)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format=fmt)
+    fig.clear()
+    return buffer.getvalue()
+
+
+# ================= RENDER CACHE =================
+class ChartCache:
+    """Process-wide LRU of rendered chart bytes, bounded by total size."""
+
+    def __init__(self, max_bytes=CHART_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            image = self._entries.get(key)
+            if image is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return image
+
+    def put(self, key, image):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = image
+            self._bytes += len(image)
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+chart_cache = ChartCache()
+
+
+def render_charts(charts, fmt="png", dpi=DPI, parallel=True):
+    """Return image bytes for ``[(spec, data), ...]``, rendering only cache misses."""
+    keys = [f"{chart_key(spec, data)}-{dpi}.{fmt}" for spec, data in charts]
+    images = [chart_cache.get(key) for key in keys]
+    missing = [i for i, image in enumerate(images) if image is None]
+
+    if parallel and len(missing) > 1:
+        with ThreadPoolExecutor(max_workers=min(RENDER_WORKERS, len(missing))) as pool:
+            rendered = list(pool.map(lambda i: render_chart(*charts[i], fmt=fmt, dpi=dpi), missing))
+    else:
+        rendered = [render_chart(*charts[i], fmt=fmt, dpi=dpi) for i in missing]
+
+    for i, image in zip(missing, rendered):
+        chart_cache.put(keys[i], image)
+        images[i] = image
+    return images
+
+
+# ================= EDA DASHBOARD CHARTS =================
+EDA_CHARTS = [
+    ChartSpec("bar", "Category", "Sales", "Sales by Category",
+              ['#667eea', '#764ba2', '#f093fb'], "Category", "Sales ($)", grid_axis="y"),
+    ChartSpec("bar", "Region", "Profit", "Profit by Region",
+              ['#4facfe', '#00f2fe', '#43e97b', '#38f9d7'], "Region", "Profit ($)", grid_axis="y"),
+    ChartSpec("pie", "Segment", "Sales", "Sales Distribution by Segment",
+              ['#fa709a', '#fee140', '#30cfd0']),
+    ChartSpec("barh", "Ship Mode", "Sales", "Sales by Shipping Mode",
+              ['#667eea', '#764ba2', '#f093fb', '#4facfe'], "Sales ($)", "Ship Mode",
+              sort_values=True, grid_axis="x"),
+]
+
+
+def eda_charts(cube):
+    """``[(spec, data), ...]`` for the dashboard charts the cube can answer."""
+    return [
+        (spec, cube.totals(spec.group_col, spec.value_col))
+        for spec in EDA_CHARTS
+        if spec.group_col in cube.columns
+    ]
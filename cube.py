@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from sketches import DatasetSketch
+
+# ================= CUBE CONFIG =================
+CUBE_DIMENSIONS = ["Category", "Region", "Segment", "Ship Mode"]
+MONTH_DIMENSION = "Order Month"
+CUBE_CACHE_SIZE = 8
+
+
+# ================= AGGREGATE CUBE =================
+class SalesCube:
+    """Sales/Profit/Discount totals per Category x Region x Segment x Ship Mode x month.
+
+    Built in a single grouped pass over the rows; every dashboard chart and
+    KPI card is then answered from the (small) cube instead of the data.
+    Appending rows merges a cube of the new rows in, so nothing is rebuilt.
+    Distinct counts, top customers/products and value quantiles come from
+    the mergeable sketches fed in the same pass.
+    """
+
+    def __init__(self):
+        self.table = None
+        self.dimensions = []
+        self.columns = []
+        self.sample = None
+        self.rows = 0
+        self.missing = 0
+        self.sketch = DatasetSketch()
+
+    @classmethod
+    def from_frame(cls, df):
+        cube = cls()
+        cube.append(df)
+        return cube
+
+    def append(self, chunk):
+        if self.table is None:
+            self.columns = list(chunk.columns)
+            self.sample = chunk.head(10)
+            self.dimensions = [dim for dim in CUBE_DIMENSIONS if dim in chunk.columns]
+            if "Order Date" in chunk.columns:
+                self.dimensions.append(MONTH_DIMENSION)
+
+        self.rows += len(chunk)
+        self.missing += int(chunk.isnull().sum().sum())
+        self.sketch.append(chunk)
+
+        part = self._aggregate(chunk)
+        if self.table is None:
+            self.table = part
+        else:
+            self.table = (
+                pd.concat([self.table, part], ignore_index=True)
+                .groupby(self.dimensions, dropna=False, sort=False)
+                .sum()
+                .reset_index()
+            )
+        return self
+
+    def _aggregate(self, chunk):
+        keys = [chunk[dim] for dim in self.dimensions if dim != MONTH_DIMENSION]
+        if MONTH_DIMENSION in self.dimensions:
+            keys.append(chunk["Order Date"].dt.to_period("M").rename(MONTH_DIMENSION))
+
+        measures = pd.DataFrame({
+            "Sales": chunk["Sales"],
+            "Profit": chunk["Profit"],
+            "Rows": 1,
+        })
+        if "Discount" in chunk.columns:
+            measures["Discount"] = chunk["Discount"]
+            measures["Discount Count"] = chunk["Discount"].notna().astype("int64")
+
+        part = measures.groupby(keys, observed=True, dropna=False, sort=False).sum().reset_index()
+        # Chunks carry different category sets, so merge on plain labels
+        for dim in self.dimensions:
+            if isinstance(part[dim].dtype, pd.CategoricalDtype):
+                part[dim] = part[dim].astype(object)
+        return part
+
+    # ================= QUERIES =================
+    def total(self, value_col):
+        if self.table is None or value_col not in self.table.columns:
+            return 0
+        return self.table[value_col].sum()
+
+    def totals(self, group_col, value_col):
+        return self.table.groupby(group_col)[value_col].sum()
+
+    def monthly(self, value_col):
+        return self.table.groupby(MONTH_DIMENSION)[value_col].sum().sort_index()
+
+    @property
+    def total_sales(self):
+        return self.total("Sales")
+
+    @property
+    def total_profit(self):
+        return self.total("Profit")
+
+    @property
+    def total_orders(self):
+        return self.rows
+
+    @property
+    def distinct_orders(self):
+        """``(estimate, relative standard error)`` of distinct Order IDs, or ``None``."""
+        return self.sketch.distinct_count("orders")
+
+    @property
+    def avg_discount(self):
+        count = self.total("Discount Count")
+        return self.total("Discount") / count if count else 0
+
+    @property
+    def shape(self):
+        return self.rows, len(self.columns)
+
+
+# ================= PER-DATASET CACHE =================
+_cube_cache = OrderedDict()
+_cube_lock = threading.Lock()
+
+
+def cube_for_dataset(df, digest):
+    """Return the cube for a loaded dataset, building it once per content hash."""
+    with _cube_lock:
+        if digest in _cube_cache:
+            _cube_cache.move_to_end(digest)
+            return _cube_cache[digest]
+
+    cube = SalesCube.from_frame(df)
+
+    with _cube_lock:
+        _cube_cache[digest] = cube
+        while len(_cube_cache) > CUBE_CACHE_SIZE:
+            _cube_cache.popitem(last=False)
+    return cube
@@ -0,0 +1,95 @@
+import hashlib
+import io
+import os
+
+import pandas as pd
+
+# ================= CACHE CONFIG =================
+CACHE_DIR = os.getenv(
+    "BI_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+)
+DATASET_DIR = os.path.join(CACHE_DIR, "datasets")
+
+# Bump when the parsing rules below change so stale cache files are ignored
+CACHE_VERSION = 1
+
+CSV_ENCODING = "ISO-8859-1"
+CATEGORICAL_COLUMNS = ["Region", "Category", "Segment", "Ship Mode", "State"]
+FLOAT_COLUMNS = ["Sales", "Profit", "Discount"]
+DATE_COLUMNS = ["Order Date", "Ship Date"]
+
+
+# ================= HASHING =================
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_path(digest):
+    return os.path.join(DATASET_DIR, f"{digest}-v{CACHE_VERSION}.parquet")
+
+
+# ================= PARSING =================
+def csv_dtypes(raw_columns):
+    """Map the raw (unstripped) header names to the dtypes we want."""
+    dtypes = {}
+    for raw in raw_columns:
+        name = raw.strip()
+        if name in CATEGORICAL_COLUMNS:
+            dtypes[raw] = "category"
+        elif name in FLOAT_COLUMNS:
+            dtypes[raw] = "float64"
+    return dtypes
+
+
+def parse_csv(data):
+    """Parse Superstore CSV bytes with explicit dtypes and parsed dates."""
+    header = pd.read_csv(io.BytesIO(data), encoding=CSV_ENCODING, nrows=0)
+    df = pd.read_csv(
+        io.BytesIO(data),
+        encoding=CSV_ENCODING,
+        dtype=csv_dtypes(header.columns)
+    )
+    df.columns = df.columns.str.strip()
+    return parse_dates(df)
+
+
+def parse_dates(df):
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+
+# ================= CACHED LOAD =================
+def _write_cache(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def load_dataset(data, digest=None):
+    """Return (df, digest) for uploaded CSV bytes, parsing at most once per file.
+
+    The parsed frame is stored as Parquet keyed by the SHA-256 of the bytes,
+    so re-uploads and app restarts read the columnar cache instead of the CSV.
+    Pass ``digest`` when the caller has already hashed ``data``.
+    """
+    digest = digest or hash_bytes(data)
+    path = cache_path(digest)
+
+    if os.path.exists(path):
+        try:
+            return pd.read_parquet(path), digest
+        except Exception:
+            # Corrupt or unreadable cache entry; fall through and rebuild it
+            pass
+
+    df = parse_csv(data)
+    try:
+        _write_cache(df, path)
+    except Exception:
+        # Cache is an optimisation only; never fail the upload because of it
+        pass
+    return df, digest
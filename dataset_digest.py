@@ -0,0 +1,178 @@
+import math
+import threading
+from collections import OrderedDict
+
+from cube import MONTH_DIMENSION
+
+# ================= DIGEST CONFIG =================
+DIGEST_TOKEN_BUDGET = 400
+DIGEST_DIMENSIONS = ["Segment", "Region", "Category"]
+TREND_MONTHS = 6
+DIGEST_CACHE_SIZE = 8
+
+
+def estimate_tokens(text):
+    # ~4 characters per token for English/number-heavy text; no tokenizer needed
+    return math.ceil(len(text) / 4)
+
+
+def _money(value):
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    if value >= 1e6:
+        return f"{sign}${value / 1e6:,.2f}M"
+    if value >= 1e3:
+        return f"{sign}${value / 1e3:,.1f}k"
+    return f"{sign}${value:,.0f}"
+
+
+def _pct(numerator, denominator):
+    return f"{numerator / denominator:+.1%}" if denominator else "n/a"
+
+
+def _margin(profit, sales):
+    return f"{profit / sales:.1%}" if sales else "n/a"
+
+
+def _strength(r):
+    size = abs(r)
+    return "negligible" if size < 0.1 else "weak" if size < 0.3 else "moderate" if size < 0.5 else "strong"
+
+
+# ================= DIGEST SECTIONS =================
+def _overview(cube):
+    sales, profit = cube.total_sales, cube.total_profit
+    orders = cube.distinct_orders
+    orders_text = f", ≈{orders[0]:,} orders" if orders else ""
+    lines = [
+        f"Rows: {cube.rows:,} line items{orders_text}; sales {_money(sales)}, profit {_money(profit)} "
+        f"({_margin(profit, sales)} margin), avg discount {cube.avg_discount:.1%}"
+    ]
+    if MONTH_DIMENSION in cube.dimensions:
+        months = cube.monthly("Sales").index
+        if len(months):
+            lines.append(f"Period: {months.min()} to {months.max()} ({len(months)} months)")
+    return lines
+
+
+def _rankings(cube):
+    lines = []
+    for dim in DIGEST_DIMENSIONS:
+        if dim not in cube.dimensions:
+            continue
+        totals = cube.table.groupby(dim, observed=True)[["Sales", "Profit"]].sum()
+        sales, profit = totals["Sales"], totals["Profit"].sort_values(ascending=False)
+        if len(profit) < 2:
+            continue
+        best, worst = profit.index[0], profit.index[-1]
+        lines.append(
+            f"{dim} by profit: best {best} {_money(profit[best])} ({_margin(profit[best], sales[best])} margin, "
+            f"{sales[best] / sales.sum():.0%} of sales); worst {worst} {_money(profit[worst])} "
+            f"({_margin(profit[worst], sales[worst])} margin, {sales[worst] / sales.sum():.0%} of sales)"
+        )
+    return lines
+
+
+def _trend(cube):
+    if MONTH_DIMENSION not in cube.dimensions:
+        return []
+    sales, profit = cube.monthly("Sales"), cube.monthly("Profit")
+    if len(sales) < 2:
+        return []
+    recent = sales.iloc[-(TREND_MONTHS + 1):]
+    changes = ", ".join(
+        f"{month.strftime('%b %y')} {_pct(value - previous, previous)}"
+        for month, previous, value in zip(recent.index[1:], recent.to_numpy()[:-1], recent.to_numpy()[1:])
+    )
+    lines = [
+        f"Latest month {sales.index[-1]}: sales {_money(sales.iloc[-1])} ({_pct(sales.iloc[-1] - sales.iloc[-2], sales.iloc[-2])} MoM), "
+        f"profit {_money(profit.iloc[-1])} ({_pct(profit.iloc[-1] - profit.iloc[-2], abs(profit.iloc[-2]))} MoM)",
+        f"Sales MoM, last {len(recent) - 1} months: {changes}",
+    ]
+    if len(sales) >= 24:
+        last, prior = sales.iloc[-12:].sum(), sales.iloc[-24:-12].sum()
+        lines.append(f"Trailing 12 months sales {_money(last)} vs prior 12 months {_money(prior)} ({_pct(last - prior, prior)})")
+    return lines
+
+
+def _discount_profit(cube):
+    r = cube.sketch.correlation.value()
+    if r is None:
+        return []
+    direction = "higher discounts go with lower profit" if r < 0 else "higher discounts go with higher profit"
+    return [f"Discount vs profit correlation: r = {r:.2f} ({_strength(r)}; {direction})"]
+
+
+def _outliers(cube):
+    # The notebook's rule: outside [Q1 - 1.5 IQR, Q3 + 1.5 IQR], per column
+    parts = []
+    for col, sketch in cube.sketch.quantiles.items():
+        if not sketch.count:
+            continue
+        q1, q3 = sketch.quantile(0.25), sketch.quantile(0.75)
+        iqr = q3 - q1
+        count = sketch.count_outside(q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        parts.append(f"{col} ≈{count:,} ({count / sketch.count:.1%}, outside {_money(q1 - 1.5 * iqr)}..{_money(q3 + 1.5 * iqr)})")
+    return [f"IQR outliers (1.5x rule): {'; '.join(parts)}"] if parts else []
+
+
+def _leaders(cube):
+    lines = []
+    for name, summary in cube.sketch.top.items():
+        top = summary.counts.nlargest(3)
+        if len(top):
+            leaders = ", ".join(f"{key} {_money(value)}" for key, value in top.items())
+            lines.append(f"Top {name} by sales: {leaders}")
+    return lines
+
+
+def _distribution(cube):
+    table = cube.sketch.quantile_table((0.5, 0.9, 0.99))
+    return [
+        f"{col} per line item: median {_money(table[col].iloc[0])}, p90 {_money(table[col].iloc[1])}, "
+        f"p99 {_money(table[col].iloc[2])}"
+        for col in table.columns
+    ]
+
+
+# Highest-value facts first; lines past the budget are dropped
+DIGEST_SECTIONS = [_overview, _rankings, _trend, _discount_profit, _outliers, _leaders, _distribution]
+
+
+# ================= DIGEST BUILDER =================
+def build_digest(cube, budget=DIGEST_TOKEN_BUDGET):
+    """Compact statistical summary of a dataset for LLM prompts, at most ``budget`` tokens.
+
+    Everything is read from the cube and its sketches (built in the load
+    pass), so the cost does not depend on the number of rows.
+    """
+    lines, used = [], 0
+    for section in DIGEST_SECTIONS:
+        for line in section(cube):
+            tokens = estimate_tokens(line) + 1
+            if used + tokens > budget:
+                return "\n".join(lines)
+            lines.append(line)
+            used += tokens
+    return "\n".join(lines)
+
+
+_digest_cache = OrderedDict()
+_digest_lock = threading.Lock()
+
+
+def digest_for_dataset(cube, digest, budget=DIGEST_TOKEN_BUDGET):
+    """The dataset digest, built once per content hash (streamed uploads have none and rebuild)."""
+    if digest is None:
+        return build_digest(cube, budget)
+    key = (digest, budget)
+    with _digest_lock:
+        if key in _digest_cache:
+            _digest_cache.move_to_end(key)
+            return _digest_cache[key]
+    text = build_digest(cube, budget)
+    with _digest_lock:
+        _digest_cache[key] = text
+        while len(_digest_cache) > DIGEST_CACHE_SIZE:
+            _digest_cache.popitem(last=False)
+    return text
@@ -0,0 +1,208 @@
+import os
+import threading
+import time
+import weakref
+
+import pandas as pd
+
+from data_cache import cache_path, hash_bytes, load_dataset
+
+# ================= STORE CONFIG =================
+# Parsed frames held in memory across all sessions; past the budget, the least
+# recently used are dropped and re-read from their Parquet cache on next use
+DATASET_BUDGET_MB = float(os.getenv("BI_DATASET_BUDGET_MB", "2048"))
+# Datasets untouched for this long are released (or, if still referenced, paged out)
+DATASET_IDLE_SECONDS = float(os.getenv("BI_DATASET_IDLE_SECONDS", "600"))
+
+
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+class DatasetHandle:
+    """A session's reference to a shared dataset.
+
+    Cheap to keep in ``st.session_state``; the reference is released when
+    the handle is garbage collected (the session ends or loads another file).
+    """
+
+    __slots__ = ("digest", "rows", "columns", "_store", "__weakref__")
+
+    def __init__(self, store, digest, rows, columns):
+        self.digest = digest
+        self.rows = rows
+        self.columns = columns
+        self._store = store
+        weakref.finalize(self, store._release, digest)
+
+    def frame(self):
+        """The shared DataFrame (reloaded from the Parquet cache if it was paged out)."""
+        return self._store.frame(self.digest)
+
+
+# ================= DATASET STORE =================
+class DatasetStore:
+    """Process-wide, reference-counted store of parsed datasets keyed by content hash.
+
+    Every session that uploads the same bytes gets a handle onto one shared
+    frame, so memory grows with the number of distinct datasets rather than
+    sessions. Frames are handed out as shallow copies: under pandas
+    copy-on-write they share the stored buffers, and a session that writes
+    to its copy only ever changes its own.
+    """
+
+    def __init__(self, budget_mb=DATASET_BUDGET_MB, idle_seconds=DATASET_IDLE_SECONDS):
+        self.budget_bytes = budget_mb * 1e6
+        self.idle_seconds = idle_seconds
+        self._entries = {}
+        self._loading = {}
+        # Re-entrant: handle finalizers can run from the garbage collector while it is held
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def open(self, data):
+        """Handle for uploaded CSV bytes, parsing them at most once while the dataset is held."""
+        digest = hash_bytes(data)
+        return self._open(digest, lambda: load_dataset(data, digest)[0])
+
+    def open_frame(self, digest, load, paths=(), release=None):
+        """Handle for a dataset built by ``load()`` (e.g. a partition read), keyed by ``digest``.
+
+        ``load`` is called again to reload the frame after it was paged out;
+        it is only paged out while every file in ``paths`` (what ``load``
+        reads) still exists. ``release()`` is called once the dataset is
+        dropped from the store.
+        """
+        return self._open(digest, load, reload=load, paths=tuple(paths), release=release)
+
+    def _open(self, digest, load, reload=None, paths=(), release=None):
+        with self._lock:
+            handle = self._resident_handle(digest)
+            if handle is not None:
+                self.hits += 1
+                return handle
+            load_lock = self._loading.setdefault(digest, threading.Lock())
+
+        # Concurrent uploads of the same file wait for one parse
+        with load_lock:
+            with self._lock:
+                handle = self._resident_handle(digest)
+                if handle is not None:
+                    self.hits += 1
+                    return handle
+            df = load()
+            with self._lock:
+                self.misses += 1
+                entry = self._entries.setdefault(digest, {"refs": 0})
+                entry.update(df=df, bytes=_frame_bytes(df), rows=len(df), columns=tuple(df.columns),
+                             reload=reload, paths=paths, release=release)
+                handle = self._handle(digest)
+                self._loading.pop(digest, None)
+                self._evict(keep=digest)
+        return handle
+
+    def frame(self, digest):
+        with self._lock:
+            entry = self._entries[digest]
+            entry["last_used"] = time.time()
+            df = entry["df"]
+            if df is None:
+                load_lock = self._loading.setdefault(digest, threading.Lock())
+
+        if df is None:
+            with load_lock:
+                with self._lock:
+                    df = entry["df"]
+                if df is None:
+                    try:
+                        df = entry["reload"]() if entry["reload"] is not None else pd.read_parquet(cache_path(digest))
+                    except FileNotFoundError as e:
+                        with self._lock:
+                            self._loading.pop(digest, None)
+                        raise FileNotFoundError(
+                            "This dataset was paged out and its files have since been removed or replaced"
+                        ) from e
+                    with self._lock:
+                        self.reloads += 1
+                        entry.update(df=df, bytes=_frame_bytes(df), last_used=time.time())
+                        self._loading.pop(digest, None)
+                        self._evict(keep=digest)
+        return df.copy(deep=False)
+
+    def _reloadable(self, digest, entry):
+        if entry["reload"] is not None:
+            # Partition files are deleted when their source file is replaced or removed
+            return all(os.path.exists(path) for path in entry["paths"])
+        return os.path.exists(cache_path(digest))
+
+    def _resident_handle(self, digest):
+        entry = self._entries.get(digest)
+        if entry is None or entry["df"] is None:
+            return None
+        return self._handle(digest)
+
+    def _handle(self, digest):
+        entry = self._entries[digest]
+        entry["refs"] += 1
+        entry["last_used"] = time.time()
+        return DatasetHandle(self, digest, entry["rows"], entry["columns"])
+
+    def _release(self, digest):
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                entry["refs"] -= 1
+                entry["last_used"] = time.time()
+
+    def _evict(self, keep=None):
+        """Drop idle datasets, then the least recently used until the budget is met."""
+        now = time.time()
+        for digest, entry in list(self._entries.items()):
+            if digest == keep or now - entry["last_used"] < self.idle_seconds:
+                continue
+            if entry["refs"] <= 0:
+                self._drop(digest)
+            elif entry["df"] is not None and self._reloadable(digest, entry):
+                entry["df"] = None
+
+        resident = [(digest, entry) for digest, entry in self._entries.items() if entry["df"] is not None]
+        total = sum(entry["bytes"] for _, entry in resident)
+        # Unreferenced datasets go first, then referenced ones by last use
+        for digest, entry in sorted(resident, key=lambda item: (item[1]["refs"] > 0, item[1]["last_used"])):
+            if total <= self.budget_bytes:
+                break
+            if digest == keep:
+                continue
+            if entry["refs"] <= 0:
+                self._drop(digest)
+            elif self._reloadable(digest, entry):
+                # Sessions still hold it; their handles reload it (from Parquet) when used
+                entry["df"] = None
+            else:
+                continue
+            total -= entry["bytes"]
+
+    def _drop(self, digest):
+        entry = self._entries.pop(digest)
+        if entry["release"] is not None:
+            entry["release"]()
+
+    def stats(self):
+        """Size and sharing per dataset, for display."""
+        with self._lock:
+            self._evict()
+            now = time.time()
+            return [{
+                "dataset": digest[:12],
+                "rows": entry["rows"],
+                "memory_mb": round(entry["bytes"] / 1e6, 1),
+                "sessions": entry["refs"],
+                "resident": entry["df"] is not None,
+                "idle_s": round(now - entry["last_used"]),
+            } for digest, entry in self._entries.items()]
+
+
+# Module-level singleton shared by every session
+dataset_store = DatasetStore()
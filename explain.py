@@ -0,0 +1,159 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import pandas as pd
+import shap
+
+from batch_predict import FEATURES
+
+# ================= EXPLAIN CONFIG =================
+MEMO_ENTRIES = 50_000
+# Exact TreeSHAP costs ~40 ms per row on the shipped forests; larger batches
+# use the path-attribution approximation (Saabas), which is ~100x cheaper.
+EXACT_BATCH_MAX = 256
+
+Explanation = namedtuple(
+    "Explanation",
+    ["row", "sales_base", "sales_contributions", "profit_base", "profit_contributions"]
+)
+
+
+def _row_key(row):
+    return tuple(round(float(value), 6) for value in row)
+
+
+def _positive_class(values):
+    # Older shap returns a list per class, newer a (rows, features, classes) array
+    if isinstance(values, list):
+        return np.asarray(values[1])
+    values = np.asarray(values)
+    return values[:, :, 1] if values.ndim == 3 else values
+
+
+def _positive_expected(expected):
+    expected = np.ravel(expected)
+    return float(expected[1] if len(expected) > 1 else expected[0])
+
+
+# ================= EXPLANATION ENGINE =================
+class ExplanationEngine:
+    """TreeSHAP attributions for the sales forest and the high-profit probability.
+
+    Built once per loaded model set. Attributions are memoized per raw
+    feature row, so repeated inputs (the same form values, or the scenario
+    grid) are only explained once. Scaling is per-feature, so attributions
+    on the scaled inputs belong to the raw features one-to-one.
+    """
+
+    def __init__(self, reg_model, clf_model, scaler, memo_entries=MEMO_ENTRIES):
+        self.scaler = scaler
+        self.reg_explainer = shap.TreeExplainer(reg_model)
+        self.clf_explainer = shap.TreeExplainer(clf_model)
+        self.sales_base = float(np.ravel(self.reg_explainer.expected_value)[0])
+        self.profit_base = _positive_expected(self.clf_explainer.expected_value)
+        self.memo_entries = memo_entries
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.last_seconds = None
+
+    def _compute(self, X, approximate):
+        X_scaled = self.scaler.transform(pd.DataFrame(X, columns=FEATURES))
+        sales = self.reg_explainer.shap_values(X_scaled, approximate=approximate, check_additivity=False)
+        profit = _positive_class(
+            self.clf_explainer.shap_values(X_scaled, approximate=approximate, check_additivity=False)
+        )
+        return np.asarray(sales).reshape(len(X), -1), np.asarray(profit).reshape(len(X), -1)
+
+    def explain_batch(self, X, approximate=None):
+        """``(sales, profit)`` attribution arrays (rows x FEATURES) for raw feature rows.
+
+        Duplicate rows and rows explained before are served from the memo;
+        the rest are explained in one call per model.
+        """
+        X = np.asarray(X, dtype="float64").reshape(-1, len(FEATURES))
+        if approximate is None:
+            approximate = len(X) > EXACT_BATCH_MAX
+        unique, inverse = np.unique(X, axis=0, return_inverse=True)
+        keys = [(_row_key(row), approximate) for row in unique]
+
+        with self._lock:
+            cached = [self._memo.get(key) for key in keys]
+        missing = [i for i, entry in enumerate(cached) if entry is None]
+        if missing:
+            sales, profit = self._compute(unique[missing], approximate)
+            for j, i in enumerate(missing):
+                cached[i] = (sales[j], profit[j])
+
+        with self._lock:
+            self.hits += len(X) - len(missing)
+            self.misses += len(missing)
+            for i in missing:
+                self._memo[keys[i]] = cached[i]
+            for key in keys:
+                self._memo.move_to_end(key)
+            while len(self._memo) > self.memo_entries:
+                self._memo.popitem(last=False)
+
+        sales = np.array([entry[0] for entry in cached]).reshape(len(unique), -1)[inverse.ravel()]
+        profit = np.array([entry[1] for entry in cached]).reshape(len(unique), -1)[inverse.ravel()]
+        return sales, profit
+
+    def explain(self, row):
+        """Exact attributions for one raw feature row (in ``FEATURES`` order)."""
+        start = time.perf_counter()
+        sales, profit = self.explain_batch([row], approximate=False)
+        explanation = Explanation(
+            list(row), self.sales_base, dict(zip(FEATURES, sales[0])),
+            self.profit_base, dict(zip(FEATURES, profit[0]))
+        )
+        self.last_seconds = time.perf_counter() - start
+        return explanation
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def explainer_for(reg_model, clf_model, scaler):
+    """One ExplanationEngine per loaded artifact set (the registry swaps objects on a new version)."""
+    key = (id(reg_model), id(clf_model), id(scaler))
+    with _engines_lock:
+        entry = _engines.get(key)
+        if entry is None:
+            # Keep the source models alive so their ids cannot be reused
+            entry = (ExplanationEngine(reg_model, clf_model, scaler), (reg_model, clf_model, scaler))
+            _engines.clear()
+            _engines[key] = entry
+        return entry[0]
+
+
+# ================= SUMMARIES =================
+def attribution_summary(explanation, top=3):
+    """Compact, model-grounded text of the strongest drivers, for prompts and display."""
+    row = dict(zip(FEATURES, explanation.row))
+    sales_total = explanation.sales_base + sum(explanation.sales_contributions.values())
+    profit_total = explanation.profit_base + sum(explanation.profit_contributions.values())
+
+    lines = [f"Sales: average prediction ${explanation.sales_base:,.0f} -> ${sales_total:,.0f} for this order"]
+    for name, value in sorted(explanation.sales_contributions.items(), key=lambda item: -abs(item[1]))[:top]:
+        lines.append(f"- {name} = {row[name]:g}: {value:+,.0f} $")
+    lines.append(
+        f"High-profit probability: average {explanation.profit_base:.0%} -> {profit_total:.0%} for this order"
+    )
+    for name, value in sorted(explanation.profit_contributions.items(), key=lambda item: -abs(item[1]))[:top]:
+        lines.append(f"- {name} = {row[name]:g}: {value * 100:+.0f} pts")
+    return "\n".join(lines)
+
+
+def batch_summary(sales, profit):
+    """Mean and mean-absolute attribution per feature over a batch of rows."""
+    return pd.DataFrame({
+        "Feature": FEATURES,
+        "Mean |Sales Impact|": np.abs(sales).mean(axis=0),
+        "Mean Sales Impact": sales.mean(axis=0),
+        "Mean |Profit Prob. Impact|": np.abs(profit).mean(axis=0),
+    }).sort_values("Mean |Sales Impact|", ascending=False)
@@ -0,0 +1,251 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# ================= INDEX CONFIG =================
+FILTER_COLUMNS = ["Region", "Category", "Segment", "State"]
+DRILL_LEVELS = ["Category", "Sub-Category", "Product Name"]
+DATE_COLUMN = "Order Date"
+MEASURES = ["Sales", "Profit", "Discount"]
+INDEX_CACHE_SIZE = 4
+SELECTION_CACHE_SIZE = 32
+
+
+def _smallest_int(n):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+# ================= FILTER INDEX =================
+class FilterIndex:
+    """Prebuilt per-dataset indexes that answer filtered KPIs and charts without row scans.
+
+    Per categorical column: compact codes (slot 0 = missing) and, built on
+    first use, a posting list of row positions per value (CSR layout: rows
+    sorted by code, plus per-code offsets). ``Order Date`` gets a sorted
+    position index. A filter resolves by taking the posting list of its most
+    selective condition and probing the others through their code arrays,
+    so the cost follows the size of the result, not of the dataset.
+
+    ``frame`` returns the dataset's DataFrame (e.g. from the dataset store)
+    and is only called while a structure is built. The index keeps its own
+    compact arrays, never the frame, so cached indexes do not pin datasets
+    the store has paged out.
+    """
+
+    def __init__(self, frame):
+        df = frame()
+        self.rows = len(df)
+        self.columns = list(df.columns)
+        self._frame = frame
+        self._codes = {}
+        self._labels = {}
+        self._slots = {}
+        self._counts = {}
+        self._postings = {}
+        self._measures = {}
+        self._dates = None
+        self._lock = threading.Lock()
+        self._selections = OrderedDict()
+
+    # ---------- lazily built structures ----------
+    def _column(self, col):
+        with self._lock:
+            if col not in self._codes:
+                codes, labels = pd.factorize(self._frame()[col], sort=True)
+                self._codes[col] = (codes + 1).astype(_smallest_int(len(labels) + 1))
+                self._labels[col] = np.asarray(labels, dtype=object)
+                self._counts[col] = np.bincount(self._codes[col], minlength=len(labels) + 1)
+            return self._codes[col], self._labels[col], self._counts[col]
+
+    def _posting_list(self, col):
+        codes, labels, counts = self._column(col)
+        with self._lock:
+            if col not in self._postings:
+                order = np.argsort(codes, kind="stable").astype(_smallest_int(self.rows))
+                self._postings[col] = (order, np.concatenate([[0], np.cumsum(counts)]))
+            return self._postings[col]
+
+    def _date_index(self):
+        with self._lock:
+            if self._dates is None:
+                # NaT sorts first and falls outside every range
+                # Copied: a view would keep the frame's whole datetime block alive
+                values = self._frame()[DATE_COLUMN].to_numpy(dtype="datetime64[ns]", copy=True).view("int64")
+                order = np.argsort(values, kind="stable").astype(_smallest_int(self.rows))
+                self._dates = (values, order, values[order])
+            return self._dates
+
+    def measure(self, col):
+        with self._lock:
+            if col not in self._measures:
+                values = self._frame()[col].to_numpy(dtype="float64", copy=True)
+                missing = np.isnan(values)
+                # groupby sums skip NaN; zero them once so bincount matches
+                self._measures[col] = (np.where(missing, 0.0, values) if missing.any() else values, ~missing)
+            return self._measures[col]
+
+    def codes(self, col):
+        return self._column(col)[0]
+
+    def labels(self, col):
+        return self._column(col)[1]
+
+    def date_bounds(self):
+        if DATE_COLUMN not in self.columns:
+            return None
+        _, _, sorted_dates = self._date_index()
+        valid = sorted_dates[sorted_dates != np.iinfo("int64").min]
+        if not len(valid):
+            return None
+        return pd.Timestamp(valid[0]), pd.Timestamp(valid[-1])
+
+    # ---------- filtering ----------
+    def _value_codes(self, col, values):
+        with self._lock:
+            slots = self._slots.get(col)
+        if slots is None:
+            slots = {label: slot + 1 for slot, label in enumerate(self.labels(col))}
+            with self._lock:
+                self._slots[col] = slots
+        return [slots[value] for value in values if value in slots]
+
+    def positions(self, filters=None, date_range=None):
+        """Sorted row positions matching ``{column: [values]}`` and an inclusive date range.
+
+        ``None`` means no filter applies (every row).
+        """
+        conditions = []
+        for col, values in (filters or {}).items():
+            if not values or col not in self.columns:
+                continue
+            slots = self._value_codes(col, set(values))
+            conditions.append((int(self._column(col)[2][slots].sum()), col, slots))
+
+        if date_range is not None and DATE_COLUMN in self.columns:
+            values, order, sorted_dates = self._date_index()
+            lo = pd.Timestamp(date_range[0]).value
+            hi = (pd.Timestamp(date_range[1]) + pd.Timedelta(days=1)).value
+            start, stop = np.searchsorted(sorted_dates, [lo, hi])
+            conditions.append((int(stop - start), DATE_COLUMN, (lo, hi, start, stop)))
+
+        if not conditions:
+            return None
+        conditions.sort(key=lambda condition: condition[0])
+
+        # Drive from the most selective condition's posting list
+        _, col, arg = conditions[0]
+        if col == DATE_COLUMN:
+            positions = np.sort(self._date_index()[1][arg[2]:arg[3]])
+        else:
+            order, offsets = self._posting_list(col)
+            parts = [order[offsets[slot]:offsets[slot + 1]] for slot in arg]
+            positions = np.sort(np.concatenate(parts)) if len(parts) > 1 else (parts[0] if parts else order[:0])
+
+        # ... and probe the rest through the code / date arrays of the surviving rows only
+        for _, col, arg in conditions[1:]:
+            if not len(positions):
+                break
+            if col == DATE_COLUMN:
+                dates = self._date_index()[0][positions]
+                positions = positions[(dates >= arg[0]) & (dates < arg[1])]
+            else:
+                codes, labels, _ = self._column(col)
+                lookup = np.zeros(len(labels) + 1, dtype=bool)
+                lookup[arg] = True
+                positions = positions[lookup[codes[positions]]]
+        return positions
+
+    def select(self, filters=None, date_range=None):
+        """``Selection`` for the filters, memoized so widget reruns are free."""
+        key = (
+            tuple(sorted((col, tuple(sorted(map(str, values)))) for col, values in (filters or {}).items() if values)),
+            None if date_range is None else tuple(str(pd.Timestamp(bound).date()) for bound in date_range),
+        )
+        with self._lock:
+            if key in self._selections:
+                self._selections.move_to_end(key)
+                return self._selections[key]
+        selection = Selection(self, self.positions(filters, date_range))
+        with self._lock:
+            self._selections[key] = selection
+            while len(self._selections) > SELECTION_CACHE_SIZE:
+                self._selections.popitem(last=False)
+        return selection
+
+
+# ================= SELECTION =================
+class Selection:
+    """The filtered rows, answering the same queries the dashboard asks of a ``SalesCube``."""
+
+    def __init__(self, index, positions):
+        self.index = index
+        self.positions = positions
+        self.columns = index.columns
+        self.rows = index.rows if positions is None else len(positions)
+        self._totals = {}
+
+    def _take(self, values):
+        return values if self.positions is None else values[self.positions]
+
+    def total(self, value_col):
+        if value_col not in self.columns:
+            return 0
+        return float(self._take(self.index.measure(value_col)[0]).sum())
+
+    def totals(self, group_col, value_col):
+        key = (group_col, value_col)
+        if key not in self._totals:
+            codes, labels, _ = self.index._column(group_col)
+            codes = self._take(codes)
+            sums = np.bincount(codes, weights=self._take(self.index.measure(value_col)[0]), minlength=len(labels) + 1)
+            present = np.bincount(codes, minlength=len(labels) + 1)[1:] > 0
+            self._totals[key] = pd.Series(
+                sums[1:][present], index=pd.Index(labels[present], name=group_col), name=value_col
+            )
+        return self._totals[key]
+
+    def top(self, group_col, value_col, n=15):
+        return self.totals(group_col, value_col).nlargest(n)
+
+    @property
+    def total_sales(self):
+        return self.total("Sales")
+
+    @property
+    def total_profit(self):
+        return self.total("Profit")
+
+    @property
+    def total_orders(self):
+        return self.rows
+
+    @property
+    def avg_discount(self):
+        if "Discount" not in self.columns:
+            return 0
+        values, present = self.index.measure("Discount")
+        count = int(self._take(present).sum())
+        return float(self._take(values).sum()) / count if count else 0
+
+
+# ================= PER-DATASET CACHE =================
+_index_cache = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def index_for_dataset(frame, digest):
+    """Return the filter index for a dataset (``frame()`` returns it), creating it once per content hash."""
+    with _index_lock:
+        if digest in _index_cache:
+            _index_cache.move_to_end(digest)
+            return _index_cache[digest]
+        index = FilterIndex(frame)
+        _index_cache[digest] = index
+        while len(_index_cache) > INDEX_CACHE_SIZE:
+            _index_cache.popitem(last=False)
+        return index
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import threading
+import time
+import warnings
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import joblib
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.arima.model import ARIMA
+
+from cube import MONTH_DIMENSION
+from data_cache import CACHE_DIR
+
+# ================= FORECAST CONFIG =================
+FORECAST_DIR = os.path.join(CACHE_DIR, "forecasts")
+FORECAST_ORDER = (1, 1, 1)
+DEFAULT_HORIZON = 30
+CONFIDENCE = 0.95
+# New dates are filtered through the cached parameters until the series has
+# grown by this fraction; past that it is refitted, warm-started from them.
+REFIT_GROWTH = 0.1
+FORECAST_WORKERS = os.cpu_count() or 1
+# Series entries kept in memory (least recently used dropped); the disk copy stays
+MEMORY_ENTRIES = 512
+
+SeriesForecast = namedtuple(
+    "SeriesForecast",
+    ["group", "history", "mean", "lower", "upper", "mode", "seconds"]
+)
+
+
+# ================= RESAMPLING =================
+def daily_series(df, group_cols, value_col="Sales"):
+    """Every group's daily totals as one wide frame (dates x groups), zero-filled.
+
+    One grouped pass over the rows replaces a groupby/asfreq per series.
+    """
+    dates = df["Order Date"].dt.normalize().rename("Date")
+    wide = (
+        df.groupby([dates] + [df[col] for col in group_cols], observed=True)[value_col]
+        .sum()
+        .unstack(group_cols)
+    )
+    full_range = pd.date_range(wide.index.min(), wide.index.max(), freq="D")
+    return wide.reindex(full_range).fillna(0.0)
+
+
+def monthly_series(cube, group_cols, value_col="Sales"):
+    """Monthly totals per group from the cube (streamed datasets keep no daily rows)."""
+    wide = cube.table.groupby([MONTH_DIMENSION] + group_cols)[value_col].sum().unstack(group_cols)
+    full_range = pd.period_range(wide.index.min(), wide.index.max(), freq="M")
+    wide = wide.reindex(full_range).fillna(0.0)
+    wide.index = wide.index.to_timestamp()
+    return wide
+
+
+def series_hash(index, values):
+    digest = hashlib.sha256(str(index[0]).encode("utf-8"))
+    digest.update(str(index.freqstr).encode("utf-8"))
+    digest.update(np.ascontiguousarray(values, dtype="float64").tobytes())
+    return digest.hexdigest()
+
+
+# ================= FITTING =================
+def fit_series(values, order, horizon, params=None, refit=True):
+    """Fit (or only filter with ``params``) one ARIMA and forecast ``horizon`` steps.
+
+    Module-level so it can run in a worker process.
+    """
+    start = time.perf_counter()
+    model = ARIMA(values, order=order)
+    with warnings.catch_warnings():
+        # Short or flat segment series routinely trip convergence warnings
+        warnings.simplefilter("ignore")
+        if params is not None and not refit:
+            result = model.filter(params)
+        else:
+            result = model.fit(start_params=params)
+        forecast = result.get_forecast(horizon)
+        interval = forecast.conf_int(alpha=1 - CONFIDENCE)
+    return (
+        np.asarray(result.params), np.asarray(forecast.predicted_mean),
+        interval[:, 0], interval[:, 1], time.perf_counter() - start
+    )
+
+
+# ================= FITTED-MODEL CACHE =================
+class ForecastCache:
+    """Fitted parameters and forecasts per series, in memory and on disk.
+
+    Entries are keyed by the series identity (grouping, group values, order)
+    and remember the hash of the values they were fitted on, so an unchanged
+    series is served as-is and an extended one is refitted incrementally.
+    """
+
+    def __init__(self, directory=FORECAST_DIR, memory_entries=MEMORY_ENTRIES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, identity):
+        name = hashlib.sha256(repr(identity).encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{name}.joblib")
+
+    def _remember(self, identity, entry):
+        with self._lock:
+            self._entries[identity] = entry
+            self._entries.move_to_end(identity)
+            while len(self._entries) > self.memory_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, identity):
+        with self._lock:
+            entry = self._entries.get(identity)
+            if entry is not None:
+                self._entries.move_to_end(identity)
+                return entry
+        try:
+            entry = joblib.load(self._path(identity))
+        except Exception:
+            return None
+        self._remember(identity, entry)
+        return entry
+
+    def put(self, identity, entry):
+        self._remember(identity, entry)
+        path = self._path(identity)
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            joblib.dump(entry, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError:
+            # Disk persistence is best effort; the in-memory entry still serves reruns
+            pass
+
+
+forecast_cache = ForecastCache()
+
+
+def _plan(identity, index, values, horizon):
+    """How to (re)use the cache for one series: ``(mode, params, hash, cached entry)``."""
+    digest = series_hash(index, values)
+    entry = forecast_cache.get(identity)
+    if entry is None or entry["start"] != index[0]:
+        return "fit", None, digest, entry
+    if entry["hash"] == digest:
+        return ("cached" if entry["horizon"] == horizon else "filter"), entry["params"], digest, entry
+    n = entry["rows"]
+    if n < len(values) and series_hash(index[:n], values[:n]) == entry["hash"]:
+        grown = (len(values) - n) / n
+        return ("filter" if grown < REFIT_GROWTH else "warm"), entry["params"], digest, entry
+    return "fit", None, digest, entry
+
+
+def forecast_all(wide, group_cols, horizon=DEFAULT_HORIZON, order=FORECAST_ORDER,
+                 workers=FORECAST_WORKERS, on_progress=None):
+    """Forecast every column of a wide (dates x groups) frame.
+
+    Unchanged series come straight from the cache; series with new trailing
+    dates reuse their fitted parameters (filtered, or refitted warm-started);
+    the rest are fitted across a process pool.
+    Returns ``({group: SeriesForecast}, stats)``.
+    """
+    start = time.perf_counter()
+    freq = wide.index.freqstr
+    future_index = pd.date_range(wide.index[-1], periods=horizon + 1, freq=freq)[1:]
+
+    results, tasks = {}, []
+    for group in wide.columns:
+        values = wide[group].to_numpy(dtype="float64")
+        identity = (tuple(group_cols), group if isinstance(group, tuple) else (group,), freq, order)
+        mode, params, digest, entry = _plan(identity, wide.index, values, horizon)
+        history = wide[group]
+        if mode == "cached":
+            results[group] = SeriesForecast(group, history, *entry["forecast"], "cached", 0.0)
+        else:
+            tasks.append((group, identity, digest, mode, params, values, history))
+
+    def collect(task, fitted):
+        group, identity, digest, mode, _, values, history = task
+        params, mean, lower, upper, seconds = fitted
+        forecast = tuple(pd.Series(arr, index=future_index) for arr in (mean, lower, upper))
+        forecast_cache.put(identity, {
+            "hash": digest, "rows": len(values), "start": wide.index[0],
+            "params": params, "horizon": horizon, "forecast": forecast,
+        })
+        results[group] = SeriesForecast(group, history, *forecast, mode, seconds)
+        if on_progress is not None:
+            on_progress(len(results) / len(wide.columns))
+
+    args = [(task[5], order, horizon, task[4], task[3] in ("fit", "warm")) for task in tasks]
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            for task, fitted in zip(tasks, pool.map(fit_series, *zip(*args))):
+                collect(task, fitted)
+    else:
+        for task, arg in zip(tasks, args):
+            collect(task, fit_series(*arg))
+
+    modes = [result.mode for result in results.values()]
+    stats = {
+        "series": len(results),
+        "fit": modes.count("fit"),
+        "warm": modes.count("warm"),
+        "filter": modes.count("filter"),
+        "cached": modes.count("cached"),
+        "seconds": time.perf_counter() - start,
+    }
+    return results, stats
+
+
+def forecast_table(results, group_cols):
+    """Long table of every forecast point, for display and download."""
+    frames = []
+    for group, result in results.items():
+        frame = pd.DataFrame({
+            "Date": result.mean.index,
+            "Forecast": result.mean.to_numpy(),
+            "Lower": result.lower.to_numpy(),
+            "Upper": result.upper.to_numpy(),
+        })
+        values = group if isinstance(group, tuple) else (group,)
+        for i, (col, value) in enumerate(zip(group_cols, values)):
+            frame.insert(i, col, value)
+        frames.append(frame)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
@@ -0,0 +1,131 @@
+import os
+import threading
+
+import numpy as np
+
+# ================= ENGINE CONFIG =================
+# "sklearn" (default) scores with the estimators themselves; "array" uses the
+# flattened NumPy forests below, which avoid sklearn's per-call overhead for
+# single rows and small batches (large batches are faster in sklearn itself).
+INFERENCE_BACKEND = os.getenv("BI_INFERENCE_BACKEND", "sklearn")
+BLOCK_ROWS = 2048
+
+
+# ================= FLATTENED FOREST =================
+def _float32_boundary(threshold):
+    """Smallest float64 x with ``float32(x) > threshold`` (up to the rounding tie)."""
+    t32 = threshold.astype(np.float32)
+    t32 = np.where(t32 > threshold, np.nextafter(t32, np.float32(-np.inf)), t32)
+    upper = np.nextafter(t32, np.float32(np.inf))
+    return (t32.astype(np.float64) + upper.astype(np.float64)) / 2
+
+
+class ArrayForest:
+    """A fitted sklearn forest flattened into contiguous node arrays.
+
+    All trees share one set of ``feature/threshold/left/right/value`` arrays
+    and are walked together, one depth level per step, for a whole block of
+    rows. Leaves point at themselves, so finished rows simply stay put.
+    When a ``StandardScaler`` is given it is folded into the thresholds
+    (``(x - mean) / scale <= t``  <=>  ``x <= t * scale + mean``), so the
+    engine takes raw, unscaled features.
+
+    sklearn compares ``float32(x) <= t``. To match it exactly each threshold
+    is first moved to the float32 rounding boundary above it, so the test
+    becomes a strict ``x < boundary`` on float64 inputs.
+    """
+
+    def __init__(self, forest, scaler=None):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset = 0
+        max_depth = 0
+
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            is_leaf = tree.children_left == -1
+            node_ids = np.arange(tree.node_count)
+
+            feature = np.where(is_leaf, 0, tree.feature).astype(np.intp)
+            threshold = _float32_boundary(np.asarray(tree.threshold, dtype=np.float64))
+            if scaler is not None:
+                threshold = threshold * scaler.scale_[feature] + scaler.mean_[feature]
+            threshold[is_leaf] = np.inf
+
+            value = np.asarray(tree.value, dtype=np.float64)[:, 0, :]
+            if hasattr(forest, "classes_"):
+                # Per-tree class probabilities, as in predict_proba
+                value = value / value.sum(axis=1, keepdims=True)
+
+            features.append(feature)
+            thresholds.append(threshold)
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+            values.append(value)
+            roots.append(offset)
+            offset += tree.node_count
+            max_depth = max(max_depth, tree.max_depth)
+
+        self.feature = np.concatenate(features)
+        self.threshold = np.concatenate(thresholds)
+        self.left = np.concatenate(lefts)
+        self.right = np.concatenate(rights)
+        self.value = np.concatenate(values)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = max_depth
+        self.classes_ = getattr(forest, "classes_", None)
+
+    def _leaves(self, X):
+        idx = np.repeat(self.roots[None, :], X.shape[0], axis=0)
+        rows = np.arange(X.shape[0])[:, None]
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[idx]] < self.threshold[idx]
+            idx = np.where(go_left, self.left[idx], self.right[idx])
+        return idx
+
+    def _mean_values(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        out = np.empty((X.shape[0], self.value.shape[1]))
+        for start in range(0, X.shape[0], BLOCK_ROWS):
+            block = X[start:start + BLOCK_ROWS]
+            out[start:start + len(block)] = self.value[self._leaves(block)].mean(axis=1)
+        return out
+
+    def predict_proba(self, X):
+        return self._mean_values(X)
+
+    def predict(self, X):
+        values = self._mean_values(X)
+        if self.classes_ is None:
+            return values[:, 0]
+        return self.classes_[values.argmax(axis=1)]
+
+
+# ================= COMPILED MODEL PAIR =================
+class CompiledModels:
+    """Sales regressor + profit classifier scoring raw (unscaled) feature rows."""
+
+    def __init__(self, reg_model, clf_model, scaler):
+        self.reg = ArrayForest(reg_model, scaler)
+        self.clf = ArrayForest(clf_model, scaler)
+
+    def predict(self, X):
+        return self.reg.predict(X), self.clf.predict(X)
+
+
+_engines = {}
+_engines_lock = threading.Lock()
+
+
+def engine_for(reg_model, clf_model, scaler):
+    """Compile the models once per loaded artifact set (registry objects are stable)."""
+    key = (id(reg_model), id(clf_model), id(scaler))
+    with _engines_lock:
+        entry = _engines.get(key)
+        if entry is None:
+            # Keep the source models alive so their ids cannot be reused
+            entry = (CompiledModels(reg_model, clf_model, scaler), (reg_model, clf_model, scaler))
+            _engines.clear()
+            _engines[key] = entry
+        return entry[0]
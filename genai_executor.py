@@ -0,0 +1,123 @@
+import asyncio
+import random
+import time
+from collections import namedtuple
+
+# ================= EXECUTOR CONFIG =================
+MAX_CONCURRENCY = 3
+REQUEST_TIMEOUT = 60.0
+MAX_RETRIES = 2
+BACKOFF_SECONDS = 0.5
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+
+InsightResult = namedtuple(
+    "InsightResult",
+    ["text", "error", "seconds", "first_token_seconds", "prompt_tokens", "completion_tokens"],
+    defaults=[None, None]
+)
+
+
+def _is_retryable(error):
+    if isinstance(error, (asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = getattr(error, "status_code", None)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    # SDK connection/timeout errors carry no status code
+    name = type(error).__name__
+    return "Connection" in name or "Timeout" in name
+
+
+# ================= ASYNC GENAI EXECUTOR =================
+class GenAIExecutor:
+    """Runs several chat completions concurrently, streaming tokens as they arrive.
+
+    ``client_factory`` returns an async OpenAI-compatible client (e.g.
+    ``groq.AsyncGroq``); a fresh one is created per ``run`` so it is bound to
+    that run's event loop. Requests share a semaphore of ``max_concurrency``,
+    each attempt is limited to ``timeout`` seconds, and transient failures
+    are retried with jittered exponential backoff.
+    """
+
+    def __init__(self, client_factory, model, temperature, system_prompt,
+                 max_concurrency=MAX_CONCURRENCY, timeout=REQUEST_TIMEOUT,
+                 max_retries=MAX_RETRIES, backoff=BACKOFF_SECONDS):
+        self.client_factory = client_factory
+        self.model = model
+        self.temperature = temperature
+        self.system_prompt = system_prompt
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    async def _stream(self, client, name, prompt, on_update, started):
+        stream = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt}
+            ],
+            temperature=self.temperature,
+            stream=True
+        )
+        parts = []
+        first_token = None
+        usage = None
+        async for chunk in stream:
+            # OpenAI-style ``usage`` or Groq's ``x_groq.usage``, sent on the final chunk
+            usage = getattr(chunk, "usage", None) or getattr(getattr(chunk, "x_groq", None), "usage", None) or usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if not delta:
+                continue
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            parts.append(delta)
+            if on_update is not None:
+                on_update(name, "".join(parts))
+        if usage is not None:
+            return "".join(parts), first_token, usage.prompt_tokens, usage.completion_tokens
+        # No usage reported: each streamed delta is roughly one token
+        return "".join(parts), first_token, None, len(parts)
+
+    async def _run_one(self, client, semaphore, name, prompt, on_update):
+        async with semaphore:
+            started = time.perf_counter()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    text, first_token, prompt_tokens, completion_tokens = await asyncio.wait_for(
+                        self._stream(client, name, prompt, on_update, started), self.timeout
+                    )
+                    return InsightResult(text, None, time.perf_counter() - started, first_token,
+                                         prompt_tokens, completion_tokens)
+                except Exception as e:
+                    if attempt == self.max_retries or not _is_retryable(e):
+                        return InsightResult(None, e, time.perf_counter() - started, None)
+                    if on_update is not None:
+                        # Discard the partial answer of the failed attempt
+                        on_update(name, "")
+                    await asyncio.sleep(self.backoff * 2 ** attempt * (1 + random.random()))
+
+    async def run_async(self, prompts, on_update=None):
+        client = self.client_factory()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            results = await asyncio.gather(*[
+                self._run_one(client, semaphore, name, prompt, on_update)
+                for name, prompt in prompts.items()
+            ])
+        finally:
+            close = getattr(client, "close", None)
+            if close is not None:
+                await close()
+        return dict(zip(prompts, results))
+
+    def run(self, prompts, on_update=None):
+        """Answer ``{name: prompt}`` concurrently; returns ``{name: InsightResult}``.
+
+        ``on_update(name, text_so_far)`` is called on the calling thread for
+        every streamed token, so it can safely update Streamlit placeholders.
+        """
+        return asyncio.run(self.run_async(prompts, on_update))
@@ -0,0 +1,218 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from data_cache import CACHE_DIR
+
+# ================= CACHE CONFIG =================
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, "llm_responses.sqlite")
+LLM_CACHE_TTL = float(os.getenv("BI_LLM_CACHE_TTL", 24 * 3600))
+LLM_CACHE_MAX_BYTES = int(os.getenv("BI_LLM_CACHE_MAX_BYTES", 50 * 1024 * 1024))
+MEMORY_ENTRIES = 256
+
+
+def normalize_prompt(prompt):
+    # Prompts are indented f-strings; layout differences must not miss the cache
+    return re.sub(r"\s+", " ", prompt).strip()
+
+
+def cache_key(prompt, model, temperature, system=""):
+    payload = json.dumps([model, temperature, system, normalize_prompt(prompt)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ================= RESPONSE CACHE =================
+class ResponseCache:
+    """LLM completions cached in an in-memory LRU backed by SQLite.
+
+    Entries expire after ``ttl`` seconds; the on-disk store is trimmed to
+    ``max_bytes`` by least-recent use. Concurrent identical requests (from
+    any session in the process) are coalesced onto one upstream call.
+    """
+
+    def __init__(self, path=LLM_CACHE_PATH, ttl=LLM_CACHE_TTL,
+                 max_bytes=LLM_CACHE_MAX_BYTES, memory_entries=MEMORY_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.memory_entries = memory_entries
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+            "errors": 0,
+            "latency_saved_seconds": 0.0,
+        }
+
+    # ---------- SQLite store ----------
+    def _connect(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, response TEXT, created REAL, "
+                "last_used REAL, latency REAL, size INTEGER)"
+            )
+            db.commit()
+            self._db = db
+        return self._db
+
+    def _disk_get(self, key, now):
+        try:
+            with self._db_lock:
+                db = self._connect()
+                row = db.execute(
+                    "SELECT response, created, latency FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                if now - row[1] > self.ttl:
+                    db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    db.commit()
+                    return None
+                db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (now, key))
+                db.commit()
+                return row[0], row[1], row[2]
+        except sqlite3.Error:
+            return None
+
+    def _disk_put(self, key, response, created, latency):
+        size = len(response.encode("utf-8"))
+        try:
+            with self._db_lock:
+                db = self._connect()
+                db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, response, created, created, latency, size)
+                )
+                db.execute("DELETE FROM responses WHERE created < ?", (created - self.ttl,))
+                total = db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+                if total > self.max_bytes:
+                    # Drop least-recently-used rows until the store fits again
+                    rows = db.execute("SELECT key, size FROM responses ORDER BY last_used").fetchall()
+                    stale = []
+                    for stale_key, stale_size in rows:
+                        if total <= self.max_bytes:
+                            break
+                        stale.append((stale_key,))
+                        total -= stale_size
+                    db.executemany("DELETE FROM responses WHERE key = ?", stale)
+                db.commit()
+        except sqlite3.Error:
+            # The cache is best effort; the answer was already produced
+            pass
+
+    # ---------- in-memory LRU ----------
+    def _memory_get(self, key, now):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        if now - entry[1] > self.ttl:
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return entry
+
+    def _memory_put(self, key, entry):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    # ---------- public API ----------
+    def lookup(self, key):
+        """Return the cached response for ``key`` (memory, then disk) or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory_get(key, now)
+            if entry is not None:
+                self.stats["memory_hits"] += 1
+                self.stats["latency_saved_seconds"] += entry[2]
+                return entry[0]
+
+        entry = self._disk_get(key, now)
+        if entry is None:
+            return None
+        with self._lock:
+            self.stats["disk_hits"] += 1
+            self.stats["latency_saved_seconds"] += entry[2]
+            self._memory_put(key, entry)
+        return entry[0]
+
+    def claim(self, key):
+        """Register an upstream call for ``key``.
+
+        Returns ``(future, leader)``. Only the leader calls upstream and must
+        finish with ``resolve``/``fail``; everyone else waits on the future.
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.stats["coalesced"] += 1
+                return future, False
+            future = Future()
+            self._inflight[key] = future
+            return future, True
+
+    def resolve(self, key, response, latency):
+        entry = (response, time.time(), latency)
+        self._disk_put(key, *entry)
+        with self._lock:
+            self.stats["misses"] += 1
+            self._memory_put(key, entry)
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_result(response)
+
+    def fail(self, key, error):
+        # Errors are handed to the waiters but never cached
+        with self._lock:
+            self.stats["errors"] += 1
+            future = self._inflight.pop(key, None)
+        if future is not None:
+            future.set_exception(error)
+
+    def get_or_call(self, key, call):
+        """Return the cached response for ``key`` or compute it with ``call()``."""
+        response = self.lookup(key)
+        if response is not None:
+            return response
+
+        future, leader = self.claim(key)
+        if not leader:
+            return future.result()
+
+        start = time.perf_counter()
+        try:
+            response = call()
+        except BaseException as e:
+            self.fail(key, e)
+            raise
+        self.resolve(key, response, time.perf_counter() - start)
+        return response
+
+    def summary(self):
+        with self._lock:
+            stats = dict(self.stats)
+        hits = stats["memory_hits"] + stats["disk_hits"] + stats["coalesced"]
+        lookups = hits + stats["misses"]
+        stats["hits"] = hits
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
+
+
+# Module-level singleton shared by every session in the process
+response_cache = ResponseCache()
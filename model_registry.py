@@ -0,0 +1,139 @@
+import hashlib
+import os
+import threading
+import time
+
+# ================= REGISTRY CONFIG =================
+# Same location the app has always used: a "model" folder next to the project
+MODEL_DIR = os.getenv(
+    "BI_MODEL_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "model")
+)
+# "r" reads pickled arrays through a temporary mapping instead of a heap buffer,
+# which avoids a second copy while loading. sklearn trees still copy their nodes
+# onto the heap, so a loaded forest is private to each process either way.
+# Set BI_MODEL_MMAP="" to read artifacts into the heap instead.
+DEFAULT_MMAP_MODE = os.getenv("BI_MODEL_MMAP", "r") or None
+# The artifacts the app and service score with, always loaded as one set
+MODEL_ARTIFACTS = ["sales_regression.pkl", "profit_classifier.pkl", "scaler.pkl"]
+# Written by train.py's promote: names the live folder under <model-dir>/versions/
+CURRENT_FILE = "CURRENT"
+
+
+def _file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def artifact_paths(model_dir, names):
+    """Where ``names`` live now: all in the promoted version folder (``CURRENT`` is
+    read once, so they always come from the same version), or flat in
+    ``model_dir`` when nothing has been promoted.
+    """
+    try:
+        with open(os.path.join(model_dir, CURRENT_FILE)) as f:
+            version = f.read().strip()
+    except OSError:
+        version = ""
+    base = os.path.join(model_dir, "versions", version) if version else model_dir
+    return [os.path.join(base, name) for name in names]
+
+
+def _rss_bytes():
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.Process().memory_info().rss
+
+
+# ================= MODEL REGISTRY =================
+class ModelRegistry:
+    """Process-wide, read-only cache of joblib artifacts.
+
+    Each artifact is loaded once per process and shared by every Streamlit
+    session. A changed mtime/size (or a newly promoted version) triggers a
+    re-hash, and the artifact is hot-swapped only when its content hash
+    actually changed.
+    """
+
+    def __init__(self, mmap_mode=DEFAULT_MMAP_MODE):
+        self.mmap_mode = mmap_mode
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        path = os.path.abspath(path)
+        return self.get_many(os.path.dirname(path), [os.path.basename(path)])[0]
+
+    def get_many(self, model_dir, names=MODEL_ARTIFACTS):
+        """The artifacts ``names`` of ``model_dir``, all from the same promoted version."""
+        model_dir = os.path.abspath(model_dir)
+        return tuple(
+            self._get(os.path.join(model_dir, name), path)
+            for name, path in zip(names, artifact_paths(model_dir, names))
+        )
+
+    def _get(self, key, path):
+        # Entries are keyed by the logical path, so a promotion replaces its predecessor
+        stat = os.stat(path)
+        entry = self._entries.get(key)
+        if entry is not None and entry["path"] == path and entry["stat"] == (stat.st_mtime_ns, stat.st_size):
+            return entry["model"]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            stat = os.stat(path)
+            file_stat = (stat.st_mtime_ns, stat.st_size)
+            if entry is not None and entry["path"] == path and entry["stat"] == file_stat:
+                return entry["model"]
+
+            digest = _file_hash(path)
+            if entry is not None and entry["hash"] == digest:
+                # Touched or re-promoted but unchanged, keep the loaded model
+                entry.update(path=path, stat=file_stat)
+                return entry["model"]
+
+            # Deferred so importing the registry (e.g. at app start) stays cheap
+            import joblib
+
+            rss_before = _rss_bytes()
+            start = time.perf_counter()
+            model = joblib.load(path, mmap_mode=self.mmap_mode)
+            load_seconds = time.perf_counter() - start
+            rss_after = _rss_bytes()
+
+            self._entries[key] = {
+                "model": model,
+                "path": path,
+                "stat": file_stat,
+                "hash": digest,
+                "load_seconds": load_seconds,
+                "file_bytes": stat.st_size,
+                "rss_delta_bytes": None if rss_before is None else rss_after - rss_before,
+                "loaded_at": time.time(),
+                "version": 1 if entry is None else entry["version"] + 1,
+            }
+            return model
+
+    def stats(self):
+        """Load time and memory per loaded artifact, for display."""
+        rows = []
+        for path, entry in list(self._entries.items()):
+            rss_delta = entry["rss_delta_bytes"]
+            rows.append({
+                "model": os.path.basename(path),
+                "version": entry["version"],
+                "hash": entry["hash"][:12],
+                "load_ms": round(entry["load_seconds"] * 1000, 1),
+                "file_mb": round(entry["file_bytes"] / 1e6, 2),
+                "rss_delta_mb": None if rss_delta is None else round(rss_delta / 1e6, 2),
+            })
+        return rows
+
+
+# Module-level singleton: imported modules survive Streamlit reruns
+registry = ModelRegistry()
@@ -0,0 +1,349 @@
+"""Month/region partitioned Parquet store for multi-file Superstore exports.
+
+    python partition_store.py ingest exports/ [more.csv ...] [--workers 4]
+    python partition_store.py list [--months 2016-01:2016-12] [--regions West East]
+
+Each CSV is parsed on a process pool, checked for the Superstore columns
+and split into ``month=YYYY-MM/region=<name>/<file digest>.parquet``
+files. Ingestion is keyed by file content, so adding next month's export
+only writes that file's partitions; readers open only the partitions that
+match their month range and regions. A file ingested under the name of an
+earlier one (a corrected or month-to-date re-export) replaces it, and
+``remove`` drops a file's rows altogether.
+
+    python partition_store.py remove superstore_2016-12.csv
+"""
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import quote
+
+import pandas as pd
+
+from data_cache import CACHE_DIR, CATEGORICAL_COLUMNS, hash_bytes, parse_csv
+
+# ================= PARTITION CONFIG =================
+PARTITION_DIR = os.getenv("BI_PARTITION_DIR", os.path.join(CACHE_DIR, "partitions"))
+REQUIRED_COLUMNS = ["Order ID", "Order Date", "Region", "Category", "Segment",
+                    "Sales", "Quantity", "Discount", "Profit"]
+INGEST_WORKERS = os.cpu_count() or 1
+UNDATED = "undated"
+MISSING_REGION = "__missing__"
+# Bump when the partition layout changes so old manifests are ignored
+MANIFEST_VERSION = 1
+
+
+def missing_columns(columns):
+    present = {str(col).strip() for col in columns}
+    return [col for col in REQUIRED_COLUMNS if col not in present]
+
+
+def parse_month_range(text):
+    """``"2016-01:2016-06"`` (or a single ``"2016-01"``) to an inclusive range; empty means all."""
+    if not text:
+        return None
+    first, _, last = text.partition(":")
+    return first, last or first
+
+
+def _write_parquet(df, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _partition_path(month, region, digest):
+    return f"month={month}/region={quote(region, safe='')}/{digest[:16]}.parquet"
+
+
+def _ingest_file(directory, name, source, digest):
+    """Parse one CSV (bytes or a path) and write its partitions; runs in a worker process."""
+    start = time.perf_counter()
+    if isinstance(source, str):
+        with open(source, "rb") as f:
+            source = f.read()
+    try:
+        df = parse_csv(source)
+    except Exception as e:
+        return {"file": name, "digest": digest, "status": "error", "error": f"unreadable CSV: {e}"}
+    missing = missing_columns(df.columns)
+    if missing:
+        return {"file": name, "digest": digest, "status": "error",
+                "error": f"missing columns: {', '.join(missing)}"}
+
+    months = df["Order Date"].dt.strftime("%Y-%m").fillna(UNDATED)
+    regions = df["Region"].astype(object).fillna(MISSING_REGION).astype(str)
+    partitions = []
+    for (month, region), part in df.groupby([months, regions], sort=True):
+        path = _partition_path(month, region, digest)
+        _write_parquet(part, os.path.join(directory, path))
+        partitions.append({"month": month, "region": region, "path": path, "rows": len(part)})
+    return {"file": name, "digest": digest, "status": "ingested", "rows": len(df),
+            "partitions": partitions, "seconds": round(time.perf_counter() - start, 3)}
+
+
+# ================= PARTITION STORE =================
+class PartitionStore:
+    """Superstore rows partitioned by order month and region, one Parquet file
+    per (month, region, source file).
+
+    ``manifest.json`` lists every ingested file and its partitions; it is
+    the only thing readers consult to prune, so a partially written ingest
+    (no manifest entry yet) is never read.
+    """
+
+    def __init__(self, directory=PARTITION_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, "manifest.json")
+        self._lock = threading.Lock()
+        # Partition files loaded datasets may reload, by holder key; deleting them waits for release()
+        self._held = {}
+        self._deferred = set()
+
+    # ---------- manifest ----------
+    def manifest(self):
+        try:
+            with open(self.manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        if manifest.get("version") != MANIFEST_VERSION:
+            return {}
+        return manifest["files"]
+
+    def _update(self, results=(), remove=()):
+        """Record ingested ``results`` and drop the files named in ``remove``.
+
+        An ingested file supersedes any entry with the same file name. The
+        dropped entries' partition files are deleted once the new manifest is
+        in place (files still held are deleted on their last release), and
+        the dropped entries are returned.
+        """
+        with self._lock:
+            # Re-read so files ingested by another session since are kept
+            files = self.manifest()
+            names = set(remove) | {result["file"] for result in results}
+            stale = [digest for digest, entry in files.items() if entry["file"] in names]
+            dropped = [files.pop(digest) for digest in stale]
+            for result in results:
+                files[result["digest"]] = {
+                    "file": result["file"], "rows": result["rows"],
+                    "partitions": result["partitions"], "ingested": time.time(),
+                }
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"version": MANIFEST_VERSION, "files": files}, f)
+            os.replace(tmp_path, self.manifest_path)
+
+            paths = {os.path.join(self.directory, part["path"]) for entry in dropped for part in entry["partitions"]}
+            held = {path for path in paths if any(path in holder for holder in self._held.values())}
+            # Content re-ingested after a removal rewrote the same paths; they are live again
+            self._deferred -= {os.path.join(self.directory, part["path"])
+                               for result in results for part in result["partitions"]}
+            self._deferred |= held
+        self._delete(paths - held)
+        return dropped
+
+    def _delete(self, paths):
+        for path in paths:
+            try:
+                os.remove(path)
+                os.removedirs(os.path.dirname(path))
+            except OSError:
+                # Already gone, or the month/region folder still holds other files
+                pass
+
+    def hold(self, key, paths):
+        """Keep ``paths`` on disk while ``key`` (e.g. a loaded dataset) may still read them."""
+        with self._lock:
+            self._held[key] = set(paths)
+
+    def release(self, key):
+        """Drop ``key``'s hold, deleting files that were removed or replaced meanwhile."""
+        with self._lock:
+            self._held.pop(key, None)
+            ready = {path for path in self._deferred if not any(path in holder for holder in self._held.values())}
+            self._deferred -= ready
+        self._delete(ready)
+
+    # ---------- ingestion ----------
+    def ingest(self, sources, workers=INGEST_WORKERS, on_progress=None):
+        """Ingest ``(name, bytes or path)`` pairs, in parallel; one result dict per file.
+
+        Files whose content was ingested before are skipped, and a file
+        failing validation is reported without stopping the others. A file
+        named like an ingested one replaces it (status ``"replaced"``), so its
+        rows are never counted twice.
+        """
+        known = self.manifest()
+        previous = {entry["file"] for entry in known.values()}
+        results, tasks = [], []
+        for name, source in sources:
+            if isinstance(source, str):
+                with open(source, "rb") as f:
+                    digest = hash_bytes(f.read())
+            else:
+                digest = hash_bytes(source)
+            if any(task[1] == name for task in tasks):
+                results.append({"file": name, "digest": digest, "status": "error",
+                                "error": "another file in this batch has the same name"})
+            elif digest in known or any(task[3] == digest for task in tasks):
+                results.append({"file": name, "digest": digest, "status": "already ingested",
+                                "rows": known.get(digest, {}).get("rows", 0), "partitions": []})
+            else:
+                tasks.append((self.directory, name, source, digest))
+
+        total = len(results) + len(tasks)
+
+        def collect(result):
+            results.append(result)
+            if on_progress is not None:
+                on_progress(len(results) / total)
+
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+                for result in pool.map(_ingest_file, *zip(*tasks)):
+                    collect(result)
+        else:
+            for task in tasks:
+                collect(_ingest_file(*task))
+
+        ingested = [result for result in results if result["status"] == "ingested"]
+        if ingested:
+            self._update(ingested)
+        for result in ingested:
+            if result["file"] in previous:
+                result["status"] = "replaced"
+        return results
+
+    def remove(self, names):
+        """Drop every ingested file in ``names`` and delete its partitions; returns the dropped entries.
+
+        Partition files a loaded dataset still holds (see ``hold``) are kept
+        until it is released, so those sessions can still reload their rows.
+        """
+        return self._update(remove=names)
+
+    def files(self):
+        """Ingested files, oldest first, for display."""
+        return sorted(({
+            "file": entry["file"],
+            "rows": entry["rows"],
+            "partitions": len(entry["partitions"]),
+            "ingested": time.strftime("%Y-%m-%d %H:%M", time.localtime(entry["ingested"])),
+        } for entry in self.manifest().values()), key=lambda row: row["ingested"])
+
+    # ---------- pruning ----------
+    def partitions(self, months=None, regions=None):
+        """Partitions inside the inclusive ``(first, last)`` month range and ``regions``.
+
+        ``None`` (or an empty region list) means no restriction; undated rows
+        only match when no month range is given.
+        """
+        regions = set(regions) if regions else None
+        selected = []
+        for entry in self.manifest().values():
+            for part in entry["partitions"]:
+                if months is not None and not (part["month"] != UNDATED and months[0] <= part["month"] <= months[1]):
+                    continue
+                if regions is not None and part["region"] not in regions:
+                    continue
+                selected.append(part)
+        return sorted(selected, key=lambda part: (part["month"], part["region"], part["path"]))
+
+    def paths(self, months=None, regions=None):
+        return [os.path.join(self.directory, part["path"]) for part in self.partitions(months, regions)]
+
+    def months(self):
+        return sorted({part["month"] for part in self.partitions()} - {UNDATED})
+
+    def regions(self):
+        return sorted({part["region"] for part in self.partitions()} - {MISSING_REGION})
+
+    def fingerprint(self, paths):
+        """Content hash of a set of partition files (their names embed the source file's digest)."""
+        names = "\n".join(sorted(os.path.relpath(path, self.directory) for path in paths))
+        return hashlib.sha256(names.encode()).hexdigest()
+
+    def read(self, months=None, regions=None, columns=None):
+        """One frame of the matching partitions only, optionally just ``columns``."""
+        return self.read_paths(self.paths(months, regions), columns)
+
+    def read_paths(self, paths, columns=None):
+        """One frame of exactly these partition files (e.g. a selection captured earlier)."""
+        import pyarrow.parquet as pq
+
+        frames = []
+        for path in paths:
+            names = pq.read_schema(path).names
+            wanted = None if columns is None else [col for col in columns if col in names]
+            frames.append(pd.read_parquet(path, columns=wanted))
+        if not frames:
+            return pd.DataFrame(columns=columns or REQUIRED_COLUMNS)
+        df = pd.concat(frames, ignore_index=True)
+        # Files carry different category sets; concat falls back to object
+        for col in CATEGORICAL_COLUMNS:
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+                df[col] = df[col].astype("category")
+        return df
+
+
+# Module-level singleton shared by every session
+partition_store = PartitionStore()
+
+
+# ================= CLI =================
+def _csv_sources(inputs):
+    for source in inputs:
+        if os.path.isdir(source):
+            for name in sorted(os.listdir(source)):
+                if name.lower().endswith(".csv"):
+                    yield name, os.path.join(source, name)
+        else:
+            yield os.path.basename(source), source
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dir", default=PARTITION_DIR)
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest = commands.add_parser("ingest", help="Ingest CSV files or folders of CSVs")
+    ingest.add_argument("inputs", nargs="+")
+    ingest.add_argument("--workers", type=int, default=INGEST_WORKERS)
+    removal = commands.add_parser("remove", help="Drop ingested files (by file name) and their partitions")
+    removal.add_argument("names", nargs="+")
+    listing = commands.add_parser("list", help="Show the partitions matching a filter")
+    listing.add_argument("--months", help="YYYY-MM or YYYY-MM:YYYY-MM")
+    listing.add_argument("--regions", nargs="*")
+    args = parser.parse_args()
+
+    store = PartitionStore(args.dir)
+    if args.command == "ingest":
+        start = time.perf_counter()
+        results = store.ingest(list(_csv_sources(args.inputs)), workers=args.workers)
+        for result in results:
+            detail = result.get("error") or f"{result['rows']:,} rows, {len(result['partitions'])} partitions"
+            print(f"{result['file']:<32} {result['status']:<17} {detail}")
+        print(f"{len(results)} files in {time.perf_counter() - start:.1f}s")
+    elif args.command == "remove":
+        dropped = store.remove(args.names)
+        for entry in dropped:
+            print(f"removed {entry['file']}: {entry['rows']:,} rows, {len(entry['partitions'])} partitions")
+        missing = set(args.names) - {entry["file"] for entry in dropped}
+        if missing:
+            print(f"not ingested: {', '.join(sorted(missing))}")
+    else:
+        parts = store.partitions(parse_month_range(args.months), args.regions)
+        for part in parts:
+            print(f"{part['month']}  {part['region']:<12} {part['rows']:>9,}  {part['path']}")
+        print(f"{len(parts)} partitions, {sum(part['rows'] for part in parts):,} rows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+import hashlib
+import io
+import re
+import threading
+from collections import OrderedDict
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# ================= REPORT CONFIG =================
+REPORT_TITLE = "AI Business Intelligence Report"
+REPORT_CACHE_ENTRIES = 32
+CHART_WIDTH = 8.4 * cm
+CHART_HEIGHT = CHART_WIDTH * 0.6
+# Charts are printed 8.4 cm wide; 50 dpi renders (500 px) are ~150 dpi on paper
+# and keep reportlab's per-build image encoding cheap.
+REPORT_CHART_DPI = 50
+
+_styles = getSampleStyleSheet()
+
+
+def report_key(text, kpis, chart_images):
+    digest = hashlib.sha256(text.encode("utf-8"))
+    for name, value in kpis:
+        digest.update(f"{name}={value}".encode("utf-8"))
+    for image in chart_images:
+        digest.update(hashlib.sha256(image).digest())
+    return digest.hexdigest()
+
+
+# ================= LAYOUT =================
+def _inline_markup(line):
+    # Keep the LLM's **bold** emphasis, escape everything else for reportlab
+    return re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", escape(line))
+
+
+def _text_flowables(text):
+    flowables = []
+    for raw in text.split("\n"):
+        line = raw.strip()
+        if not line:
+            flowables.append(Spacer(1, 6))
+        elif line.startswith("#"):
+            flowables.append(Paragraph(_inline_markup(line.lstrip("#").strip()), _styles["Heading2"]))
+        elif line[:2] in ("- ", "* ", "• "):
+            flowables.append(Paragraph(_inline_markup(line[2:]), _styles["BodyText"], bulletText="•"))
+        else:
+            flowables.append(Paragraph(_inline_markup(line), _styles["BodyText"]))
+    return flowables
+
+
+def _kpi_table(kpis):
+    table = Table([["Metric", "Value"]] + [[name, value] for name, value in kpis],
+                  colWidths=[7 * cm, 7 * cm])
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#667eea")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.HexColor("#8b92a7")),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f2f3f7")]),
+        ("ALIGN", (1, 1), (1, -1), "RIGHT"),
+    ]))
+    return table
+
+
+def _chart_grid(chart_images):
+    cells = [Image(io.BytesIO(image), width=CHART_WIDTH, height=CHART_HEIGHT) for image in chart_images]
+    rows = [cells[i:i + 2] for i in range(0, len(cells), 2)]
+    if len(rows[-1]) == 1:
+        rows[-1].append("")
+    return Table(rows, colWidths=[CHART_WIDTH + 0.2 * cm] * 2)
+
+
+def build_report_pdf(text, kpis=(), chart_images=()):
+    """Lay out the report into an in-memory PDF and return its bytes.
+
+    Paragraphs are word-wrapped and paginated by reportlab's flowables;
+    ``kpis`` is a sequence of ``(name, formatted value)`` rows and
+    ``chart_images`` are PNG bytes (e.g. the cached EDA charts).
+    """
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=A4, title=REPORT_TITLE,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm
+    )
+
+    story = [Paragraph(REPORT_TITLE, _styles["Title"])]
+    if kpis:
+        story += [Paragraph("Key Metrics", _styles["Heading2"]), _kpi_table(kpis), Spacer(1, 12)]
+    if chart_images:
+        story += [Paragraph("Dashboard", _styles["Heading2"]), _chart_grid(chart_images), Spacer(1, 12)]
+    story += [Paragraph("AI Analysis", _styles["Heading2"])] + _text_flowables(text)
+
+    doc.build(story)
+    return buffer.getvalue()
+
+
+# ================= REPORT CACHE =================
+_report_cache = OrderedDict()
+_report_lock = threading.Lock()
+
+
+def generate_pdf(text, kpis=(), chart_images=()):
+    """PDF bytes for a report, cached by a hash of its full content."""
+    key = report_key(text, kpis, chart_images)
+    with _report_lock:
+        if key in _report_cache:
+            _report_cache.move_to_end(key)
+            return _report_cache[key]
+
+    pdf = build_report_pdf(text, kpis, chart_images)
+
+    with _report_lock:
+        _report_cache[key] = pdf
+        while len(_report_cache) > REPORT_CACHE_ENTRIES:
+            _report_cache.popitem(last=False)
+    return pdf
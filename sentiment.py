@@ -0,0 +1,222 @@
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.preprocessing import normalize
+
+from data_cache import CSV_ENCODING
+from model_registry import registry
+
+# ================= SENTIMENT CONFIG =================
+SENTIMENT_DIR = os.getenv("BI_SENTIMENT_DIR", os.path.dirname(os.path.abspath(__file__)))
+SENTIMENT_MODEL_PATH = os.path.join(SENTIMENT_DIR, "sentiment_model.pkl")
+VECTORIZER_PATH = os.path.join(SENTIMENT_DIR, "tfidf_vectorizer.pkl")
+TEXT_COLUMN = "review_text"
+GROUP_COLUMNS = ["Product ID", "Category"]
+DEFAULT_CHUNK_ROWS = 100_000
+POSITIVE_THRESHOLD = 0.5
+# Per-term regex counting beats the Python tokenizer only for small vocabularies
+FAST_VOCAB_MAX = 32
+
+
+# ================= TEXT CLEANING =================
+def clean_texts(texts):
+    """Vectorized version of the notebook's ``clean_text`` (lowercase, keep a-z and whitespace)."""
+    return texts.fillna("").astype(str).str.lower().str.replace(r"[^a-z\s]", "", regex=True)
+
+
+# ================= SCORING =================
+def load_models(model_path=SENTIMENT_MODEL_PATH, vectorizer_path=VECTORIZER_PATH):
+    return registry.get(model_path), registry.get(vectorizer_path)
+
+
+def score_texts(texts, model, vectorizer):
+    """Positive-class probability per review: one sparse TF-IDF transform and one predict_proba.
+
+    Tokenizing dominates the cost, so each distinct cleaned text is
+    transformed once and the probabilities are broadcast back.
+    """
+    codes, distinct = pd.factorize(clean_texts(pd.Series(texts)))
+    if _supports_fast_tfidf(vectorizer):
+        X = _fast_tfidf(pd.Series(distinct), vectorizer)
+    else:
+        X = vectorizer.transform(distinct)
+    return model.predict_proba(X)[:, 1][codes]
+
+
+def _supports_fast_tfidf(vectorizer):
+    params = vectorizer.get_params()
+    return (
+        len(vectorizer.vocabulary_) <= FAST_VOCAB_MAX
+        and params["analyzer"] == "word" and params["ngram_range"] == (1, 1)
+        and params["token_pattern"] == r"(?u)\b\w\w+\b"
+        and params["preprocessor"] is None and params["tokenizer"] is None
+        and not params["binary"] and not params["sublinear_tf"]
+        and params["use_idf"] and params["norm"] == "l2"
+    )
+
+
+def _fast_tfidf(cleaned, vectorizer):
+    """Same matrix as ``vectorizer.transform`` for cleaned (a-z only) text.
+
+    Each vocabulary term is counted with one vectorized regex pass over the
+    column instead of tokenizing every document in Python.
+    """
+    terms = sorted(vectorizer.vocabulary_, key=vectorizer.vocabulary_.get)
+    counts = np.column_stack([
+        cleaned.str.count(rf"\b{re.escape(term)}\b").to_numpy("float64") for term in terms
+    ])
+    return normalize(sp.csr_matrix(counts * vectorizer.idf_))
+
+
+# Worker processes load the artifacts once (from the page cache) rather than
+# receiving a pickled copy with every chunk.
+_worker_models = None
+
+
+def _init_worker(model_path, vectorizer_path):
+    global _worker_models
+    _worker_models = load_models(model_path, vectorizer_path)
+
+
+def _score_in_worker(texts):
+    return score_texts(texts, *_worker_models)
+
+
+# ================= ROLLUP =================
+class SentimentRollup:
+    """Review counts and summed probabilities per Product ID / Category, merged chunk by chunk."""
+
+    def __init__(self):
+        self.table = None
+        self.group_cols = []
+        self.rows = 0
+
+    def append(self, chunk, proba):
+        if self.table is None:
+            self.group_cols = [col for col in GROUP_COLUMNS if col in chunk.columns]
+
+        self.rows += len(chunk)
+        part = pd.DataFrame({
+            "Reviews": 1,
+            "Positive": (proba >= POSITIVE_THRESHOLD).astype("int64"),
+            "Probability Sum": proba,
+        })
+        if not self.group_cols:
+            part = part.sum().to_frame().T
+        else:
+            part = part.groupby([chunk[col].to_numpy() for col in self.group_cols],
+                                 dropna=False, sort=False).sum()
+            part.index.names = self.group_cols
+            part = part.reset_index()
+
+        if self.table is None:
+            self.table = part
+        elif self.group_cols:
+            self.table = pd.concat([self.table, part], ignore_index=True).groupby(
+                self.group_cols, dropna=False, sort=False).sum().reset_index()
+        else:
+            self.table = self.table + part
+        return self
+
+    def summary(self, group_col=None):
+        """Per-group review counts, positive share and mean probability."""
+        table = self.table
+        if table is None:
+            table = pd.DataFrame(columns=self.group_cols + ["Reviews", "Positive", "Probability Sum"])
+        if group_col is not None:
+            table = table.groupby(group_col).sum(numeric_only=True).reset_index()
+        table = table.assign(
+            **{
+                "Positive Share": table["Positive"] / table["Reviews"],
+                "Mean Probability": table["Probability Sum"] / table["Reviews"],
+            }
+        )
+        return table.drop(columns="Probability Sum")
+
+
+def with_sales(summary, group_col, cube=None, df=None):
+    """Join a sentiment summary to Sales/Profit totals for the same groups.
+
+    Category totals come from the cube; Product ID totals need the row-level
+    DataFrame (the cube does not keep products).
+    """
+    if cube is not None and group_col in cube.dimensions:
+        sales = pd.DataFrame({
+            "Sales": cube.totals(group_col, "Sales"),
+            "Profit": cube.totals(group_col, "Profit"),
+        })
+    elif df is not None and group_col in df.columns:
+        sales = df.groupby(group_col, observed=True)[["Sales", "Profit"]].sum()
+    else:
+        return summary
+    return summary.merge(sales, left_on=group_col, right_index=True, how="left")
+
+
+# ================= STREAMING PIPELINE =================
+def read_review_chunks(source, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Yield chunks holding only ``review_text`` and the grouping columns."""
+    header = pd.read_csv(source, encoding=CSV_ENCODING, nrows=0)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    names = {raw.strip(): raw for raw in header.columns}
+    if TEXT_COLUMN not in names:
+        raise ValueError(f"Reviews file is missing the '{TEXT_COLUMN}' column")
+
+    usecols = [names[col] for col in [TEXT_COLUMN] + GROUP_COLUMNS if col in names]
+    dtypes = {names[col]: "category" for col in GROUP_COLUMNS if col in names}
+    for chunk in pd.read_csv(source, encoding=CSV_ENCODING, usecols=usecols,
+                             dtype=dtypes, chunksize=chunk_rows):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def score_reviews(source, chunk_rows=DEFAULT_CHUNK_ROWS, workers=None,
+                  total_bytes=None, on_progress=None):
+    """Stream a reviews CSV (path or file-like) and roll sentiment up per product/category.
+
+    With more than one worker, chunks are scored on a process pool while the
+    next chunk is parsed; at most ``2 * workers`` chunks are in flight, which
+    bounds memory. Returns ``(rollup, stats)`` where stats holds rows,
+    seconds and rows/sec.
+    """
+    start = time.perf_counter()
+    rollup = SentimentRollup()
+    workers = workers or os.cpu_count() or 1
+
+    def progress():
+        if on_progress is not None and total_bytes and hasattr(source, "tell"):
+            on_progress(min(source.tell() / total_bytes, 1.0))
+
+    if workers == 1:
+        models = load_models()
+        for chunk in read_review_chunks(source, chunk_rows):
+            rollup.append(chunk, score_texts(chunk[TEXT_COLUMN], *models))
+            progress()
+    else:
+        pending = []
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(SENTIMENT_MODEL_PATH, VECTORIZER_PATH)) as pool:
+            for chunk in read_review_chunks(source, chunk_rows):
+                future = pool.submit(_score_in_worker, chunk[TEXT_COLUMN].to_numpy())
+                pending.append((chunk.drop(columns=TEXT_COLUMN), future))
+                while len(pending) > 2 * workers:
+                    done, future = pending.pop(0)
+                    rollup.append(done, future.result())
+                progress()
+            for done, future in pending:
+                rollup.append(done, future.result())
+
+    if on_progress is not None:
+        on_progress(1.0)
+    seconds = time.perf_counter() - start
+    stats = {
+        "rows": rollup.rows,
+        "seconds": seconds,
+        "rows_per_sec": rollup.rows / seconds if seconds > 0 else 0.0,
+    }
+    return rollup, stats
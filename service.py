@@ -0,0 +1,286 @@
+"""Headless prediction/analytics HTTP service.
+
+    python service.py --port 8000 --data superstore.csv
+
+Endpoints (JSON in, JSON out):
+    POST /predict        {"Quantity": 5, "Discount": 0.1, "Month": 6}
+    POST /predict/batch  {"rows": [{...}, ...]}
+    GET  /aggregate      ?group=Category&value=Sales  (KPIs when no group)
+    GET  /health
+    GET  /metrics        Prometheus text (request spans, when BI_TRACING=1)
+
+Concurrent /predict calls are micro-batched: requests arriving within
+``--max-wait-ms`` of each other are scored with one vectorized predict.
+"""
+import argparse
+import json
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from batch_predict import DEFAULT_YEAR, predict_batch, predict_rows, prepare_scenarios
+from cube import cube_for_dataset
+from data_cache import load_dataset
+from model_registry import MODEL_DIR, registry
+from tracing import tracer
+
+# ================= SERVICE CONFIG =================
+MAX_BATCH = 256
+MAX_WAIT_MS = 5.0
+# A request waiting on the batcher gives up (504) after this long
+RESULT_TIMEOUT = 30.0
+
+
+def feature_row(payload):
+    """One raw feature row (in ``batch_predict.FEATURES`` order) from a JSON request body."""
+    month = int(payload["Month"])
+    row = [
+        float(payload["Quantity"]),
+        float(payload["Discount"]),
+        int(payload.get("Year", DEFAULT_YEAR)),
+        month,
+        int(payload.get("Quarter", (month - 1) // 3 + 1)),
+    ]
+    # float() accepts NaN/Infinity; reject them here rather than fail a whole batch
+    if not all(math.isfinite(value) for value in row):
+        raise ValueError("Quantity and Discount must be finite numbers")
+    return row
+
+
+# ================= MICRO-BATCHER =================
+class MicroBatcher:
+    """Collects single-row requests for up to ``max_wait`` seconds into one predict call."""
+
+    def __init__(self, predict_fn, max_batch=MAX_BATCH, max_wait=MAX_WAIT_MS / 1000):
+        self.predict_fn = predict_fn
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = 0
+        self.rows = 0
+        self._queue = queue.Queue()
+        threading.Thread(target=self._loop, name="micro-batcher", daemon=True).start()
+
+    def submit(self, row):
+        future = Future()
+        self._queue.put((row, future))
+        return future
+
+    def _loop(self):
+        while True:
+            items = [self._queue.get()]
+            deadline = time.perf_counter() + self.max_wait
+            while len(items) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    items.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            if not self._score(items) and len(items) > 1:
+                # Retry row by row so only the caller whose row fails sees the error
+                for item in items:
+                    if not item[1].done():
+                        self._score([item])
+
+    def _score(self, items):
+        """Predict ``items`` in one call and resolve their futures; False if the predict failed."""
+        try:
+            sales, profit = self.predict_fn(np.array([row for row, _ in items]))
+            if len(sales) != len(items) or len(profit) != len(items):
+                raise RuntimeError(f"predict returned {len(sales)}/{len(profit)} results for {len(items)} rows")
+            results = [(float(sale), int(label)) for sale, label in zip(sales, profit)]
+        except Exception as e:
+            if len(items) == 1:
+                items[0][1].set_exception(e)
+            return False
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
+        self.batches += 1
+        self.rows += len(items)
+        return True
+
+
+# ================= SERVICE =================
+class PredictionService:
+    def __init__(self, model_dir=MODEL_DIR, data_path=None, batching=True,
+                 max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS):
+        self.model_dir = model_dir
+        self.cube = None
+        if data_path:
+            with open(data_path, "rb") as f:
+                df, digest = load_dataset(f.read())
+            self.cube = cube_for_dataset(df, digest)
+        self.batcher = MicroBatcher(self._predict, max_batch, max_wait_ms / 1000) if batching else None
+        # Load (and verify) the artifacts up front rather than on the first request
+        self.models()
+
+    def models(self):
+        # The registry hot-swaps artifacts whose file content changes
+        return registry.get_many(self.model_dir)
+
+    def _predict(self, X):
+        return predict_rows(X, *self.models())
+
+    def predict(self, payload):
+        row = feature_row(payload)
+        if self.batcher is not None:
+            sales, profit = self.batcher.submit(row).result(timeout=RESULT_TIMEOUT)
+        else:
+            sales, profit = self._predict(np.array([row]))
+            sales, profit = float(sales[0]), int(profit[0])
+        return {
+            "predicted_sales": sales,
+            "profit_class": "High" if profit == 1 else "Low",
+        }
+
+    def predict_batch(self, payload):
+        scenarios = prepare_scenarios(pd.DataFrame(payload["rows"]))
+        results, stats = predict_batch(scenarios, *self.models())
+        return {
+            "predictions": [
+                {"predicted_sales": float(sales), "profit_class": label}
+                for sales, label in zip(results["Predicted Sales"], results["Profit Class"])
+            ],
+            "rows": stats["rows"],
+            "rows_per_sec": stats["rows_per_sec"],
+        }
+
+    def aggregate(self, group=None, value="Sales"):
+        if self.cube is None:
+            raise LookupError("No dataset loaded; start the service with --data")
+        if not group:
+            orders = self.cube.distinct_orders
+            return {
+                "total_sales": float(self.cube.total_sales),
+                "total_profit": float(self.cube.total_profit),
+                "total_orders": int(self.cube.total_orders),
+                "distinct_orders": None if orders is None else {"estimate": orders[0], "relative_error": orders[1]},
+                "avg_discount": float(self.cube.avg_discount),
+            }
+        if group not in self.cube.dimensions or value not in ("Sales", "Profit", "Rows"):
+            raise ValueError(f"Unsupported aggregate {group!r} -> {value!r}")
+        totals = self.cube.totals(group, value)
+        return {"group": group, "value": value, "totals": {str(k): float(v) for k, v in totals.items()}}
+
+    def health(self):
+        health = {"status": "ok", "models": registry.stats()}
+        if self.batcher is not None:
+            health["batches"] = self.batcher.batches
+            health["batched_rows"] = self.batcher.rows
+        return health
+
+
+# ================= HTTP LAYER =================
+def make_handler(service):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _send(self, status, payload):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _dispatch(self, fn, *args):
+            tracer.begin_rerun(urlparse(self.path).path)
+            try:
+                with tracer.span("handler"):
+                    result = fn(*args)
+                self._send(200, result)
+            except (KeyError, ValueError, TypeError) as e:
+                self._send(400, {"error": f"Bad request: {e}"})
+            except TimeoutError:
+                self._send(504, {"error": "Prediction timed out"})
+            except LookupError as e:
+                self._send(404, {"error": str(e)})
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+            finally:
+                tracer.end_rerun()
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[0] for key, values in parse_qs(url.query).items()}
+            if url.path == "/health":
+                self._dispatch(service.health)
+            elif url.path == "/aggregate":
+                self._dispatch(service.aggregate, query.get("group"), query.get("value", "Sales"))
+            elif url.path == "/metrics":
+                body = tracer.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self._send(404, {"error": "Not found"})
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length", 0))
+            try:
+                payload = json.loads(self.rfile.read(length) or b"{}")
+            except ValueError:
+                self._send(400, {"error": "Body must be JSON"})
+                return
+            if not isinstance(payload, dict):
+                self._send(400, {"error": "Body must be a JSON object"})
+                return
+
+            path = urlparse(self.path).path
+            if path == "/predict":
+                self._dispatch(service.predict, payload)
+            elif path == "/predict/batch":
+                self._dispatch(service.predict_batch, payload)
+            elif path == "/aggregate":
+                self._dispatch(service.aggregate, payload.get("group"), payload.get("value", "Sales"))
+            else:
+                self._send(404, {"error": "Not found"})
+
+    return Handler
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 resets connections under bursts of concurrent clients
+    request_queue_size = 128
+
+
+def make_server(service, host="127.0.0.1", port=8000):
+    return ServiceHTTPServer((host, port), make_handler(service))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--data", help="Superstore CSV to serve /aggregate from")
+    parser.add_argument("--no-batching", action="store_true", help="Score each /predict call on its own")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    service = PredictionService(args.model_dir, args.data, not args.no_batching,
+                                args.max_batch, args.max_wait_ms)
+    server = make_server(service, args.host, args.port)
+    print(f"Serving on http://{args.host}:{args.port} (batching {'off' if args.no_batching else 'on'})")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
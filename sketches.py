@@ -0,0 +1,301 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+# ================= SKETCH CONFIG =================
+HLL_PRECISION = 14          # 16k registers: ~0.8% standard error
+TOP_K_CAPACITY = 8192       # Space-Saving counters kept per column (~0.5 MB)
+QUANTILE_ACCURACY = 0.01    # relative error of every reported quantile
+QUANTILE_MIN_VALUE = 1e-4   # |values| below this count as zero
+QUANTILE_MAX_VALUE = 1e12
+DISTINCT_COLUMNS = {"orders": "Order ID", "customers": "Customer ID"}
+TOP_COLUMNS = {"customers": "Customer ID", "products": "Product ID"}
+QUANTILE_COLUMNS = ["Sales", "Profit"]
+CORRELATION_COLUMNS = ("Discount", "Profit")
+
+
+def _hash(values):
+    # Stable 64-bit hash: the same label hashes the same in every chunk, file and process
+    return pd.util.hash_array(np.asarray(values, dtype=object), categorize=False)
+
+
+# ================= DISTINCT COUNT =================
+class HyperLogLog:
+    """Distinct count in 2**precision bytes; merging takes the register-wise max."""
+
+    def __init__(self, precision=HLL_PRECISION):
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+
+    def add(self, values):
+        # Repeats cannot change a register, so hash each distinct value once
+        values = pd.unique(pd.Series(values).dropna().to_numpy())
+        if not len(values):
+            return self
+        hashes = _hash(values)
+        buckets = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rest = hashes & np.uint64((1 << (64 - self.precision)) - 1)
+        # Bit length via the float exponent (exact: the remainder fits the 53-bit mantissa)
+        _, bit_length = np.frexp(rest.astype(np.float64))
+        ranks = (64 - self.precision - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, buckets, ranks)
+        return self
+
+    def merge(self, other):
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    @property
+    def relative_error(self):
+        """Standard error of ``count()`` (1.04 / sqrt(registers))."""
+        return 1.04 / math.sqrt(len(self.registers))
+
+    def count(self):
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(np.int64)))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * m and zeros:
+            # Small-range correction: linear counting over the empty registers
+            estimate = m * math.log(m / zeros)
+        return int(round(estimate))
+
+
+# ================= HEAVY HITTERS =================
+class SpaceSaving:
+    """Weighted Space-Saving summary of the heaviest keys (e.g. sales per customer).
+
+    Keeps ``capacity`` counters. Each tracked key's ``count`` overestimates
+    its true total by at most its ``error``; any untracked key totals at most
+    ``floor``. Chunks are aggregated exactly and merged in; summaries built
+    elsewhere (other files, processes) merge the same way, in any order.
+    """
+
+    def __init__(self, capacity=TOP_K_CAPACITY):
+        self.capacity = capacity
+        self.counts = pd.Series(dtype="float64")
+        self.errors = pd.Series(dtype="float64")
+        self.floor = 0.0
+        self.total = 0.0
+
+    def add(self, keys, weights):
+        totals = pd.Series(np.asarray(weights, dtype="float64")).groupby(np.asarray(keys), sort=False).sum()
+        return self.add_totals(totals)
+
+    def add_totals(self, totals):
+        """Merge exact per-key totals (one chunk's ``groupby(key).sum()``)."""
+        totals = totals.dropna()
+        if not len(totals):
+            return self
+        exact = SpaceSaving(self.capacity)
+        exact.counts = totals.astype("float64")
+        exact.errors = pd.Series(0.0, index=totals.index)
+        exact.total = float(totals.sum())
+        # Merged untruncated (floor 0), so only keys dropped from the summary add error
+        return self.merge(exact)
+
+    def merge(self, other):
+        keys = self.counts.index.union(other.counts.index, sort=False)
+        # A key missing from one side may still have up to that side's floor there
+        self.counts = (self.counts.reindex(keys).fillna(self.floor)
+                       + other.counts.reindex(keys).fillna(other.floor))
+        self.errors = (self.errors.reindex(keys).fillna(self.floor)
+                       + other.errors.reindex(keys).fillna(other.floor))
+        self.floor = self.floor + other.floor
+        self.total += other.total
+        self._truncate()
+        return self
+
+    def _truncate(self):
+        if len(self.counts) > self.capacity:
+            counts = self.counts.to_numpy()
+            order = np.argpartition(-counts, self.capacity)
+            self.floor = max(self.floor, float(counts[order[self.capacity:]].max()))
+            keep = order[:self.capacity]
+            self.counts = self.counts.iloc[keep]
+            self.errors = self.errors.iloc[keep]
+
+    def top(self, n=10):
+        """``key / estimate / guaranteed / error`` for the ``n`` heaviest keys."""
+        counts = self.counts.nlargest(n)
+        errors = self.errors[counts.index]
+        return pd.DataFrame({
+            "key": counts.index,
+            "estimate": counts.to_numpy(),
+            "guaranteed": (counts - errors).to_numpy(),
+            "error": errors.to_numpy(),
+        })
+
+
+# ================= QUANTILES =================
+class QuantileSketch:
+    """Log-bucketed histogram (DDSketch): every quantile within ``accuracy`` relative error.
+
+    Buckets are fixed for the whole value range, so merging is adding
+    the count arrays.
+    """
+
+    def __init__(self, accuracy=QUANTILE_ACCURACY, min_value=QUANTILE_MIN_VALUE, max_value=QUANTILE_MAX_VALUE):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.min_value = min_value
+        self.offset = self._bucket(np.array([min_value]))[0]
+        size = int(self._bucket(np.array([max_value]))[0] - self.offset) + 1
+        self.positive = np.zeros(size, dtype=np.int64)
+        self.negative = np.zeros(size, dtype=np.int64)
+        self.zeros = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def _bucket(self, magnitudes):
+        return np.ceil(np.log(magnitudes) / math.log(self.gamma)).astype(np.int64)
+
+    def add(self, values):
+        values = np.asarray(values, dtype="float64")
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        magnitudes = np.abs(values)
+        small = magnitudes < self.min_value
+        self.zeros += int(small.sum())
+        buckets = np.clip(self._bucket(magnitudes[~small]) - self.offset, 0, len(self.positive) - 1)
+        negative = values[~small] < 0
+        self.positive += np.bincount(buckets[~negative], minlength=len(self.positive))
+        self.negative += np.bincount(buckets[negative], minlength=len(self.negative))
+        return self
+
+    def merge(self, other):
+        self.positive += other.positive
+        self.negative += other.negative
+        self.zeros += other.zeros
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def _value(self, bucket):
+        return 2 * self.gamma ** (bucket + self.offset) / (self.gamma + 1)
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        # Walk negatives from the most negative up, then zeros, then positives
+        negative = np.cumsum(self.negative[::-1])
+        if rank < negative[-1]:
+            bucket = len(self.negative) - 1 - int(np.searchsorted(negative, rank, side="right"))
+            return max(-self._value(bucket), self.min)
+        rank -= negative[-1]
+        if rank < self.zeros:
+            return 0.0
+        rank -= self.zeros
+        bucket = int(np.searchsorted(np.cumsum(self.positive), rank, side="right"))
+        return min(self._value(bucket), self.max)
+
+    def count_outside(self, low, high):
+        """Approximate number of values below ``low`` or above ``high`` (bucket resolution)."""
+        if not self.count:
+            return 0
+        values = self._value(np.arange(len(self.positive)))
+        outside = int(self.negative[(-values < low) | (-values > high)].sum())
+        outside += int(self.positive[(values < low) | (values > high)].sum())
+        if not low <= 0 <= high:
+            outside += self.zeros
+        return outside
+
+
+# ================= CORRELATION =================
+class Correlation:
+    """Pearson correlation from running sums, which merge by addition."""
+
+    def __init__(self):
+        self.n = 0
+        self.sums = np.zeros(5)  # x, y, x*x, y*y, x*y
+
+    def add(self, x, y):
+        x = np.asarray(x, dtype="float64")
+        y = np.asarray(y, dtype="float64")
+        valid = ~(np.isnan(x) | np.isnan(y))
+        x, y = x[valid], y[valid]
+        self.n += len(x)
+        self.sums += [x.sum(), y.sum(), x @ x, y @ y, x @ y]
+        return self
+
+    def merge(self, other):
+        self.n += other.n
+        self.sums += other.sums
+        return self
+
+    def value(self):
+        if self.n < 2:
+            return None
+        sx, sy, sxx, syy, sxy = self.sums / self.n
+        var_x, var_y = sxx - sx * sx, syy - sy * sy
+        if var_x <= 0 or var_y <= 0:
+            return None
+        return float((sxy - sx * sy) / np.sqrt(var_x * var_y))
+
+
+# ================= DATASET SKETCH =================
+class DatasetSketch:
+    """One-pass, mergeable distinct counts, top keys, value distributions and the
+    discount/profit correlation for a dataset.
+
+    Fed chunk by chunk alongside the cube, in constant memory
+    (~16 KB per distinct count, ``TOP_K_CAPACITY`` counters per top-N
+    column, ~2.7k buckets per quantile column).
+    """
+
+    def __init__(self):
+        self.distinct = {name: HyperLogLog() for name in DISTINCT_COLUMNS}
+        self.top = {name: SpaceSaving() for name in TOP_COLUMNS}
+        self.quantiles = {col: QuantileSketch() for col in QUANTILE_COLUMNS}
+        self.correlation = Correlation()
+
+    def append(self, chunk):
+        # Per-key sales feed the top-N summaries; their keys are that column's distinct values
+        uniques = {}
+        if "Sales" in chunk.columns:
+            for name, col in TOP_COLUMNS.items():
+                if col in chunk.columns:
+                    totals = chunk["Sales"].groupby(chunk[col], sort=False, observed=True).sum()
+                    self.top[name].add_totals(totals)
+                    uniques[col] = totals.index
+        for name, col in DISTINCT_COLUMNS.items():
+            if col in chunk.columns:
+                self.distinct[name].add(uniques[col] if col in uniques else chunk[col])
+        for col in QUANTILE_COLUMNS:
+            if col in chunk.columns:
+                self.quantiles[col].add(chunk[col].to_numpy())
+        if all(col in chunk.columns for col in CORRELATION_COLUMNS):
+            self.correlation.add(*(chunk[col].to_numpy() for col in CORRELATION_COLUMNS))
+        return self
+
+    def merge(self, other):
+        for name in self.distinct:
+            self.distinct[name].merge(other.distinct[name])
+        for name in self.top:
+            self.top[name].merge(other.top[name])
+        for col in self.quantiles:
+            self.quantiles[col].merge(other.quantiles[col])
+        self.correlation.merge(other.correlation)
+        return self
+
+    def distinct_count(self, name):
+        """``(estimate, relative standard error)``, or ``None`` when the column was absent."""
+        hll = self.distinct[name]
+        if not hll.registers.any():
+            return None
+        return hll.count(), hll.relative_error
+
+    def quantile_table(self, quantiles=(0.25, 0.5, 0.75, 0.9, 0.99)):
+        """Percentiles per value column, each within ``QUANTILE_ACCURACY`` relative error."""
+        return pd.DataFrame({
+            col: [sketch.quantile(q) for q in quantiles]
+            for col, sketch in self.quantiles.items() if sketch.count
+        }, index=[f"p{round(q * 100)}" for q in quantiles])
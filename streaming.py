@@ -0,0 +1,35 @@
+import pandas as pd
+
+from cube import SalesCube
+from data_cache import CSV_ENCODING, csv_dtypes, parse_dates
+
+# ================= STREAMING CONFIG =================
+DEFAULT_CHUNK_ROWS = 200_000
+
+
+# ================= CHUNKED READER =================
+def stream_csv(buffer, total_bytes=None, chunk_rows=DEFAULT_CHUNK_ROWS, on_progress=None):
+    """Aggregate a CSV file-like object chunk by chunk into a ``SalesCube``.
+
+    Peak memory is bounded by ``chunk_rows``; the full DataFrame is never
+    built. ``on_progress`` receives the fraction of ``total_bytes`` consumed.
+    """
+    header = pd.read_csv(buffer, encoding=CSV_ENCODING, nrows=0)
+    buffer.seek(0)
+
+    cube = SalesCube()
+    reader = pd.read_csv(
+        buffer,
+        encoding=CSV_ENCODING,
+        dtype=csv_dtypes(header.columns),
+        chunksize=chunk_rows
+    )
+    for chunk in reader:
+        chunk.columns = chunk.columns.str.strip()
+        cube.append(parse_dates(chunk))
+        if on_progress is not None and total_bytes:
+            on_progress(min(buffer.tell() / total_bytes, 1.0))
+
+    if on_progress is not None:
+        on_progress(1.0)
+    return cube
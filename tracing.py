@@ -0,0 +1,235 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from logging.handlers import RotatingFileHandler
+
+from data_cache import CACHE_DIR
+
+# ================= TRACING CONFIG =================
+# Off by default; set BI_TRACING=1 to record spans
+TRACING_ENABLED = os.getenv("BI_TRACING", "").lower() in ("1", "true", "yes")
+TRACE_DIR = os.getenv("BI_TRACE_DIR", os.path.join(CACHE_DIR, "traces"))
+TRACE_MAX_BYTES = 10 * 1024 * 1024
+TRACE_BACKUPS = 3
+RECENT_RERUNS = 50
+# Sidebar table of recent reruns, for operators
+ADMIN_PANEL = os.getenv("BI_ADMIN_PANEL", "").lower() in ("1", "true", "yes")
+
+
+_process = None
+
+
+def _rss_bytes():
+    global _process
+    if _process is None:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        _process = psutil.Process()
+    return _process.memory_info().rss
+
+
+def _delta_mb(before, after):
+    return None if before is None or after is None else round((after - before) / 1e6, 2)
+
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+class _NullSpan:
+    """Shared no-op span handed out while tracing is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    def __init__(self, rerun, name, attrs):
+        self.rerun = rerun
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.rss = _rss_bytes()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        record = {
+            "name": self.name,
+            "start_ms": round((self.start - self.rerun["perf_start"]) * 1000, 2),
+            "ms": round(seconds * 1000, 2),
+            "rss_delta_mb": _delta_mb(self.rss, _rss_bytes()),
+        }
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        if self.attrs:
+            record["attrs"] = self.attrs
+        self.rerun["spans"].append(record)
+        return False
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+# ================= TRACER =================
+class Tracer:
+    """Per-rerun timing spans, written to a rotating JSONL file and Prometheus text.
+
+    A rerun (one Streamlit script run, or one service request) is opened
+    with ``begin_rerun`` and closed with ``end_rerun`` on the same thread;
+    ``span(name)`` times a stage inside it. While disabled every call returns
+    immediately (``span`` hands back a shared no-op object).
+    """
+
+    def __init__(self, enabled=TRACING_ENABLED, directory=TRACE_DIR, recent=RECENT_RERUNS):
+        self.enabled = enabled
+        self.directory = directory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._recent = deque(maxlen=recent)
+        self._counters = defaultdict(float)
+        self._logger = None
+
+    # ---------- reruns ----------
+    def begin_rerun(self, section=None):
+        if not self.enabled:
+            return
+        if getattr(self._local, "rerun", None) is not None:
+            # The previous run stopped early (st.stop, exception); close it out
+            self.end_rerun(complete=False)
+        self._local.rerun = {
+            "ts": time.time(),
+            "section": section,
+            "perf_start": time.perf_counter(),
+            "rss": _rss_bytes(),
+            "spans": [],
+            "llm": defaultdict(float),
+        }
+
+    def set_section(self, section):
+        rerun = getattr(self._local, "rerun", None) if self.enabled else None
+        if rerun is not None:
+            rerun["section"] = section
+
+    def span(self, name, **attrs):
+        if not self.enabled:
+            return _NULL_SPAN
+        rerun = getattr(self._local, "rerun", None)
+        if rerun is None:
+            return _NULL_SPAN
+        return Span(rerun, name, attrs)
+
+    def record_llm(self, seconds, prompt_tokens=None, completion_tokens=None, error=False, cached=False):
+        rerun = getattr(self._local, "rerun", None) if self.enabled else None
+        if rerun is None:
+            return
+        llm = rerun["llm"]
+        if cached:
+            llm["cache_hits"] += 1
+            return
+        llm["requests"] += 1
+        llm["seconds"] += seconds or 0.0
+        llm["prompt_tokens"] += prompt_tokens or 0
+        llm["completion_tokens"] += completion_tokens or 0
+        llm["errors"] += int(bool(error))
+
+    def end_rerun(self, complete=True):
+        rerun = getattr(self._local, "rerun", None) if self.enabled else None
+        if rerun is None:
+            return
+        self._local.rerun = None
+
+        totals = defaultdict(float)
+        for span in rerun["spans"]:
+            totals[span["name"]] += span["ms"]
+        record = {
+            "ts": rerun["ts"],
+            "section": rerun["section"],
+            "complete": complete,
+            "ms": round((time.perf_counter() - rerun["perf_start"]) * 1000, 2),
+            "rss_delta_mb": _delta_mb(rerun["rss"], _rss_bytes()),
+            "totals_ms": {name: round(ms, 2) for name, ms in totals.items()},
+            "llm": dict(rerun["llm"]),
+            "spans": rerun["spans"],
+        }
+
+        with self._lock:
+            self._recent.append(record)
+            section = record["section"] or "none"
+            self._counters[("bi_reruns_total", "section", section)] += 1
+            self._counters[("bi_rerun_seconds_total", "section", section)] += record["ms"] / 1000
+            for name, ms in totals.items():
+                self._counters[("bi_span_seconds_total", "span", name)] += ms / 1000
+                self._counters[("bi_span_calls_total", "span", name)] += sum(
+                    1 for span in rerun["spans"] if span["name"] == name
+                )
+            for key, value in record["llm"].items():
+                self._counters[(f"bi_llm_{key}_total", None, None)] += value
+        self._write(record)
+
+    # ---------- output ----------
+    def _write(self, record):
+        try:
+            with self._write_lock:
+                self._write_files(record)
+        except OSError:
+            # Tracing must never break the page it is measuring
+            pass
+
+    def _write_files(self, record):
+        if self._logger is None:
+            os.makedirs(self.directory, exist_ok=True)
+            logger = logging.getLogger(f"bi.tracing.{id(self)}")
+            logger.propagate = False
+            logger.setLevel(logging.INFO)
+            logger.addHandler(RotatingFileHandler(
+                os.path.join(self.directory, "spans.jsonl"),
+                maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS
+            ))
+            self._logger = logger
+        self._logger.info(json.dumps(record))
+
+        path = os.path.join(self.directory, "metrics.prom")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp_path, path)
+
+    def prometheus_text(self):
+        """Counters in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items(), key=lambda item: (item[0][0], str(item[0][2])))
+        lines, seen = [], set()
+        for (metric, label, value), total in counters:
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            labels = f'{{{label}="{_label_value(value)}"}}' if label else ""
+            lines.append(f"{metric}{labels} {float(total)!r}")
+        return "\n".join(lines) + "\n"
+
+    def recent(self, n=10):
+        """The last ``n`` finished reruns, newest first."""
+        with self._lock:
+            return list(self._recent)[-n:][::-1]
+
+
+# Module-level singleton shared by every session (and the service)
+tracer = Tracer()
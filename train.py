@@ -0,0 +1,244 @@
+"""Retrain the sales regression and profit classifier.
+
+    python train.py superstore.csv [more.csv data.parquet ...] [--search]
+    python train.py --partitions [--months 2015-01:2016-12] [--regions West East]
+
+Reproduces the notebook pipeline (median fill, duplicate-row removal, IQR
+outlier filter, 80/20 split, StandardScaler, random forests) but streams
+CSV or Parquet inputs chunk by chunk, keeping only the columns it needs
+and a hash of each full row, and fits on all cores. Artifacts are
+written to ``<model-dir>/versions/<version>/`` and then promoted by
+pointing ``<model-dir>/CURRENT`` at that version; the running app and
+service hot-swap all of them together.
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier, RandomForestRegressor
+from sklearn.metrics import accuracy_score, mean_absolute_error, mean_squared_error
+from sklearn.model_selection import GridSearchCV, train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from batch_predict import FEATURES
+from data_cache import CSV_ENCODING
+from model_registry import CURRENT_FILE, MODEL_DIR
+from partition_store import PARTITION_DIR, PartitionStore, parse_month_range
+
+# ================= TRAINING CONFIG =================
+SOURCE_COLUMNS = ["Order Date", "Quantity", "Discount", "Sales", "Profit"]
+CHUNK_ROWS = 200_000
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+SEARCH_ROWS = 200_000
+SEARCH_GRID = {
+    "n_estimators": [100, 200],
+    "max_depth": [None, 12, 20],
+    "min_samples_leaf": [1, 5],
+}
+ARTIFACTS = {
+    "reg": "sales_regression.pkl",
+    "clf": "profit_classifier.pkl",
+    "scaler": "scaler.pkl",
+}
+
+
+# ================= STREAMING INPUT =================
+def _csv_chunks(path, chunk_rows):
+    # Every column is parsed so duplicates are judged on the full row, as in the notebook
+    for chunk in pd.read_csv(path, encoding=CSV_ENCODING, chunksize=chunk_rows):
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def _parquet_chunks(path, chunk_rows):
+    import pyarrow.parquet as pq
+
+    parquet = pq.ParquetFile(path)
+    for batch in parquet.iter_batches(batch_size=chunk_rows):
+        yield batch.to_pandas()
+
+
+def read_training_columns(paths, chunk_rows=CHUNK_ROWS):
+    """Stream the source columns from every input into compact numpy arrays.
+
+    Only ``SOURCE_COLUMNS`` (plus a 64-bit hash of each full row, for the
+    duplicate filter) are kept from each chunk, so memory is bounded by the
+    narrow training arrays rather than the full wide table.
+    """
+    parts = {col: [] for col in FEATURES + ["Sales", "Profit", "Row Hash"]}
+    for path in paths:
+        chunks = _parquet_chunks if path.endswith(".parquet") else _csv_chunks
+        for chunk in chunks(path, chunk_rows):
+            parts["Row Hash"].append(pd.util.hash_pandas_object(chunk, index=False).to_numpy())
+            chunk = chunk[SOURCE_COLUMNS]
+            dates = pd.to_datetime(chunk["Order Date"], errors="coerce")
+            parts["Quantity"].append(pd.to_numeric(chunk["Quantity"], errors="coerce").to_numpy("float64"))
+            parts["Discount"].append(pd.to_numeric(chunk["Discount"], errors="coerce").to_numpy("float64"))
+            parts["Year"].append(dates.dt.year.to_numpy("float64"))
+            parts["Month"].append(dates.dt.month.to_numpy("float64"))
+            parts["Quarter"].append(dates.dt.quarter.to_numpy("float64"))
+            parts["Sales"].append(pd.to_numeric(chunk["Sales"], errors="coerce").to_numpy("float64"))
+            parts["Profit"].append(pd.to_numeric(chunk["Profit"], errors="coerce").to_numpy("float64"))
+    return {col: np.concatenate(arrays) if arrays else np.empty(0) for col, arrays in parts.items()}
+
+
+# ================= CLEANING =================
+def clean(columns):
+    """Notebook cleaning on the streamed arrays: median fill, drop duplicate rows
+    (first occurrence kept), drop undated rows, IQR filter.
+    """
+    for col in ["Quantity", "Discount", "Sales", "Profit"]:
+        values = columns[col]
+        values[np.isnan(values)] = np.nanmedian(values)
+
+    keep = np.zeros(len(columns["Row Hash"]), dtype=bool)
+    keep[np.unique(columns["Row Hash"], return_index=True)[1]] = True
+    keep &= ~np.isnan(columns["Year"])
+    for col in ["Sales", "Profit"]:
+        q1, q3 = np.percentile(columns[col][keep], [25, 75])
+        iqr = q3 - q1
+        keep &= (columns[col] >= q1 - 1.5 * iqr) & (columns[col] <= q3 + 1.5 * iqr)
+
+    X = pd.DataFrame({col: columns[col][keep] for col in FEATURES})
+    for col in ["Year", "Month", "Quarter"]:
+        X[col] = X[col].astype("int32")
+    sales = columns["Sales"][keep]
+    profit = columns["Profit"][keep]
+    high_profit = (profit > np.median(profit)).astype(int)
+    return X, sales, high_profit
+
+
+# ================= TRAINING =================
+def search_params(X, y, estimator, grid, search_rows=SEARCH_ROWS):
+    """Cross-validated grid search on a subsample, one process per candidate fit."""
+    if len(X) > search_rows:
+        X, _, y, _ = train_test_split(X, y, train_size=search_rows, random_state=RANDOM_STATE)
+    search = GridSearchCV(estimator, grid, cv=3, n_jobs=-1)
+    search.fit(X, y)
+    return search.best_params_
+
+
+def train(X, sales, high_profit, params, search=False):
+    X_train, X_test, y_train_reg, y_test_reg, y_train_clf, y_test_clf = train_test_split(
+        X, sales, high_profit, test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+
+    reg_params, clf_params = dict(params), dict(params)
+    if search:
+        reg_params.update(search_params(X_train, y_train_reg, RandomForestRegressor(random_state=RANDOM_STATE), SEARCH_GRID))
+        clf_params.update(search_params(X_train, y_train_clf, RandomForestClassifier(random_state=RANDOM_STATE), SEARCH_GRID))
+
+    timings = {}
+    start = time.perf_counter()
+    reg_model = RandomForestRegressor(random_state=RANDOM_STATE, n_jobs=-1, **reg_params)
+    reg_model.fit(X_train, y_train_reg)
+    timings["reg_fit_seconds"] = round(time.perf_counter() - start, 2)
+
+    start = time.perf_counter()
+    clf_model = RandomForestClassifier(random_state=RANDOM_STATE, n_jobs=-1, **clf_params)
+    clf_model.fit(X_train, y_train_clf)
+    timings["clf_fit_seconds"] = round(time.perf_counter() - start, 2)
+
+    y_pred_reg = reg_model.predict(X_test)
+    metrics = {
+        "train_rows": len(X_train),
+        "test_rows": len(X_test),
+        "rmse": float(np.sqrt(mean_squared_error(y_test_reg, y_pred_reg))),
+        "mae": float(mean_absolute_error(y_test_reg, y_pred_reg)),
+        "accuracy": float(accuracy_score(y_test_clf, clf_model.predict(X_test))),
+        "reg_params": reg_params,
+        "clf_params": clf_params,
+        **timings,
+    }
+    # Serving code runs single-threaded predicts; keep n_jobs out of the artifacts
+    reg_model.n_jobs = None
+    clf_model.n_jobs = None
+    return {"reg": reg_model, "clf": clf_model, "scaler": scaler}, metrics
+
+
+# ================= ARTIFACTS =================
+def write_version(models, metrics, model_dir):
+    """Dump uncompressed artifacts (loaded without a decompression pass) into a new version folder."""
+    digest = hashlib.sha256(json.dumps(metrics, sort_keys=True).encode("utf-8")).hexdigest()[:8]
+    version = f"{time.strftime('%Y%m%d-%H%M%S')}-{digest}"
+    version_dir = os.path.join(model_dir, "versions", version)
+    os.makedirs(version_dir)
+
+    for name, filename in ARTIFACTS.items():
+        joblib.dump(models[name], os.path.join(version_dir, filename))
+    with open(os.path.join(version_dir, "metrics.json"), "w") as f:
+        json.dump({"version": version, **metrics}, f, indent=2)
+    return version_dir
+
+
+def promote(version_dir, model_dir):
+    """Make ``version_dir`` live with one atomic rename of the ``CURRENT`` pointer.
+
+    Readers resolve every artifact through the pointer, so a new model is
+    never paired with the old scaler mid-promotion.
+    """
+    tmp_path = os.path.join(model_dir, f".{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(os.path.basename(version_dir))
+    os.replace(tmp_path, os.path.join(model_dir, CURRENT_FILE))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="*", help="Superstore CSV or Parquet files")
+    parser.add_argument("--partitions", nargs="?", const=PARTITION_DIR,
+                        help="Also train on the partitioned store (default: the app's)")
+    parser.add_argument("--months", help="Only partitions in YYYY-MM or YYYY-MM:YYYY-MM")
+    parser.add_argument("--regions", nargs="*", help="Only partitions of these regions")
+    parser.add_argument("--model-dir", default=MODEL_DIR)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--n-estimators", type=int, default=100)
+    parser.add_argument("--max-depth", type=int, default=None)
+    parser.add_argument("--min-samples-leaf", type=int, default=1)
+    parser.add_argument("--max-samples", type=float, default=None,
+                        help="Fraction of training rows drawn per tree (speeds up very large inputs)")
+    parser.add_argument("--search", action="store_true", help="Grid-search hyperparameters first")
+    parser.add_argument("--no-promote", action="store_true", help="Only write the versioned artifacts")
+    args = parser.parse_args()
+
+    inputs = list(args.inputs)
+    if args.partitions:
+        # Pruned by month/region from the manifest; only matching files are opened
+        inputs += PartitionStore(args.partitions).paths(parse_month_range(args.months), args.regions)
+    if not inputs:
+        parser.error("no inputs: pass CSV/Parquet files or --partitions")
+
+    start = time.perf_counter()
+    X, sales, high_profit = clean(read_training_columns(inputs, args.chunk_rows))
+    print(f"Loaded {len(X):,} training rows in {time.perf_counter() - start:.1f}s")
+
+    params = {
+        "n_estimators": args.n_estimators,
+        "max_depth": args.max_depth,
+        "min_samples_leaf": args.min_samples_leaf,
+        "max_samples": args.max_samples,
+    }
+    models, metrics = train(X, sales, high_profit, params, args.search)
+    metrics["total_seconds"] = round(time.perf_counter() - start, 2)
+
+    os.makedirs(args.model_dir, exist_ok=True)
+    version_dir = write_version(models, metrics, args.model_dir)
+    print(json.dumps(metrics, indent=2))
+    print(f"Wrote {version_dir}")
+    if not args.no_promote:
+        promote(version_dir, args.model_dir)
+        print(f"Promoted to {args.model_dir}")
+
+
+if __name__ == "__main__":
+    main()